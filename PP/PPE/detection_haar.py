@@ -1,6 +1,15 @@
-from ultralytics import YOLO
 import cv2
 import os  # Importar el módulo para verificar rutas de archivos
+from processing.capture import FrameGrabber
+from processing.pipeline import Stage, run_pipeline
+from detection.inference_server import get_server, run_streams
+from detection.model_registry import registry, warmup_yolo
+from detection.backends import load_yolo
+from detection.tiling import default_tiled_detector
+from processing.letterbox import boxes_to_arrays
+from ui.overlays import default_renderer
+from processing.metrics import metrics
+from config import CAMERA_SOURCE, CAMERA_SOURCES, FRAME_WIDTH, FRAME_HEIGHT, PIPELINE_MODE, TILED_INFERENCE
 
 # Lista de clases del dataset COCO (puedes reducirla según lo que necesites)
 classNames = [
@@ -28,52 +37,115 @@ def load_yolo_model():
         raise FileNotFoundError(f"El modelo YOLOv8 no se encuentra en la ruta especificada: {model_path}")
 
     print(f"Cargando modelo YOLO desde {model_path}...")
-    model = YOLO(model_path)  # Cargar el modelo desde la ruta local
+    model = load_yolo(model_path)  # Cargar el modelo desde la ruta local (con el backend configurado)
     print("Modelo YOLO cargado correctamente.")
     return model
-def process_frame(frame, model):
+
+registry.register("coco", load_yolo_model, warmup=warmup_yolo)
+
+def get_yolo_model():
     """
-    Procesa un frame para detectar objetos usando YOLO y dibuja los resultados.
+    Devuelve el modelo COCO del registro compartido (se carga una sola vez).
+    """
+    return registry.get("coco")
+
+def detect(frame, model):
+    """
+    Ejecuta la inferencia YOLO sobre el frame.
     """
-    results = model(frame, stream=True)
+    return model(frame, verbose=False)[0]
 
-    for r in results:
-        for box in r.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            cls = int(box.cls[0])
-            label = classNames[cls]
-            conf = round(float(box.conf[0]) * 100, 2)
+def extract_detections(result):
+    """
+    Convierte el resultado de YOLO en una lista de (x1, y1, x2, y2, etiqueta, confianza).
+    """
+    return detections_from_arrays(*boxes_to_arrays(result.boxes))
 
-            # Dibujar bounding box y etiqueta
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, f"{label} {conf}%", (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+def detections_from_arrays(boxes, confs, classes):
+    """
+    Lista de (x1, y1, x2, y2, etiqueta, confianza) a partir de arreglos de cajas, confianzas y clases.
+    """
+    return [(x1, y1, x2, y2, classNames[cls], round(float(conf) * 100, 2))
+            for (x1, y1, x2, y2), conf, cls in zip(boxes.tolist(), confs, classes.tolist())]
+
+def render_detections(frame, detections):
+    """
+    Dibuja los bounding boxes y etiquetas sobre el frame.
+    """
+    overlay = default_renderer()
+    for x1, y1, x2, y2, label, conf in detections:
+        # Dibujar bounding box y etiqueta
+        overlay.rectangle((x1, y1), (x2, y2), (0, 255, 0), 2)
+        overlay.text(f"{label} {conf}%", (x1, y1 - 10),
+                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
-    return frame
+    return overlay.flush(frame)
+
+def detect_arrays(frame, model):
+    """
+    Inferencia de un frame (por recortes si ``TILED_INFERENCE``).
+    :return: Tupla (cajas int (N, 4), confianzas (N,), clases int (N,)) en coordenadas del frame.
+    """
+    if TILED_INFERENCE:
+        # Recortes solapados en lote para frames de alta resolución
+        return default_tiled_detector(model)(frame)
+    return boxes_to_arrays(detect(frame, model).boxes)
+
+def process_frame(frame, model):
+    """
+    Procesa un frame para detectar objetos usando YOLO y dibuja los resultados.
+    """
+    with metrics.measure("inferencia"):
+        detections = detections_from_arrays(*detect_arrays(frame, model))
+    metrics.count("detecciones", len(detections))
+    with metrics.measure("dibujo"):
+        return render_detections(frame, detections)
+
+def pipeline_stages(model):
+    """
+    Etapas del pipeline concurrente (ver ``processing.pipeline``) para la detección COCO.
+    """
+    return [
+        Stage("inferencia", lambda frame: (frame, detect_arrays(frame, model))),
+        Stage("postproceso", lambda item: (item[0], detections_from_arrays(*item[1]))),
+        Stage("render", lambda item: render_detections(*item)),
+    ]
 
 def run_yolo_detection():
     """
     Ejecuta la detección de objetos usando YOLO en tiempo real.
     """
-    model = load_yolo_model()
-    cap = cv2.VideoCapture(1)  # Cambia a 0 si usas una cámara externa
-    cap.set(3, 1280)  # Ancho de la ventana
-    cap.set(4, 720)   # Alto de la ventana
+    if len(CAMERA_SOURCES) > 1:
+        # Varias cámaras comparten un único modelo con inferencia por lotes
+        server = get_server("coco", get_yolo_model)
+        run_streams(CAMERA_SOURCES, server, process_frame, "Detección YOLO", FRAME_WIDTH, FRAME_HEIGHT)
+        return
+
+    model = get_yolo_model()
+    if PIPELINE_MODE:
+        run_pipeline(pipeline_stages(model), "Detección YOLO", CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT)
+        return
+
+    metrics.begin("detección COCO")
+    grabber = FrameGrabber(CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, timer=metrics).start()
 
     print("Iniciando detección de objetos. Presiona 'q' para salir.")
     while True:
-        ret, frame = cap.read()
+        ret, frame = grabber.read()
         if not ret:
             print("Error: No se pudo capturar el video.")
             break
 
         # Procesar el frame
         frame = process_frame(frame, model)
-        cv2.imshow("Detección YOLO", frame)
+        cv2.imshow("Detección YOLO", metrics.end_frame(frame))
+        grabber.mark_displayed()
 
         # Salir con 'q'
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    cap.release()
+    grabber.stop()
     cv2.destroyAllWindows()
+    if metrics.enabled:
+        print(metrics.report())
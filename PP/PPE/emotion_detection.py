@@ -1,92 +1,183 @@
 import cv2
+import numpy as np
 from deepface import DeepFace
+from detection.model_registry import registry
+from processing.filters import FILTERS
+from detection.face_tracking import FaceEmotionTracker, HaarFaceDetector
+from detection.emotion_classifier import EmotionClassifier
+from detection.emotion_detection import FaceDetectionService
+from processing.capture import FrameGrabber
+from ui.overlays import default_renderer
+from processing.metrics import metrics
+from config import CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, FACE_DETECTOR
+
+
+def load_emotion_model():
+    """
+    Construye el modelo de emociones de DeepFace (DeepFace lo conserva en su caché interna).
+    """
+    try:
+        return DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+    except TypeError:
+        # Versiones anteriores de DeepFace no reciben ``task``
+        return DeepFace.build_model(model_name="Emotion")
+
+
+def warmup_emotion_model(model):
+    """
+    Ejecuta un análisis sobre una imagen negra para inicializar el grafo de TensorFlow.
+    """
+    DeepFace.analyze(np.zeros((48, 48, 3), dtype=np.uint8), actions=['emotion'], enforce_detection=False)
+
+
+def load_face_cascade():
+    """
+    Carga el clasificador Haar de rostros frontales.
+    """
+    return cv2.CascadeClassifier("assets/haarcascades/haarcascade_frontalface_default.xml")
+
+
+registry.register("emociones", load_emotion_model, warmup=warmup_emotion_model)
+registry.register("rostros_haar", load_face_cascade, size_mb=1)
+
+
+def classify_emotion(roi):
+    """
+    Clasifica la emoción dominante de un rostro con DeepFace.
+    :return: Emoción dominante o "unknown" si el análisis falla.
+    """
+    try:
+        result = DeepFace.analyze(roi, actions=['emotion'], enforce_detection=False)
+        # Manejar si el resultado es una lista
+        if isinstance(result, list):
+            result = result[0]
+        return result.get('dominant_emotion', 'unknown')
+    except Exception as e:
+        print(f"Error al detectar emoción: {e}")
+        return "unknown"
+
+
+def classify_emotions(rois):
+    """
+    Clasifica una lista de rostros llamando a DeepFace una vez por rostro.
+    Es la ruta de referencia; el modo en vivo usa ``EmotionClassifier`` por lotes.
+    """
+    return [classify_emotion(roi) for roi in rois]
+
+
+def create_emotion_tracker():
+    """
+    Crea el seguidor de rostros con el detector configurado (``config.FACE_DETECTOR``)
+    y el clasificador de emociones por lotes, ya cargado y calentado.
+    :return: Tupla (FaceEmotionTracker, EmotionClassifier).
+    """
+    if FACE_DETECTOR == "mediapipe":
+        face_detector = FaceDetectionService(min_detection_confidence=0.5, downscale=0.5)
+    else:
+        face_detector = HaarFaceDetector(registry.get("rostros_haar"), downscale=0.5)
+    classifier = EmotionClassifier(registry.get("emociones"))
+    return FaceEmotionTracker(face_detector), classifier
+
+
+def close_emotion_tracker(tracker):
+    """
+    Libera el detector de rostros del seguidor (el grafo de MediaPipe, si se usa).
+    """
+    if hasattr(tracker.detector, "close"):
+        tracker.detector.close()
+
+
+def render_emotions(frame, faces):
+    """
+    Aplica el filtro de cada emoción sobre su rostro y dibuja las etiquetas.
+    :param faces: Lista de (track_id, (x, y, w, h), emoción) de ``FaceEmotionTracker.update``.
+    """
+    overlay = default_renderer()
+    for track_id, (x, y, w, h), emotion in faces:
+        # Aplicar filtro según la emoción
+        roi = frame[y:y + h, x:x + w]
+        applied_filter = "none"
+        if emotion == "happy":
+            roi = apply_happy_filter(roi)
+            applied_filter = "Brillo"
+        elif emotion == "sad":
+            roi = apply_sad_filter(roi)
+            applied_filter = "Desenfoque"
+        elif emotion == "fear":
+            roi = apply_fear_filter(roi)
+            applied_filter = "Tonalidad"
+        frame[y:y + h, x:x + w] = roi
+
+        # Dibujar bounding box
+        overlay.rectangle((x, y), (x + w, y + h), (0, 255, 0), 2)
+
+        # Agregar etiqueta con emoción y filtro aplicado
+        label = f"Emoción: {emotion}, Filtro: {applied_filter}"
+        overlay.text(label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    return overlay.flush(frame)
 
 
 def detect_emotion():
     """
     Detecta emociones faciales y aplica un filtro dependiendo del estado de ánimo.
     """
-    haar_cascade = cv2.CascadeClassifier("assets/haarcascades/haarcascade_frontalface_default.xml")
-    cap = cv2.VideoCapture(1)
-    cap.set(3, 1280)
-    cap.set(4, 720)
+    # Cargar y calentar el modelo antes del primer frame
+    tracker, classifier = create_emotion_tracker()
+    last_emotions = {}
+    metrics.begin("emociones")
+    grabber = FrameGrabber(CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, timer=metrics).start()
 
     print("Iniciando detección de emociones. Presiona 'q' para salir.")
     while True:
-        ret, frame = cap.read()
+        ret, frame = grabber.read()
         if not ret:
             print("Error: No se pudo capturar el video.")
             break
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        objects = haar_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-
-        for (x, y, w, h) in objects:
-            roi = frame[y:y + h, x:x + w]
-            emotion = "unknown"
-            applied_filter = "none"
-            if roi.size > 0:
-                try:
-                    # Usar DeepFace para detectar emociones
-                    result = DeepFace.analyze(roi, actions=['emotion'], enforce_detection=False)
-
-                    # Manejar si el resultado es una lista
-                    if isinstance(result, list):
-                        result = result[0]
-
-                    emotion = result.get('dominant_emotion', 'unknown')
-                    print(f"Emoción detectada: {emotion}")
-
-                    # Aplicar filtro según la emoción
-                    if emotion == "happy":
-                        roi = apply_happy_filter(roi)
-                        applied_filter = "Brillo"
-                    elif emotion == "sad":
-                        roi = apply_sad_filter(roi)
-                        applied_filter = "Desenfoque"
-                    elif emotion == "fear":
-                        roi = apply_fear_filter(roi)
-                        applied_filter = "Tonalidad"
-
-                    frame[y:y + h, x:x + w] = roi
-                except Exception as e:
-                    print(f"Error al detectar emoción: {e}")
-
-            # Dibujar bounding box
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-            # Agregar etiqueta con emoción y filtro aplicado
-            label = f"Emoción: {emotion}, Filtro: {applied_filter}"
-            cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-        cv2.imshow("Detección de Emociones", frame)
+        with grabber.timer.measure("rostros y emociones"):
+            faces = tracker.update(frame, classifier.classify)
+        metrics.count("rostros", len(faces))
+
+        for track_id, _, emotion in faces:
+            if last_emotions.get(track_id) != emotion:
+                print(f"Emoción detectada (rostro {track_id}): {emotion}")
+                last_emotions[track_id] = emotion
+
+        with metrics.measure("filtros y dibujo"):
+            frame = render_emotions(frame, faces)
+        cv2.imshow("Detección de Emociones", metrics.end_frame(frame))
+        grabber.mark_displayed()
 
         # Salir con 'q'
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
-    cap.release()
+    grabber.stop()
     cv2.destroyAllWindows()
+    close_emotion_tracker(tracker)
+    if metrics.enabled:
+        print(metrics.report())
+    print(f"Detecciones de rostros: {tracker.detections}, clasificaciones: {tracker.classifications} "
+          f"en {tracker.frame_index} frames")
 
 
 def apply_happy_filter(roi):
     """
     Aplica un filtro de brillo a la región de interés.
     """
-    return cv2.convertScaleAbs(roi, alpha=1.5, beta=50)
+    return FILTERS["Happy"](roi)
 
 
 def apply_sad_filter(roi):
     """
     Aplica un filtro de desenfoque a la región de interés.
     """
-    return cv2.GaussianBlur(roi, (15, 15), 0)
+    return FILTERS["Sad"](roi)
 
 
 def apply_fear_filter(roi):
     """
     Cambia la tonalidad de la región de interés.
     """
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    hsv[:, :, 0] = (hsv[:, :, 0] + 50) % 180
-    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    return FILTERS["Fear"](roi)
@@ -1,6 +1,13 @@
 import cv2
 import mediapipe as mp
-import numpy as np
+from processing.filters import apply_filter
+from detection.hand_tracking import AdaptiveHandTracker
+from detection.gesture_engine import NO_GESTURE, GestureSmoother, classify_hands, landmarks_to_array
+from processing.capture import FrameGrabber
+from processing.timing import StageTimer
+from ui.overlays import default_renderer
+from processing.metrics import metrics
+from config import CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, GESTURE_ADAPTIVE
 
 # Inicializar Mediapipe
 mp_hands = mp.solutions.hands
@@ -39,131 +46,119 @@ gesture_to_filter = {
     "Two Fingers Crossed": "Solarization"
 }
 
+def create_hands(adaptive=GESTURE_ADAPTIVE):
+    """
+    Instancia de ``mp_hands.Hands`` para ``GestureFilterSession``. Con el seguimiento
+    adaptativo se crea en modo imagen: el tracker alterna regiones y frames reducidos
+    de tamaños distintos, y el seguimiento entre frames de MediaPipe llevaría los
+    landmarks de las coordenadas de una imagen a las de otra.
+    """
+    return mp_hands.Hands(static_image_mode=adaptive, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+
+class GestureFilterSession:
+    """
+    Estado del modo gestos entre frames: seguimiento de manos, suavizado del gesto
+    y último frame renderizado (para reutilizarlo cuando la escena no cambia).
+    """
+
+    def __init__(self, hands, adaptive=GESTURE_ADAPTIVE, timer=None):
+        """
+        :param hands: Instancia de ``mp.solutions.hands.Hands`` (ver ``create_hands``).
+        :param adaptive: Usar ``AdaptiveHandTracker`` (región de la mano y omisión de frames quietos).
+        :param timer: ``StageTimer`` donde registrar los tiempos por etapa.
+        """
+        self.hands = hands
+        self.tracker = AdaptiveHandTracker(hands) if adaptive else None
+        self.smoother = GestureSmoother()
+        self.timer = timer or StageTimer()
+        self.overlay = default_renderer()
+        self.gesture = NO_GESTURE
+        self._last_output = None
+        self._last_gesture = None
+
+    def process(self, frame):
+        """
+        Detecta el gesto del frame y aplica su filtro.
+        :return: Frame a mostrar.
+        """
+        # Procesar frame con Mediapipe (región alrededor de la mano, o nada si no hubo movimiento)
+        with self.timer.measure("detección manos"):
+            if self.tracker is not None:
+                hand_landmarks_list, inferred = self.tracker.process(frame)
+            else:
+                results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                hand_landmarks_list, inferred = results.multi_hand_landmarks, True
+
+        self.timer.count("manos", len(hand_landmarks_list or ()))
+
+        # Clasificar todas las manos a la vez y estabilizar el gesto entre frames
+        h, w = frame.shape[:2]
+        gestures = classify_hands(landmarks_to_array(hand_landmarks_list), aspect=w / h)
+        gesture = self.gesture = self.smoother.update(gestures[-1] if len(gestures) else NO_GESTURE)
+        filter_type = gesture_to_filter.get(gesture)
+
+        # Escena quieta y mismo gesto: reutilizar el último frame renderizado. Se devuelve una
+        # copia: quien lo recibe dibuja encima (p. ej. el HUD de metrics.end_frame)
+        if not inferred and self._last_output is not None and gesture == self._last_gesture:
+            return self._last_output.copy()
+
+        if hand_landmarks_list:
+            for hand_landmarks in hand_landmarks_list:
+                # Dibujar puntos de referencia en la mano
+                mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+        # Aplicar el filtro global si se detectó un gesto
+        if filter_type:
+            with self.timer.measure("filtro"):
+                frame = apply_filter(frame, filter_type)
+
+        # Mostrar el gesto detectado
+        self.overlay.text(f"Gesto: {gesture}", (50, 50),
+                          cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+        # Mostrar el filtro aplicado
+        if filter_type:
+            self.overlay.text(f"Filtro Aplicado: {filter_type}", (50, 100),
+                              cv2.FONT_HERSHEY_SIMPLEX, 1, filter_colors.get(filter_type, (255, 255, 255)), 2)
+        with self.timer.measure("dibujo"):
+            self.overlay.flush(frame)
+
+        if self.tracker is not None:
+            self._last_output, self._last_gesture = frame.copy(), gesture
+        return frame
+
 def detect_and_apply_filters():
     """
     Detecta gestos de la mano y aplica un filtro global a toda la pantalla basado en el gesto.
     """
-    cap = cv2.VideoCapture(1)
-    cap.set(3, 1280)
-    cap.set(4, 720)
+    metrics.begin("gestos")
+    grabber = FrameGrabber(CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, timer=metrics).start()
 
-    with mp_hands.Hands(min_detection_confidence=0.5, min_tracking_confidence=0.5) as hands:
+    with create_hands() as hands:
+        session = GestureFilterSession(hands, timer=grabber.timer)
         print("Iniciando detección de gestos y aplicación de filtros. Presiona 'q' para salir.")
         while True:
-            ret, frame = cap.read()
+            ret, frame = grabber.read()
             if not ret:
                 print("Error: No se pudo capturar el video.")
                 break
 
-            # Convertir frame a RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Procesar frame con Mediapipe
-            results = hands.process(rgb_frame)
-
-            gesture = "No Gesture"
-            filter_type = None
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    # Dibujar puntos de referencia en la mano
-                    mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-                    # Detectar gesto basado en posiciones clave
-                    gesture = detect_gesture(hand_landmarks)
-                    filter_type = gesture_to_filter.get(gesture)
-
-            # Aplicar el filtro global si se detectó un gesto
-            if filter_type:
-                frame = apply_filter(frame, filter_type)
-
-            # Mostrar el gesto detectado
-            cv2.putText(frame, f"Gesto: {gesture}", (50, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-
-            # Mostrar el filtro aplicado
-            if filter_type:
-                cv2.putText(frame, f"Filtro Aplicado: {filter_type}", (50, 100),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, filter_colors.get(filter_type, (255, 255, 255)), 2)
-
-            cv2.imshow("Detección de Gestos y Filtros", frame)
+            cv2.imshow("Detección de Gestos y Filtros", metrics.end_frame(session.process(frame)))
+            grabber.mark_displayed()
 
             # Salir con 'q'
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-    cap.release()
+    grabber.stop()
     cv2.destroyAllWindows()
+    if metrics.enabled:
+        print(metrics.report())
+    if session.tracker is not None:
+        print(f"Seguimiento adaptativo de manos: {session.tracker.stats}")
 
 def detect_gesture(hand_landmarks):
     """
-    Detecta el gesto realizado basado en las posiciones clave de los dedos.
+    Detecta el gesto realizado basado en las posiciones de los 21 puntos de la mano.
     """
-    wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-    index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-    pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-
-    if index_tip.y < wrist.y and pinky_tip.y < wrist.y:
-        return "Open Hand"
-    elif index_tip.y > wrist.y and pinky_tip.y > wrist.y:
-        return "Fist"
-    elif index_tip.y < wrist.y and pinky_tip.y > wrist.y:
-        return "Pointing"
-    elif index_tip.y < wrist.y and thumb_tip.y < wrist.y:
-        return "Victory"
-    elif thumb_tip.y < wrist.y and index_tip.y > wrist.y:
-        return "Thumbs Up"
-    elif thumb_tip.y > wrist.y and index_tip.y > wrist.y:
-        return "Thumbs Down"
-    elif pinky_tip.x > wrist.x and thumb_tip.x < wrist.x:
-        return "Palm Sideways"
-    elif abs(index_tip.x - thumb_tip.x) < 0.05:
-        return "OK Sign"
-    elif all(landmark.y < wrist.y for landmark in [index_tip, pinky_tip]):
-        return "Five Fingers Spread"
-    elif index_tip.x < thumb_tip.x and pinky_tip.x > thumb_tip.x:
-        return "Two Fingers Crossed"
-    return "No Gesture"
-
-def apply_filter(frame, filter_type):
-    """
-    Aplica un filtro a toda la pantalla basado en el tipo de filtro.
-    """
-    if filter_type == "Gaussian Blur":
-        return cv2.GaussianBlur(frame, (15, 15), 0)
-    elif filter_type == "Sobel":
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        abs_sobel_x = cv2.convertScaleAbs(sobel_x)
-        abs_sobel_y = cv2.convertScaleAbs(sobel_y)
-        return cv2.merge((abs_sobel_x, abs_sobel_y, gray))
-    elif filter_type == "Laplacian":
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        abs_laplacian = cv2.convertScaleAbs(laplacian)
-        return cv2.merge((abs_laplacian, abs_laplacian, abs_laplacian))
-    elif filter_type == "Smooth":
-        return cv2.blur(frame, (15, 15))
-    elif filter_type == "Negative":
-        return cv2.bitwise_not(frame)
-    elif filter_type == "Sepia":
-        sepia_filter = np.array([[0.272, 0.534, 0.131],
-                                 [0.349, 0.686, 0.168],
-                                 [0.393, 0.769, 0.189]])
-        return cv2.transform(frame, sepia_filter)
-    elif filter_type == "Color Shift":
-        b, g, r = cv2.split(frame)
-        return cv2.merge((r, g, b))
-    elif filter_type == "Canny":
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 100, 200)
-        return cv2.merge((edges, edges, edges))
-    elif filter_type == "Pixelation":
-        h, w = frame.shape[:2]
-        temp = cv2.resize(frame, (w // 10, h // 10), interpolation=cv2.INTER_LINEAR)
-        return cv2.resize(temp, (w, h), interpolation=cv2.INTER_NEAREST)
-    elif filter_type == "Solarization":
-        return cv2.bitwise_not(cv2.threshold(frame, 127, 255, cv2.THRESH_BINARY)[1])
-    return frame
+    return str(classify_hands(landmarks_to_array([hand_landmarks]))[0])
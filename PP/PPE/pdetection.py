@@ -1,26 +1,21 @@
-from ultralytics import YOLO
-import cv2
-import cvzone
-import math
+import numpy as np
+import threading
+from processing.pipeline import Stage
+from processing.roi_filters import default_engine
+from detection.model_registry import registry, warmup_yolo
+from detection.backends import load_yolo
+from processing.letterbox import boxes_to_arrays
+from processing.knowledge_base import knowledge_base
+from detection.product_tracking import ProductOverlayCache
+from detection.interpolation import DetectionInterpolator
+from detection.tiling import default_tiled_detector
+from detection.color_gate import color_gate
+from ui.overlays import default_renderer
+from processing.metrics import metrics
+from config import COLOR_GATE, TILED_INFERENCE
 
-# Definir las clases y sus colores
+# Clases del modelo (en el orden de entrenamiento); colores y saludabilidad vienen de la base de conocimiento
 classNames = ['apple', 'instant_noodle', 'juice', 'orange', 'sandwich']
-classColors = {
-    'apple': (0, 255, 0),          # Verde
-    'instant_noodle': (0, 255, 255), # Amarillo
-    'juice': (255, 165, 0),        # Naranja
-    'orange': (255, 0, 0),         # Rojo
-    'sandwich': (128, 0, 128),     # Morado
-}
-
-# Saludabilidad de cada clase (0 a 100)
-healthiness_score = {
-    'apple': 90,               # Muy saludable
-    'instant_noodle': 30,      # Poco saludable
-    'juice': 60,               # Moderadamente saludable
-    'orange': 85,              # Muy saludable
-    'sandwich': 50             # Moderado
-}
 
 # Filtros según saludabilidad
 def get_filter_by_healthiness(score):
@@ -38,76 +33,149 @@ def get_filter_by_healthiness(score):
 
 def load_model(model_path="PP/PPE/best.pt"):
     """
-    Carga el modelo YOLO desde el archivo especificado.
+    Carga el modelo YOLO desde el archivo especificado, con el backend configurado
+    (``config.INFERENCE_BACKEND``).
     """
     print(f"Cargando modelo YOLO desde {model_path}...")
-    model = YOLO(model_path)
+    model = load_yolo(model_path)
     print("Modelo YOLO cargado correctamente.")
     return model
 
-def apply_filter(roi, filter_type):
-    """
-    Aplica un filtro a la región de interés.
-    """
-    if filter_type == "Gaussian Blur":
-        return cv2.GaussianBlur(roi, (15, 15), 0)
-    elif filter_type == "Sobel":
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        abs_sobel_x = cv2.convertScaleAbs(sobel_x)
-        abs_sobel_y = cv2.convertScaleAbs(sobel_y)
-        return cv2.merge((abs_sobel_x, abs_sobel_y, gray))
-    elif filter_type == "Laplacian":
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        abs_laplacian = cv2.convertScaleAbs(laplacian)
-        return cv2.merge((abs_laplacian, abs_laplacian, abs_laplacian))
-    elif filter_type == "Smooth":
-        return cv2.blur(roi, (15, 15))
-    return roi
+registry.register("productos", load_model, warmup=warmup_yolo)
+
+def get_model():
+    """
+    Devuelve el modelo de productos del registro compartido (se carga una sola vez).
+    """
+    return registry.get("productos")
+
+def detect(frame, model):
+    """
+    Ejecuta la inferencia YOLO sobre el frame.
+    :return: Resultado de ultralytics para el frame.
+    """
+    return model(frame, verbose=False)[0]
+
+def extract_detections(result):
+    """
+    Convierte el resultado de YOLO en detecciones con clase, saludabilidad y filtro.
+    :return: Lista de tuplas (x1, y1, x2, y2, conf, clase, saludabilidad, filtro).
+    """
+    # Cajas, confianzas y clases de todas las detecciones en una sola copia
+    return detections_from_arrays(*boxes_to_arrays(result.boxes))
+
+def detections_from_arrays(boxes, confs, classes):
+    """
+    Detecciones con clase, saludabilidad y filtro a partir de arreglos de cajas,
+    confianzas y clases (de ``boxes_to_arrays`` o de ``TiledDetector``).
+    """
+    kb = knowledge_base()
+    detections = []
+    for (x1, y1, x2, y2), conf, cls in zip(boxes.tolist(), np.ceil(confs * 100) / 100, classes.tolist()):
+        # Obtener clase y puntaje de saludabilidad
+        conf = float(conf)
+        current_class = classNames[cls]
+        health_score = kb.healthiness(current_class)
+        filter_type = get_filter_by_healthiness(health_score)
+        detections.append((x1, y1, x2, y2, conf, current_class, health_score, filter_type))
+    return detections
+
+_overlay_caches = threading.local()
+
+def overlay_cache():
+    """
+    Caché de etiquetas por producto seguido del hilo actual (un hilo por stream de video).
+    """
+    cache = getattr(_overlay_caches, "cache", None)
+    if cache is None:
+        cache = _overlay_caches.cache = ProductOverlayCache(get_filter_by_healthiness)
+    return cache
+
+def render_detections(frame, detections, cache=None):
+    """
+    Aplica los filtros por saludabilidad y dibuja las etiquetas de cada detección.
+    Los textos se calculan una vez por producto seguido y las etiquetas rasterizadas se reutilizan entre frames.
+    """
+    entries = (cache or overlay_cache()).update(detections)
+
+    # Aplicar filtro según la saludabilidad (cada filtro se calcula una vez por frame)
+    with metrics.measure("filtros"):
+        default_engine().apply(frame, [(x1, y1, x2, y2, entry["filter"])
+                                       for (x1, y1, x2, y2, *_), entry in zip(detections, entries)])
+
+    overlay = default_renderer()
+    for (x1, y1, x2, y2, *_), entry in zip(detections, entries):
+        # Bounding box y etiquetas (rasterizadas una vez y reutilizadas desde la caché de sprites)
+        overlay.rectangle((x1, y1), (x2, y2), entry["color"], 3)
+        overlay.text_rect(entry["label"], (x1, y1 - 45), scale=1, thickness=2, offset=10, colorB=entry["color"])
+        overlay.text_rect(entry["filter_label"], (x1, y1 - 15), scale=0.8, thickness=2, offset=10,
+                          colorB=(0, 255, 255))
+        overlay.text_rect(entry["health_label"], (x1, y2 + 15), scale=0.8, thickness=2, offset=10,
+                          colorB=(255, 255, 255))
+        if entry["recommendation_label"] is not None:
+            overlay.text_rect(entry["recommendation_label"], (x1, y2 + 45), scale=0.8, thickness=2, offset=10)
+
+    with metrics.measure("dibujo"):
+        return overlay.flush(frame)
+
+def detect_arrays(frame, model, tiler=None):
+    """
+    Inferencia de un frame, con la inferencia por recortes y el filtro de color si están activos.
+    :param tiler: ``TiledDetector`` del stream; por defecto el del hilo actual si ``TILED_INFERENCE``.
+    :return: Tupla (cajas int (N, 4), confianzas (N,), clases int (N,)) en coordenadas del frame.
+    """
+    if tiler is None and TILED_INFERENCE:
+        tiler = default_tiled_detector(model)
+    gate = color_gate()
+
+    def detect_frame(image):
+        # Recortes solapados en lote para frames de alta resolución, o el frame completo
+        return tiler(image) if tiler is not None else boxes_to_arrays(detect(image, model).boxes)
+
+    def detect_batch(images):
+        return [boxes_to_arrays(result.boxes) for result in model(images, verbose=False)]
+
+    with metrics.measure("inferencia"):
+        if gate is not None:
+            # Sin manchas de los colores de los productos no se llama al modelo; con "crops" los
+            # recortes de las manchas reemplazan a la inferencia por recortes
+            return gate.detect(frame, detect_frame, detect_batch, crops=COLOR_GATE == "crops")
+        return detect_frame(frame)
+
+def detect_products(frame, model, tiler=None):
+    """
+    Inferencia y postproceso de un frame.
+    :param tiler: ``TiledDetector`` del stream (ver ``detect_arrays``).
+    :return: Detecciones de ``detections_from_arrays``.
+    """
+    arrays = detect_arrays(frame, model, tiler)
+    with metrics.measure("postproceso"):
+        detections = detections_from_arrays(*arrays)
+    metrics.count("detecciones", len(detections))
+    return detections
 
 def process_frame(frame, model, brightness=50, blur=0, hue=0):
     """
     Procesa el frame con el modelo YOLO y aplica filtros opcionales a las regiones detectadas.
     """
-    results = model(frame, stream=True)
-
-    for r in results:
-        boxes = r.boxes
-        for box in boxes:
-            # Coordenadas del bounding box
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-            # Extraer la región de interés (ROI)
-            roi = frame[y1:y2, x1:x2]
-
-            # Obtener clase y puntaje de saludabilidad
-            conf = math.ceil((box.conf[0] * 100)) / 100
-            cls = int(box.cls[0])
-            current_class = classNames[cls]
-            health_score = healthiness_score.get(current_class, 0)
-            filter_type = get_filter_by_healthiness(health_score)
-
-            # Aplicar filtro según la saludabilidad
-            if roi.size > 0:
-                roi_filtered = apply_filter(roi, filter_type)
-                frame[y1:y2, x1:x2] = roi_filtered  # Reemplazar en la imagen original
-
-            # Estilo del bounding box y etiqueta
-            color = classColors.get(current_class, (0, 255, 255))
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
-
-            # Texto en la etiqueta
-            label = f'{current_class}: {conf}%'
-            filter_label = f"Filtro: {filter_type}"
-            health_label = f"Saludabilidad: {health_score}"
-
-            # Dibujar la etiqueta usando cvzone con texto más grande
-            cvzone.putTextRect(frame, label, (x1, y1 - 45), scale=1, thickness=2, offset=10, colorB=color)
-            cvzone.putTextRect(frame, filter_label, (x1, y1 - 15), scale=0.8, thickness=2, offset=10,
-                               colorB=(0, 255, 255))
-            cvzone.putTextRect(frame, health_label, (x1, y2 + 15), scale=0.8, thickness=2, offset=10,
-                               colorB=(255, 255, 255))
-
-    return frame
+    return render_detections(frame, detect_products(frame, model))
+
+def create_interpolator(model, every):
+    """
+    Clasificación con detección cada ``every`` frames (o ``"auto"``) y cajas
+    desplazadas con flujo óptico entre detecciones.
+    """
+    adaptive = every == "auto"
+    return DetectionInterpolator(lambda frame: detect_products(frame, model),
+                                 every=2 if adaptive else int(every), adaptive=adaptive)
+
+def pipeline_stages(model):
+    """
+    Etapas del pipeline concurrente (ver ``processing.pipeline``) para la clasificación.
+    """
+    return [
+        # La inferencia incluye los recortes y el filtro de color, como en detect_products
+        Stage("inferencia", lambda frame: (frame, detect_arrays(frame, model))),
+        Stage("postproceso", lambda item: (item[0], detections_from_arrays(*item[1]))),
+        Stage("render", lambda item: render_detections(*item)),
+    ]
@@ -0,0 +1,246 @@
+"""
+Procesamiento offline (sin interfaz) de videos y directorios de imágenes con el
+clasificador de productos. Escribe una línea JSON por frame con las detecciones y su
+saludabilidad, y puede reanudarse sobre el mismo archivo de salida. La cantidad real
+de frames de los videos que terminaron antes de lo anunciado por su contenedor, o que
+no la anuncian, se guarda junto a la salida (``<salida>.frames.json``).
+
+Ejemplo:
+    python batch_process.py videos/ fotos/ -o resultados.jsonl --workers 4 --annotated salida/
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+
+import cv2
+
+from processing.capture import IMAGE_EXTENSIONS
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+
+_model = None
+_annotated_dir = None
+
+
+def count_frames(path):
+    """
+    Cuenta los frames de un video leyéndolo hasta el final (sin decodificarlos).
+    """
+    cap = cv2.VideoCapture(path)
+    total = 0
+    while cap.grab():
+        total += 1
+    cap.release()
+    return total
+
+
+def collect_units(inputs, chunk_size, frame_counts=None):
+    """
+    Genera las unidades de trabajo: una por imagen y una por bloque de frames de video.
+    :param inputs: Rutas a videos, imágenes o directorios.
+    :param chunk_size: Frames de video por unidad.
+    :param frame_counts: Frames reales por video (ver ``load_frame_counts``); tienen prioridad
+                         sobre la cantidad que anuncia el contenedor. Los videos que no la
+                         anuncian se cuentan una vez y se agregan a este diccionario.
+    :return: Lista de tuplas (ruta, frame_inicial, frame_final, es_video).
+    """
+    frame_counts = {} if frame_counts is None else frame_counts
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                paths.extend(os.path.join(root, name) for name in sorted(names))
+        else:
+            paths.append(path)
+
+    units = []
+    for path in sorted(paths):
+        ext = os.path.splitext(path)[1].lower()
+        if ext in IMAGE_EXTENSIONS:
+            units.append((path, 0, 1, False))
+        elif ext in VIDEO_EXTENSIONS:
+            total = frame_counts.get(path)
+            if total is None:
+                cap = cv2.VideoCapture(path)
+                total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                cap.release()
+                if total <= 0:
+                    # Sin cantidad de frames no se puede dividir en bloques: contar una vez
+                    print(f"{path}: cantidad de frames desconocida; contando...")
+                    total = frame_counts[path] = count_frames(path)
+            for start in range(0, total, chunk_size):
+                units.append((path, start, min(start + chunk_size, total), True))
+    return units
+
+
+def load_done(output_path):
+    """
+    Lee el archivo de salida existente y devuelve los (ruta, frame) ya procesados.
+    Si la última línea quedó truncada por una interrupción, se elimina.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done.add((record["source"], record["frame"]))
+    return done
+
+
+def _frame_counts_path(output_path):
+    return f"{output_path}.frames.json"
+
+
+def load_frame_counts(output_path):
+    """
+    Frames realmente leídos de los videos que terminaron antes de lo anunciado
+    (o sin cantidad conocida), por ruta.
+    """
+    path = _frame_counts_path(output_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_frame_counts(output_path, counts):
+    path = _frame_counts_path(output_path)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(counts, f, ensure_ascii=False, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def worker_init(workers, annotated_dir):
+    """
+    Inicializa cada proceso: reparte los hilos de CPU y carga el modelo una vez.
+    """
+    global _model, _annotated_dir
+    import torch
+    from PP.PPE.pdetection import get_model
+
+    cv2.setNumThreads(1)
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _model = get_model()
+    _annotated_dir = annotated_dir
+
+
+def _annotate(frame, detections, path, index, is_video):
+    from PP.PPE.pdetection import ProductOverlayCache, get_filter_by_healthiness, render_detections
+
+    # Los frames de un video comparten etiquetas por producto; las imágenes sueltas no
+    cache = None if is_video else ProductOverlayCache(get_filter_by_healthiness)
+    render_detections(frame, detections, cache)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if is_video:
+        out_path = os.path.join(_annotated_dir, stem, f"{index:06d}.jpg")
+    else:
+        out_path = os.path.join(_annotated_dir, f"{stem}.jpg")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    cv2.imwrite(out_path, frame)
+
+
+def process_unit(unit):
+    """
+    Procesa una unidad de trabajo.
+    :return: Tupla (ruta, registros (uno por frame), índice en el que terminó el video
+             antes del final de la unidad o None).
+    """
+    from PP.PPE.pdetection import detect, extract_detections
+
+    path, start, end, is_video = unit
+    records = []
+    eof = None
+    if is_video:
+        cap = cv2.VideoCapture(path)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frames = ((index, cap.read()[1]) for index in range(start, end))
+    else:
+        cap = None
+        frames = iter([(0, cv2.imread(path))])
+
+    for index, frame in frames:
+        if frame is None:
+            if is_video:
+                eof = index
+            break
+        detections = extract_detections(detect(frame, _model))
+        records.append({
+            "source": path,
+            "frame": index,
+            "detections": [
+                {
+                    "class": current_class,
+                    "conf": float(conf),
+                    "box": [x1, y1, x2, y2],
+                    "healthiness": health_score,
+                    "filter": filter_type,
+                }
+                for x1, y1, x2, y2, conf, current_class, health_score, filter_type in detections
+            ],
+        })
+        if _annotated_dir:
+            _annotate(frame, detections, path, index, is_video)
+
+    if cap is not None:
+        cap.release()
+    return path, records, eof
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificación de productos offline sobre videos e imágenes.")
+    parser.add_argument("inputs", nargs="+", help="Videos, imágenes o directorios a procesar")
+    parser.add_argument("-o", "--output", default="resultados.jsonl", help="Archivo JSON lines de salida")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Número de procesos")
+    parser.add_argument("--annotated", default=None, help="Directorio para guardar los frames anotados")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Frames de video por unidad de trabajo")
+    args = parser.parse_args(argv)
+
+    done = load_done(args.output)
+    frame_counts = load_frame_counts(args.output)
+    known = len(frame_counts)
+    units = [
+        unit for unit in collect_units(args.inputs, args.chunk_size, frame_counts)
+        if any((unit[0], index) not in done for index in range(unit[1], unit[2]))
+    ]
+    if len(frame_counts) != known:
+        save_frame_counts(args.output, frame_counts)
+    print(f"{len(done)} frames ya procesados; {len(units)} unidades pendientes.")
+    if not units:
+        return
+
+    start = time.perf_counter()
+    frames = 0
+    ctx = mp.get_context("spawn")
+    with open(args.output, "a", encoding="utf-8") as out, \
+            ctx.Pool(args.workers, initializer=worker_init, initargs=(args.workers, args.annotated)) as pool:
+        for path, records, eof in pool.imap_unordered(process_unit, units):
+            if eof is not None and eof < frame_counts.get(path, eof + 1):
+                # Un bloque que empieza después del final real termina en su primer frame: el
+                # menor índice de fin es la cantidad real de frames
+                frame_counts[path] = eof
+                save_frame_counts(args.output, frame_counts)
+            for record in records:
+                if (record["source"], record["frame"]) in done:
+                    continue
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                frames += 1
+            out.flush()
+            elapsed = time.perf_counter() - start
+            print(f"\r{frames} frames  {frames / elapsed:.1f} FPS", end="", flush=True)
+    print(f"\nListo: {frames} frames en {time.perf_counter() - start:.1f} s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compara velocidad y precisión de los backends de inferencia (PyTorch FP32, ONNX,
+OpenVINO, y sus variantes INT8) sobre los mismos frames. La referencia de precisión
+son las detecciones de PyTorch.
+
+Ejemplo:
+    python -m benchmarks.backends --weights PP/PPE/best.pt --clip videos/pasillo.mp4 \\
+        --backends pytorch onnx openvino openvino-int8 --calibration calibracion/ --output backends.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.interpolation import match
+from benchmarks.modes import clip_frames, percentiles, synthetic_frames
+
+VARIANTS = ("pytorch", "onnx", "onnx-int8", "openvino", "openvino-int8")
+
+
+def detections_of(result):
+    """
+    Detecciones de un resultado de ultralytics como (x1, y1, x2, y2, conf, clase).
+    """
+    boxes = result.boxes
+    xyxy = boxes.xyxy.cpu().numpy() if len(boxes) else np.empty((0, 4))
+    return [(*map(float, box), float(conf), int(cls))
+            for box, conf, cls in zip(xyxy, boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy())]
+
+
+def run_variant(variant, weights, frames, imgsz, calibration, warmup=3):
+    from detection.backends import load_yolo
+
+    backend, _, precision = variant.partition("-")
+    start = time.perf_counter()
+    model = load_yolo(weights, backend=backend, int8=precision == "int8", imgsz=imgsz, calibration=calibration)
+    load_s = time.perf_counter() - start
+    for frame in frames[:warmup]:
+        model(frame, imgsz=imgsz, verbose=False)
+    latencies, outputs = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        result = model(frame, imgsz=imgsz, verbose=False)[0]
+        latencies.append(time.perf_counter() - start)
+        outputs.append(detections_of(result))
+    return load_s, latencies, outputs
+
+
+def agreement(reference, outputs):
+    """
+    Coincidencia con la referencia: IoU media de las cajas asociadas, recall y precisión.
+    """
+    ious, matched, ref_total, out_total = [], 0, 0, 0
+    for ref, out in zip(reference, outputs):
+        pairs = match(ref, out)
+        ious.extend(p[0] for p in pairs)
+        matched += len(pairs)
+        ref_total += len(ref)
+        out_total += len(out)
+    return {
+        "mean_iou": round(float(np.mean(ious)), 3) if ious else None,
+        "recall": round(matched / ref_total, 3) if ref_total else None,
+        "precision": round(matched / out_total, 3) if out_total else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Velocidad y precisión de los backends de inferencia YOLO.")
+    parser.add_argument("--weights", default="PP/PPE/best.pt")
+    parser.add_argument("--backends", nargs="+", choices=VARIANTS, default=["pytorch", "onnx", "openvino"])
+    parser.add_argument("--calibration", default=None, help="Directorio de imágenes para INT8")
+    parser.add_argument("--clip", default=None, help="Video o directorio de imágenes (por defecto, frames sintéticos)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    source = clip_frames(args.clip, args.frames, 1280, 720) if args.clip else synthetic_frames(args.frames)
+    frames = list(source)
+    variants = ["pytorch"] + [v for v in args.backends if v != "pytorch"]
+
+    rows, reference = {}, None
+    print(f"{'backend':<15} {'carga (s)':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'FPS':>7} {'IoU':>6} {'recall':>7}")
+    for variant in variants:
+        try:
+            load_s, latencies, outputs = run_variant(variant, args.weights, frames, args.imgsz, args.calibration)
+        except Exception as e:
+            rows[variant] = {"error": f"{type(e).__name__}: {e}"}
+            print(f"{variant:<15} error: {rows[variant]['error']}")
+            if variant == "pytorch":
+                break  # sin referencia no hay comparación posible
+            continue
+        if reference is None:
+            reference = outputs
+        lat = percentiles(latencies)
+        rows[variant] = {
+            "load_s": round(load_s, 2),
+            "latency_ms": lat,
+            "fps": round(len(latencies) / sum(latencies), 2),
+            **agreement(reference, outputs),
+        }
+        r = rows[variant]
+        print(f"{variant:<15} {r['load_s']:>9.2f} {lat['p50']:>9.2f} {lat['p95']:>9.2f} {r['fps']:>7.1f} "
+              f"{r['mean_iou'] if r['mean_iou'] is not None else '-':>6} {r['recall'] if r['recall'] is not None else '-':>7}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"weights": args.weights, "frames": len(frames), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
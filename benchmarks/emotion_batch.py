@@ -0,0 +1,76 @@
+"""
+Compara la clasificación de emociones por rostro (DeepFace.analyze en bucle) contra
+``EmotionClassifier`` por lotes.
+
+Ejemplo:
+    python -m benchmarks.emotion_batch --faces 1 5 10 20 --image foto.jpg
+"""
+import argparse
+import json
+import time
+
+import cv2
+import numpy as np
+
+
+def load_crops(image_path, count, size=120):
+    """
+    Genera ``count`` recortes de rostro: de los rostros de la imagen si se indica,
+    o recortes sintéticos si no.
+    """
+    if image_path:
+        from PP.PPE.emotion_detection import registry
+        image = cv2.imread(image_path)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        faces = registry.get("rostros_haar").detectMultiScale(gray, 1.1, 5, minSize=(30, 30))
+        crops = [image[y:y + h, x:x + w] for (x, y, w, h) in faces] or [image]
+    else:
+        rng = np.random.default_rng(0)
+        crops = [rng.integers(0, 255, (size, size, 3), dtype=np.uint8) for _ in range(4)]
+    return [crops[i % len(crops)] for i in range(count)]
+
+
+def timed(fn, rois, repeats):
+    fn(rois)  # calentamiento
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn(rois)
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de emociones por rostro vs. por lotes.")
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--image", default=None, help="Imagen con rostros (opcional)")
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    from PP.PPE.emotion_detection import classify_emotions, registry
+    from detection.emotion_classifier import EmotionClassifier
+
+    classifier = EmotionClassifier(registry.get("emociones"))
+    rows = []
+    print(f"{'rostros':>8} {'por rostro (ms)':>16} {'por lotes (ms)':>15} {'aceleración':>12} {'coincidencia':>13}")
+    for count in args.faces:
+        rois = load_crops(args.image, count)
+        per_face, labels_a = timed(classify_emotions, rois, args.repeats)
+        batched, labels_b = timed(classifier.classify, rois, args.repeats)
+        agreement = sum(a == b for a, b in zip(labels_a, labels_b)) / count
+        rows.append({
+            "faces": count,
+            "per_face_ms": round(per_face * 1000, 2),
+            "batched_ms": round(batched * 1000, 2),
+            "speedup": round(per_face / batched, 2),
+            "agreement": round(agreement, 3),
+        })
+        r = rows[-1]
+        print(f"{count:>8} {r['per_face_ms']:>16.2f} {r['batched_ms']:>15.2f} {r['speedup']:>11.1f}x {agreement:>12.0%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
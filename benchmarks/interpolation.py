@@ -0,0 +1,121 @@
+"""
+Mide cuánto se alejan las cajas interpoladas (``DetectionInterpolator``) de la
+detección completa en cada frame, para distintos intervalos de detección K.
+
+La detección completa se ejecuta una sola vez por frame y se reutiliza para todos
+los K, así el resultado sólo depende del flujo óptico.
+
+Ejemplo:
+    python -m benchmarks.interpolation --clip videos/pasillo.mp4 --every 2 3 5 8 --output deriva.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.modes import clip_frames, synthetic_frames
+from detection.interpolation import DetectionInterpolator
+from processing.tracking import iou_matrix
+
+
+def match(reference, predicted, iou_threshold=0.5):
+    """
+    Asocia detecciones de la misma clase por IoU (voraz).
+    :return: Lista de (iou, error del centro en píxeles) de los pares asociados.
+    """
+    if not reference or not predicted:
+        return []
+    ious = iou_matrix([d[:4] for d in reference], [d[:4] for d in predicted])
+    same = np.array([[r[5] == p[5] for p in predicted] for r in reference])
+    ious = np.where(same, ious, 0.0)
+    pairs, used_r, used_p = [], set(), set()
+    for flat in np.argsort(-ious, axis=None):
+        ri, pi = divmod(int(flat), len(predicted))
+        if ious[ri, pi] < iou_threshold:
+            break
+        if ri in used_r or pi in used_p:
+            continue
+        used_r.add(ri)
+        used_p.add(pi)
+        r, p = np.array(reference[ri][:4], float), np.array(predicted[pi][:4], float)
+        center_error = np.linalg.norm((r[:2] + r[2:]) / 2 - (p[:2] + p[2:]) / 2)
+        pairs.append((float(ious[ri, pi]), float(center_error)))
+    return pairs
+
+
+def drift_report(frames, reference, every, detect_seconds):
+    """
+    Reproduce los frames con un intervalo K y compara contra la detección completa.
+    """
+    index = {"i": 0}
+    interpolator = DetectionInterpolator(lambda frame: reference[index["i"]], every=every)
+    matched = total = predicted_total = 0
+    ious, errors = [], []
+    flow_time = 0.0
+    for i, frame in enumerate(frames):
+        index["i"] = i
+        start = time.perf_counter()
+        predicted = interpolator.process(frame)
+        flow_time += time.perf_counter() - start
+        if interpolator.detected:
+            continue  # frame con detección: coincide por construcción
+        pairs = match(reference[i], predicted)
+        matched += len(pairs)
+        total += len(reference[i])
+        predicted_total += len(predicted)
+        ious.extend(p[0] for p in pairs)
+        errors.extend(p[1] for p in pairs)
+    detections = interpolator.stats["detecciones"]
+    # Tiempo estimado: detección real en los frames clave + flujo óptico en el resto
+    estimated = detections * detect_seconds + flow_time
+    return {
+        "every": every,
+        "interpolated_frames": interpolator.stats["interpoladas"],
+        "mean_iou": round(float(np.mean(ious)), 3) if ious else None,
+        "center_error_px": {
+            "mean": round(float(np.mean(errors)), 2) if errors else None,
+            "p95": round(float(np.percentile(errors, 95)), 2) if errors else None,
+        },
+        "recall": round(matched / total, 3) if total else None,
+        "precision": round(matched / predicted_total, 3) if predicted_total else None,
+        "estimated_fps": round(len(frames) / estimated, 2) if estimated else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deriva de las cajas interpoladas frente a la detección completa.")
+    parser.add_argument("--clip", default=None, help="Video o directorio de imágenes (por defecto, frames sintéticos)")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--every", type=int, nargs="+", default=[2, 3, 5, 8])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    from PP.PPE.pdetection import detect, extract_detections, get_model
+
+    model = get_model()
+    source = clip_frames(args.clip, args.frames, args.width, args.height) if args.clip else \
+        synthetic_frames(args.frames, args.width, args.height)
+    frames = list(source)
+    start = time.perf_counter()
+    reference = [extract_detections(detect(frame, model)) for frame in frames]
+    detect_seconds = (time.perf_counter() - start) / len(frames)
+    print(f"Detección completa: {1 / detect_seconds:.1f} FPS, "
+          f"{sum(map(len, reference)) / len(frames):.1f} detecciones por frame")
+
+    rows = [drift_report(frames, reference, every, detect_seconds) for every in args.every]
+    print(f"{'K':>3} {'IoU media':>10} {'error (px)':>11} {'p95 (px)':>9} {'recall':>7} {'FPS est.':>9}")
+    for r in rows:
+        fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+        print(f"{r['every']:>3} {fmt(r['mean_iou'], '>10.3f')} {fmt(r['center_error_px']['mean'], '>11.2f')} "
+              f"{fmt(r['center_error_px']['p95'], '>9.2f')} {fmt(r['recall'], '>7.2f')} {fmt(r['estimated_fps'], '>9.1f')}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"full_detection_fps": round(1 / detect_seconds, 2), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark reproducible de los modos de detección sobre clips grabados o frames sintéticos.
+
+Cada modo se ejecuta en un proceso propio (así el pico de memoria y el estado de los
+modelos no se mezclan entre modos), sin ventanas y en CPU. Se reportan FPS, latencia
+por frame (p50/p95/p99), tiempos por etapa y pico de RSS, y se guardan en JSON.
+
+Ejemplos:
+    python -m benchmarks.modes --frames 200 --output base.json
+    python -m benchmarks.modes --modes productos coco --clip videos/pasillo.mp4 --output nuevo.json --compare base.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+MODES = ("productos", "coco", "emociones", "gestos")
+
+
+def synthetic_frames(count, width=1280, height=720, seed=0):
+    """
+    Genera frames deterministas: fondo con ruido y figuras de colores que se desplazan.
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 200, (height, width, 3), dtype=np.uint8)
+    shapes = [(rng.integers(0, width), rng.integers(0, height), rng.integers(40, 160),
+               tuple(int(c) for c in rng.integers(0, 255, 3)), rng.integers(-8, 9, 2)) for _ in range(6)]
+    for i in range(count):
+        frame = background.copy()
+        for x, y, size, color, (vx, vy) in shapes:
+            cx, cy = int(x + vx * i) % width, int(y + vy * i) % height
+            cv2.rectangle(frame, (cx, cy), (cx + int(size), cy + int(size)), color, -1)
+        yield frame
+
+
+def clip_frames(path, count, width, height):
+    """
+    Lee hasta ``count`` frames de un video o directorio de imágenes, redimensionados.
+    """
+    from processing.capture import open_source
+
+    cap = open_source(path, width, height)
+    try:
+        for _ in range(count):
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame.shape[1] != width or frame.shape[0] != height:
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            yield frame
+    finally:
+        cap.release()
+
+
+def percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def build_mode(mode, timer):
+    """
+    Prepara un modo (carga de modelos incluida) y devuelve ``(procesar_frame, cerrar)``.
+    ``procesar_frame`` registra sus etapas en ``timer``.
+    """
+    if mode == "productos":
+        from PP.PPE import pdetection
+
+        model = pdetection.get_model()
+
+        def process(frame):
+            with timer.measure("inferencia"):
+                result = pdetection.detect(frame, model)
+            with timer.measure("postproceso"):
+                detections = pdetection.extract_detections(result)
+            with timer.measure("render"):
+                return pdetection.render_detections(frame, detections)
+        return process, None
+
+    if mode == "coco":
+        from PP.PPE import detection_haar
+
+        model = detection_haar.get_yolo_model()
+
+        def process(frame):
+            with timer.measure("inferencia"):
+                result = detection_haar.detect(frame, model)
+            with timer.measure("postproceso"):
+                detections = detection_haar.extract_detections(result)
+            with timer.measure("render"):
+                return detection_haar.render_detections(frame, detections)
+        return process, None
+
+    if mode == "emociones":
+        from PP.PPE import emotion_detection
+
+        tracker, classifier = emotion_detection.create_emotion_tracker()
+
+        def process(frame):
+            with timer.measure("rostros y emociones"):
+                faces = tracker.update(frame, classifier.classify)
+            with timer.measure("render"):
+                return emotion_detection.render_emotions(frame, faces)
+        return process, lambda: emotion_detection.close_emotion_tracker(tracker)
+
+    if mode == "gestos":
+        from PP.PPE import gesture_detection
+
+        hands = gesture_detection.create_hands()
+        session = gesture_detection.GestureFilterSession(hands, timer=timer)
+        return session.process, hands.close
+
+    raise ValueError(f"Modo desconocido: {mode}")
+
+
+def run_mode(mode, clip, frames, warmup, width, height):
+    """
+    Ejecuta un modo completo. Se llama en un proceso aparte.
+    :return: Diccionario con los resultados del modo.
+    """
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+    from processing.timing import StageTimer
+
+    timer = StageTimer()
+    start = time.perf_counter()
+    process, close = build_mode(mode, timer)
+    setup_s = time.perf_counter() - start
+
+    source = clip_frames(clip, frames + warmup, width, height) if clip else \
+        synthetic_frames(frames + warmup, width, height)
+    latencies = []
+    try:
+        for index, frame in enumerate(source):
+            if index == warmup:
+                timer.reset()
+            start = time.perf_counter()
+            process(frame)
+            if index >= warmup:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        if close is not None:
+            close()
+
+    if not latencies:
+        raise RuntimeError(f"La fuente no tiene frames suficientes para el modo {mode}")
+    total = sum(latencies)
+    return {
+        "frames": len(latencies),
+        "fps": round(len(latencies) / total, 2),
+        "latency_ms": percentiles(latencies),
+        "stages": timer.summary()["stages"],
+        # ru_maxrss está en KB en Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "setup_s": round(setup_s, 2),
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["modes"]
+    print(f"\nComparación con {baseline_path}:")
+    for mode, data in results.items():
+        old = baseline.get(mode)
+        if "error" in data or not old or "error" in old:
+            continue
+        print(f"  {mode:<10} fps {old['fps']:>7.2f} -> {data['fps']:>7.2f} ({data['fps'] / old['fps'] - 1:+.0%})  "
+              f"p95 {old['latency_ms']['p95']:>8.2f} -> {data['latency_ms']['p95']:>8.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los modos de detección.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--clip", default=None, help="Video o directorio de imágenes (por defecto, frames sintéticos)")
+    parser.add_argument("--frames", type=int, default=200, help="Frames medidos por modo")
+    parser.add_argument("--warmup", type=int, default=10, help="Frames iniciales no medidos")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    parser.add_argument("--compare", default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    print(f"{'modo':<10} {'fps':>7} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'RSS (MB)':>9}")
+    for mode in args.modes:
+        with context.Pool(1) as pool:
+            try:
+                data = pool.apply(run_mode, (mode, args.clip, args.frames, args.warmup, args.width, args.height))
+            except Exception as e:
+                results[mode] = {"error": f"{type(e).__name__}: {e}"}
+                print(f"{mode:<10} error: {results[mode]['error']}")
+                continue
+        results[mode] = data
+        lat = data["latency_ms"]
+        print(f"{mode:<10} {data['fps']:>7.2f} {lat['p50']:>9.2f} {lat['p95']:>9.2f} {lat['p99']:>9.2f} "
+              f"{data['peak_rss_mb']:>9.1f}")
+        for stage, s in data["stages"].items():
+            print(f"    {stage:<22} media={s['mean_ms']:.2f} ms  max={s['max_ms']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "args": vars(args), "modes": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+    return 0 if all("error" not in r for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Tiempo de arranque del menú: importa ``main`` en un intérprete nuevo con ``-X importtime``
+y reporta el tiempo total, los módulos más lentos y si se cargó alguna dependencia
+pesada (que sólo debe importarse al elegir un modo). Con ``--modes`` mide además la
+importación en frío de cada modo.
+
+Ejemplos:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --max-ms 800 --modes productos emociones --output arranque.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from ui.mode_loader import MODE_MODULES
+
+# Dependencias que no deben importarse antes de mostrar el menú
+HEAVY_MODULES = ("torch", "ultralytics", "tensorflow", "deepface", "mediapipe", "cvzone", "onnxruntime", "openvino")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """
+    Importa ``module`` en un proceso nuevo con ``-X importtime``.
+    :return: Tupla (total en ms, {módulo: acumulado en ms}, dependencias pesadas cargadas).
+    """
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "error al importar")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |   cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cum) / 1000
+    heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+    total = cumulative.get(module, 0.0)
+    return total, cumulative, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación del menú y de los modos.")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más lentos a mostrar")
+    parser.add_argument("--modes", nargs="*", choices=tuple(MODE_MODULES), default=[],
+                        help="Medir también la importación en frío de estos modos")
+    parser.add_argument("--max-ms", type=float, default=None, help="Falla si el menú tarda más en importarse")
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    total, cumulative, heavy = import_times("main")
+    # Sólo módulos de primer nivel, para no contar dos veces los submódulos
+    top = sorted(((name, ms) for name, ms in cumulative.items() if "." not in name and name != "main"),
+                 key=lambda item: item[1], reverse=True)[:args.top]
+    print(f"Importación de main: {total:.0f} ms")
+    for name, ms in top:
+        print(f"    {name:<30} {ms:>8.1f} ms")
+    if heavy:
+        print(f"Dependencias pesadas importadas al arrancar: {', '.join(heavy)}")
+
+    results = {"main_ms": round(total, 1), "top": dict(top), "heavy": heavy, "modes": {}}
+    for mode in args.modes:
+        try:
+            ms, _, loaded = import_times(MODE_MODULES[mode])
+        except RuntimeError as e:
+            results["modes"][mode] = {"error": str(e)}
+            print(f"  modo {mode:<12} error: {e}")
+            continue
+        results["modes"][mode] = {"ms": round(ms, 1), "heavy": loaded}
+        print(f"  modo {mode:<12} {ms:>8.0f} ms  ({', '.join(loaded) or 'sin dependencias pesadas'})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    failed = bool(heavy) or (args.max_ms is not None and total > args.max_ms)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Velocidad frente a recall de la inferencia por recortes (``TiledDetector``) en
+imágenes de alta resolución con etiquetas YOLO (una ``.txt`` por imagen con
+``clase cx cy w h`` normalizados).
+
+Se compara el frame completo con cada combinación de tamaño de recorte y
+solapamiento; el recall se reporta también sólo para productos pequeños.
+
+Ejemplo:
+    python -m benchmarks.tiling --images estanterias/images --tiles 480 640 960 --overlaps 0.1 0.2 --output recortes.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.interpolation import match
+from detection.tiling import TiledDetector
+from processing.capture import IMAGE_EXTENSIONS
+from processing.letterbox import boxes_to_arrays
+
+
+def load_dataset(images, labels=None):
+    """
+    :return: Lista de (ruta de la imagen, [(x1, y1, x2, y2, 1.0, clase), ...] en píxeles).
+    """
+    labels = labels or images.replace("images", "labels")
+    dataset = []
+    for name in sorted(os.listdir(images)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(images, name)
+        image = cv2.imread(path)
+        if image is None:
+            continue
+        h, w = image.shape[:2]
+        truth = []
+        label_path = os.path.join(labels, os.path.splitext(name)[0] + ".txt")
+        if os.path.exists(label_path):
+            with open(label_path, encoding="utf-8") as f:
+                rows = [line.split() for line in f]
+            for parts in rows:
+                if len(parts) < 5:
+                    continue
+                cls, cx, cy, bw, bh = int(parts[0]), *map(float, parts[1:5])
+                truth.append(((cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h, 1.0, cls))
+        dataset.append((path, truth))
+    return dataset
+
+
+def evaluate(detect, dataset, small):
+    """
+    Ejecuta ``detect(imagen) -> (cajas, confianzas, clases)`` sobre el conjunto.
+    :return: Diccionario con FPS, recall, recall de productos pequeños y precisión.
+    """
+    matched = matched_small = total = total_small = predicted = 0
+    elapsed = 0.0
+    for path, truth in dataset:
+        image = cv2.imread(path)
+        start = time.perf_counter()
+        boxes, confs, classes = detect(image)
+        elapsed += time.perf_counter() - start
+        detections = [(*box, conf, cls) for box, conf, cls in zip(boxes.tolist(), confs.tolist(), classes.tolist())]
+        predicted += len(detections)
+        total += len(truth)
+        matched += len(match(truth, detections))
+        small_truth = [t for t in truth if np.sqrt((t[2] - t[0]) * (t[3] - t[1])) < small]
+        total_small += len(small_truth)
+        matched_small += len(match(small_truth, detections))
+    return {
+        "fps": round(len(dataset) / elapsed, 2) if elapsed else 0.0,
+        "recall": round(matched / total, 3) if total else None,
+        "recall_small": round(matched_small / total_small, 3) if total_small else None,
+        "precision": round(matched / predicted, 3) if predicted else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Velocidad frente a recall de la inferencia por recortes.")
+    parser.add_argument("--images", required=True, help="Directorio de imágenes")
+    parser.add_argument("--labels", default=None, help="Directorio de etiquetas YOLO (por defecto, images -> labels)")
+    parser.add_argument("--weights", default="PP/PPE/best.pt")
+    parser.add_argument("--tiles", type=int, nargs="+", default=[640])
+    parser.add_argument("--overlaps", type=float, nargs="+", default=[0.2])
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--no-full-frame", action="store_true", help="No agregar el frame completo al lote")
+    parser.add_argument("--small", type=float, default=48, help="Lado (px) por debajo del cual un producto es pequeño")
+    parser.add_argument("--output", default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args(argv)
+
+    from detection.backends import load_yolo
+
+    dataset = load_dataset(args.images, args.labels)
+    if not dataset:
+        raise SystemExit(f"No hay imágenes en {args.images}")
+    model = load_yolo(args.weights)
+    # Calentamiento con un lote del tamaño usado
+    model([cv2.imread(dataset[0][0])] * args.batch, verbose=False)
+
+    variants = {"completo": lambda image: boxes_to_arrays(model(image, verbose=False)[0].boxes)}
+    for tile in args.tiles:
+        for overlap in args.overlaps:
+            # Sin omitir recortes: las imágenes no son frames consecutivos
+            variants[f"recortes {tile} / {overlap:.0%}"] = TiledDetector(
+                model, tile=tile, overlap=overlap, batch=args.batch, change_threshold=0,
+                full_frame=not args.no_full_frame)
+
+    def fmt(value):
+        return f"{value:.3f}" if value is not None else "-"
+
+    results = {}
+    print(f"{'variante':<22} {'fps':>7} {'recall':>7} {'pequeños':>9} {'precisión':>10}")
+    for name, detect in variants.items():
+        data = results[name] = evaluate(detect, dataset, args.small)
+        print(f"{name:<22} {data['fps']:>7.2f} {fmt(data['recall']):>7} {fmt(data['recall_small']):>9} "
+              f"{fmt(data['precision']):>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "variants": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,69 @@
+import os
+
 COLOR_RANGES = {
     "red": [(0, 120, 70), (10, 255, 255)],  # Rojo
+    "orange": [(11, 120, 100), (19, 255, 255)],  # Naranja
     "green": [(36, 100, 100), (86, 255, 255)],  # Verde
     "blue": [(94, 80, 2), (126, 255, 255)],  # Azul
     "yellow": [(20, 100, 100), (30, 255, 255)]  # Amarillo
 }
+
+# Fuente de video: índice de cámara, archivo de video o directorio de imágenes
+CAMERA_SOURCE = os.environ.get("HEALTHYLENS_SOURCE", 1)
+# Varias fuentes separadas por comas activan el modo multi-stream con inferencia por lotes
+CAMERA_SOURCES = [src for src in os.environ.get("HEALTHYLENS_SOURCES", "").split(",") if src]
+FRAME_WIDTH = 1280
+FRAME_HEIGHT = 720
+
+# Ejecutar los modos YOLO con el pipeline concurrente (captura → inferencia → render)
+PIPELINE_MODE = os.environ.get("HEALTHYLENS_PIPELINE", "0") == "1"
+
+# Memoria máxima (MB) para modelos cargados en el registro; 0 = sin límite
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("HEALTHYLENS_MODEL_BUDGET_MB", "0"))
+
+# Detector de rostros del modo emociones: "haar" o "mediapipe"
+FACE_DETECTOR = os.environ.get("HEALTHYLENS_FACE_DETECTOR", "haar")
+
+# Modo gestos: búsqueda de manos en resolución reducida / región y sin inferencia si no hay movimiento
+GESTURE_ADAPTIVE = os.environ.get("HEALTHYLENS_GESTURE_ADAPTIVE", "1") == "1"
+
+# Base de conocimiento de productos (JSON o SQLite); rutas relativas a la raíz del proyecto
+PRODUCT_DATABASE = os.environ.get("HEALTHYLENS_PRODUCT_DB", "assets/database.json")
+
+# Métricas de las sesiones en vivo (spans por etapa, contadores, FPS); desactivadas no cuestan nada apreciable
+METRICS_ENABLED = os.environ.get("HEALTHYLENS_METRICS", "0") == "1"
+# HUD con FPS y latencia sobre el video (activa también las métricas)
+METRICS_HUD = os.environ.get("HEALTHYLENS_HUD", "0") == "1"
+# Volcado periódico de métricas a un archivo JSON y/o a http://127.0.0.1:<puerto>/metrics
+METRICS_FILE = os.environ.get("HEALTHYLENS_METRICS_FILE") or None
+METRICS_PORT = int(os.environ.get("HEALTHYLENS_METRICS_PORT", "0"))
+METRICS_INTERVAL = float(os.environ.get("HEALTHYLENS_METRICS_INTERVAL", "5"))
+
+# Clasificación de productos: detectar cada N frames e interpolar las cajas entre medio ("auto" = adaptativo)
+PRODUCT_DETECT_EVERY = os.environ.get("HEALTHYLENS_DETECT_EVERY", "1")
+
+# Backend de inferencia de los modelos YOLO: "pytorch", "onnx" u "openvino" (se exportan una vez y se guardan en caché)
+INFERENCE_BACKEND = os.environ.get("HEALTHYLENS_BACKEND", "pytorch")
+# Cuantizar a INT8 con las imágenes de CALIBRATION_DIR (sólo backends exportados)
+INFERENCE_INT8 = os.environ.get("HEALTHYLENS_INT8", "0") == "1"
+CALIBRATION_DIR = os.environ.get("HEALTHYLENS_CALIBRATION_DIR") or None
+MODEL_CACHE_DIR = os.environ.get("HEALTHYLENS_MODEL_CACHE", "assets/model_cache")
+
+# Modo que el menú importa en segundo plano tras mostrarse ("productos", "coco", "emociones", "gestos"; vacío = ninguno)
+PRELOAD_MODE = os.environ.get("HEALTHYLENS_PRELOAD", "productos")
+
+# Mostrar los modos dentro de la ventana del menú (sin bloquearlo) en lugar de ventanas de OpenCV
+LIVE_VIEW = os.environ.get("HEALTHYLENS_LIVE_VIEW", "1") == "1"
+
+# Inferencia por recortes solapados para cámaras de alta resolución (productos pequeños en estanterías)
+TILED_INFERENCE = os.environ.get("HEALTHYLENS_TILES", "0") == "1"
+TILE_SIZE = int(os.environ.get("HEALTHYLENS_TILE_SIZE", "640"))
+TILE_OVERLAP = float(os.environ.get("HEALTHYLENS_TILE_OVERLAP", "0.2"))
+TILE_BATCH = int(os.environ.get("HEALTHYLENS_TILE_BATCH", "8"))
+# Frames tras los que un recorte sin cambios se vuelve a inferir igualmente (0 = nunca)
+TILE_REFRESH = int(os.environ.get("HEALTHYLENS_TILE_REFRESH", "30"))
+
+# Filtro previo por color (COLOR_RANGES) para el modelo de productos: "0" desactivado, "frame" omite
+# la inferencia en frames sin manchas de color candidatas, "crops" infiere sólo los recortes de esas manchas
+# (en lugar de los recortes de TILED_INFERENCE, que sólo se usan si se infiere el frame completo)
+COLOR_GATE = os.environ.get("HEALTHYLENS_COLOR_GATE", "0")
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import cv2
+
+from config import CALIBRATION_DIR, INFERENCE_BACKEND, INFERENCE_INT8, MODEL_CACHE_DIR
+from processing.capture import IMAGE_EXTENSIONS
+from processing.knowledge_base import resolve_path
+from processing.letterbox import Letterbox
+
+BACKENDS = ("pytorch", "onnx", "openvino")
+
+# Segundos tras los que un candado de exportación se considera abandonado
+EXPORT_LOCK_TIMEOUT = 1800
+
+
+def _fingerprint(weights, backend, int8, imgsz, calibration, dynamic):
+    digest = hashlib.sha1()
+    with open(weights, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(f"{backend}|{int8}|{imgsz}|{dynamic}".encode())
+    if int8 and calibration:
+        # El conjunto de calibración cambia el modelo cuantizado
+        digest.update("|".join(calibration_images(calibration)).encode())
+    return digest.hexdigest()[:12]
+
+
+def calibration_images(directory, limit=300):
+    """
+    Imágenes del conjunto de calibración (orden alfabético, como máximo ``limit``).
+    """
+    files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    return files[:limit]
+
+
+def cached_path(weights, backend, int8=False, imgsz=640, calibration=None, cache_dir=MODEL_CACHE_DIR,
+                dynamic=True):
+    """
+    Ruta del artefacto exportado en la caché (exista o no).
+    """
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    key = _fingerprint(weights, backend, int8, imgsz, calibration, dynamic)
+    suffix = "-int8" if int8 else ""
+    name = f"{stem}-{key}{suffix}.onnx" if backend == "onnx" else f"{stem}-{key}{suffix}_openvino_model"
+    return os.path.join(resolve_path(cache_dir), name)
+
+
+def _quantize_onnx(source, target, calibration, imgsz):
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.input_name = onnx.load(source, load_external_data=False).graph.input[0].name
+            self.files = iter(calibration_images(calibration))
+            self.letterbox = Letterbox(imgsz)
+
+        def get_next(self):
+            for path in self.files:
+                image = cv2.imread(path)
+                if image is not None:
+                    # Copia: el blob del letterbox se reutiliza en la siguiente imagen
+                    return {self.input_name: self.letterbox.to_blob(image).copy()}
+            return None
+
+    quantize_static(source, target, Reader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    # ultralytics lee las clases y el tamaño de entrada de los metadatos del ONNX
+    original, quantized = onnx.load(source), onnx.load(target)
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(original.metadata_props)
+    onnx.save(quantized, target)
+
+
+def _calibration_yaml(calibration, names, directory):
+    path = os.path.join(directory, "calibracion.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"path: {os.path.abspath(calibration)}\ntrain: .\nval: .\nnames:\n")
+        for index, name in names.items():
+            f.write(f"  {index}: {name}\n")
+    return path
+
+
+def _process_alive(pid):
+    if os.name == "nt":
+        # En Windows os.kill terminaría el proceso: sólo se usa el tiempo límite
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _lock_is_stale(lock, timeout):
+    """
+    Un candado está abandonado si superó ``timeout`` o el proceso que lo creó ya no existe.
+    """
+    try:
+        with open(lock, encoding="utf-8") as f:
+            pid, created = f.read().split()
+        pid, created = int(pid), float(created)
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        # Candado vacío o ilegible (recién creado o de un proceso que murió al escribirlo)
+        try:
+            pid, created = None, os.path.getmtime(lock)
+        except OSError:
+            return False
+    return time.time() - created > timeout or (pid is not None and not _process_alive(pid))
+
+
+def export_model(weights, backend, int8=False, imgsz=640, calibration=None, cache_dir=MODEL_CACHE_DIR,
+                 dynamic=True, lock_timeout=EXPORT_LOCK_TIMEOUT):
+    """
+    Exporta los pesos de PyTorch a ONNX u OpenVINO (opcionalmente INT8) y guarda el
+    artefacto en la caché. Si ya existe, no vuelve a exportar.
+    :param dynamic: Lote (y tamaño) de entrada dinámico. Necesario para las llamadas con
+                    listas de imágenes (``InferenceServer``, ``TiledDetector``, ``ColorGate``);
+                    una exportación estática sólo acepta una imagen por llamada.
+    :param lock_timeout: Segundos tras los que se ignora el candado de otra exportación.
+    :return: Ruta del artefacto.
+    """
+    from ultralytics import YOLO
+
+    if backend not in BACKENDS[1:]:
+        raise ValueError(f"Backend de exportación desconocido: {backend}")
+    if int8 and not calibration:
+        raise ValueError("La cuantización INT8 necesita un directorio de calibración")
+    target = cached_path(weights, backend, int8, imgsz, calibration, cache_dir, dynamic)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    lock = f"{target}.lock"
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        # Otro proceso está exportando el mismo modelo: esperar su resultado
+        while os.path.exists(lock) and not os.path.exists(target):
+            if _lock_is_stale(lock, lock_timeout):
+                print(f"Se elimina un candado de exportación abandonado: {lock}")
+                try:
+                    os.remove(lock)
+                except FileNotFoundError:
+                    pass
+                break
+            time.sleep(0.5)
+        if os.path.exists(target):
+            return target
+        return export_model(weights, backend, int8, imgsz, calibration, cache_dir, dynamic, lock_timeout)
+    # PID y hora de creación: permiten reconocer el candado de una exportación interrumpida
+    os.write(fd, f"{os.getpid()} {time.time()}".encode())
+    os.close(fd)
+
+    try:
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(target)) as work:
+            # Exportar sobre una copia para no dejar artefactos junto a los pesos originales
+            local = shutil.copy(weights, work)
+            model = YOLO(local)
+            print(f"Exportando {weights} a {backend}{' INT8' if int8 else ''}...")
+            start = time.perf_counter()
+            if backend == "onnx":
+                exported = model.export(format="onnx", imgsz=imgsz, simplify=True, dynamic=dynamic)
+                if int8:
+                    quantized = os.path.join(work, "int8.onnx")
+                    _quantize_onnx(exported, quantized, calibration, imgsz)
+                    exported = quantized
+            else:
+                options = {"int8": True, "data": _calibration_yaml(calibration, model.names, work)} if int8 else {}
+                exported = model.export(format="openvino", imgsz=imgsz, dynamic=dynamic, **options)
+            os.replace(exported, target)
+            print(f"Modelo exportado en {time.perf_counter() - start:.1f} s: {target}")
+    finally:
+        try:
+            os.remove(lock)
+        except FileNotFoundError:
+            pass
+    return target
+
+
+def load_yolo(weights, backend=INFERENCE_BACKEND, int8=INFERENCE_INT8, imgsz=640, calibration=CALIBRATION_DIR):
+    """
+    Carga un modelo YOLO con el backend indicado. Los modelos exportados se usan con
+    la misma interfaz de ultralytics que los pesos de PyTorch, así ``process_frame``
+    no cambia. Si la exportación falla se usa PyTorch.
+    """
+    from ultralytics import YOLO
+
+    if backend == "pytorch":
+        return YOLO(weights)
+    try:
+        return YOLO(export_model(weights, backend, int8, imgsz, calibration), task="detect")
+    except Exception as e:
+        print(f"No se pudo usar el backend {backend} ({type(e).__name__}: {e}); se usa PyTorch.")
+        return YOLO(weights)
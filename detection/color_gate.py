@@ -0,0 +1,165 @@
+import threading
+
+import cv2
+import numpy as np
+
+from config import COLOR_GATE, COLOR_RANGES
+from detection.tiling import merge_detections
+from processing.metrics import metrics
+
+
+def color_luts(ranges=COLOR_RANGES):
+    """
+    Tablas de consulta de H, S y V con un bit por color: un píxel pertenece al color
+    ``i`` si el bit ``i`` está en las tres tablas. Los rangos de rojo que empiezan en
+    tono 0 se extienden también al otro extremo del círculo (170-180 en OpenCV).
+    :return: Tupla (tablas (3, 256) uint8, nombres de los colores en el orden de los bits).
+    """
+    if len(ranges) > 8:
+        raise ValueError("Como máximo 8 rangos de color (un bit por color)")
+    luts = np.zeros((3, 256), dtype=np.uint8)
+    names = list(ranges)
+    for bit, name in enumerate(names):
+        (h1, s1, v1), (h2, s2, v2) = ranges[name]
+        flag = np.uint8(1 << bit)
+        luts[0, h1:h2 + 1] |= flag
+        if h1 == 0 and h2 < 90:
+            # El rojo da la vuelta al círculo de tonos
+            luts[0, 180 - h2:181] |= flag
+        luts[1, s1:s2 + 1] |= flag
+        luts[2, v1:v2 + 1] |= flag
+    return luts, names
+
+
+class ColorGate:
+    """
+    Etapa previa barata para el modelo de productos: busca manchas de los colores de
+    ``config.COLOR_RANGES`` (manzanas, naranjas, envases...) en una versión reducida
+    del frame. Sin manchas candidatas, el modelo no se ejecuta; con ``crops`` sólo se
+    infieren las regiones candidatas en lugar del frame completo. Los recortes de las
+    manchas reemplazan a la inferencia por recortes (``TiledDetector``), que sólo se usa
+    cuando las manchas cubren demasiado frame y se infiere el frame completo.
+
+    Las máscaras de todos los colores salen de tres ``cv2.LUT`` sobre H, S y V (un bit
+    por color), así el costo no crece con la cantidad de rangos.
+    """
+
+    def __init__(self, ranges=COLOR_RANGES, scale=0.25, min_area=0.001, margin=0.3, min_crop=160,
+                 max_crop_area=0.5):
+        """
+        :param ranges: Rangos HSV por color, como ``config.COLOR_RANGES``.
+        :param scale: Escala del frame para las máscaras.
+        :param min_area: Área mínima de una mancha, como fracción del frame.
+        :param margin: Margen agregado alrededor de cada mancha (fracción de su tamaño).
+        :param min_crop: Lado mínimo (px) de los recortes que se pasan al modelo.
+        :param max_crop_area: Si los recortes cubren más que esta fracción del frame, se infiere el frame completo.
+        """
+        self.luts, self.names = color_luts(ranges)
+        self.scale = scale
+        self.min_area = min_area
+        self.margin = margin
+        self.min_crop = min_crop
+        self.max_crop_area = max_crop_area
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._lock = threading.Lock()
+        self.stats = {"frames": 0, "llamadas_modelo": 0, "llamadas_ahorradas": 0, "recortes": 0}
+
+    def mask(self, frame):
+        """
+        :return: Máscara reducida con el bit de cada color por píxel (0 = ningún color).
+        """
+        # INTER_LINEAR muestrea en lugar de promediar: ~10 veces más rápido que INTER_AREA y
+        # suficiente para manchas del tamaño de un producto
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_LINEAR)
+        h, s, v = cv2.split(cv2.cvtColor(small, cv2.COLOR_BGR2HSV))
+        bits = cv2.bitwise_and(cv2.LUT(h, self.luts[0]), cv2.LUT(s, self.luts[1]))
+        return cv2.bitwise_and(bits, cv2.LUT(v, self.luts[2]))
+
+    def regions(self, frame):
+        """
+        Manchas de color candidatas.
+        :return: Lista de (x1, y1, x2, y2, color) en coordenadas del frame.
+        """
+        bits = self.mask(frame)
+        # Apertura para descartar píxeles sueltos (ruido, reflejos)
+        binary = cv2.morphologyEx((bits > 0).view(np.uint8), cv2.MORPH_OPEN, self._kernel)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        min_pixels = self.min_area * binary.size
+        regions = []
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            if area < min_pixels:
+                continue
+            # Color dominante de la mancha (el bit más frecuente)
+            values = bits[y:y + h, x:x + w][labels[y:y + h, x:x + w] == label]
+            counts = [np.count_nonzero(values & (1 << bit)) for bit in range(len(self.names))]
+            regions.append((int(x / self.scale), int(y / self.scale), int((x + w) / self.scale),
+                            int((y + h) / self.scale), self.names[int(np.argmax(counts))]))
+        return regions
+
+    def _crop_boxes(self, regions, height, width):
+        boxes = []
+        for x1, y1, x2, y2, _ in regions:
+            w, h = x2 - x1, y2 - y1
+            cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+            half_w = max(w * (1 + 2 * self.margin), self.min_crop) / 2
+            half_h = max(h * (1 + 2 * self.margin), self.min_crop) / 2
+            boxes.append((max(0, int(cx - half_w)), max(0, int(cy - half_h)),
+                          min(width, int(cx + half_w)), min(height, int(cy + half_h))))
+        return boxes
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def detect(self, frame, detect_frame, detect_batch=None, crops=False):
+        """
+        Ejecuta el detector sólo si hay manchas de color candidatas.
+        :param detect_frame: Función ``frame -> (cajas, confianzas, clases)`` sobre el frame completo.
+        :param detect_batch: Función ``[imagen, ...] -> [(cajas, confianzas, clases), ...]`` que
+                             infiere un lote (necesaria con ``crops``).
+        :param crops: Inferir sólo los recortes alrededor de las manchas, en un lote.
+        :return: Tupla (cajas int (N, 4), confianzas (N,), clases int (N,)) en coordenadas del frame.
+        """
+        self._count("frames")
+        regions = self.regions(frame)
+        if not regions:
+            self._count("llamadas_ahorradas")
+            metrics.count("llamadas ahorradas (color)")
+            return np.empty((0, 4), dtype=int), np.empty(0, dtype=np.float32), np.empty(0, dtype=int)
+
+        self._count("llamadas_modelo")
+        height, width = frame.shape[:2]
+        boxes = self._crop_boxes(regions, height, width) if crops else []
+        area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in boxes)
+        if not crops or area > self.max_crop_area * height * width:
+            return detect_frame(frame)
+
+        self._count("recortes", len(boxes))
+        results = detect_batch([frame[y1:y2, x1:x2] for x1, y1, x2, y2 in boxes])
+        parts = []
+        for (x1, y1, _, _), (crop_boxes, confs, classes) in zip(boxes, results):
+            parts.append((crop_boxes + (x1, y1, x1, y1), confs, classes))
+        all_boxes = np.concatenate([p[0] for p in parts])
+        confs = np.concatenate([p[1] for p in parts])
+        classes = np.concatenate([p[2] for p in parts])
+        # Los recortes de manchas cercanas se solapan: fusionar como entre recortes de la inferencia por recortes
+        keep = merge_detections(all_boxes, confs, classes)
+        return all_boxes[keep], confs[keep], classes[keep]
+
+
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def color_gate():
+    """
+    Filtro de color del proceso (``None`` si ``config.COLOR_GATE`` está desactivado).
+    """
+    global _gate
+    if COLOR_GATE not in ("frame", "crops"):
+        return None
+    with _gate_lock:
+        if _gate is None:
+            _gate = ColorGate()
+    return _gate
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+
+# Orden de salida del modelo de emociones de DeepFace
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+INPUT_SIZE = 48
+
+
+class EmotionClassifier:
+    """
+    Clasificador de emociones por lotes sobre el modelo de DeepFace.
+
+    En lugar de llamar a ``DeepFace.analyze`` una vez por rostro (cada llamada vuelve a
+    detectar la cara, redimensiona y ejecuta el modelo con lote 1), recibe todos los
+    recortes de un frame, los convierte a escala de grises 48x48 en un único arreglo y
+    ejecuta una sola pasada del modelo.
+    """
+
+    def __init__(self, model, max_batch=32):
+        """
+        :param model: Modelo devuelto por ``DeepFace.build_model("Emotion")``.
+        :param max_batch: Capacidad inicial del buffer de entrada.
+        """
+        # Versiones recientes de DeepFace envuelven el modelo de Keras en ``.model``
+        self.model = getattr(model, "model", model)
+        self._buffer = np.empty((max_batch, INPUT_SIZE, INPUT_SIZE, 1), dtype=np.float32)
+
+    def preprocess(self, rois):
+        """
+        Convierte los recortes BGR en un lote (N, 48, 48, 1) normalizado a [0, 1].
+        El arreglo devuelto es una vista de un buffer reutilizable.
+        """
+        if len(rois) > len(self._buffer):
+            self._buffer = np.empty((len(rois), INPUT_SIZE, INPUT_SIZE, 1), dtype=np.float32)
+        batch = self._buffer[:len(rois)]
+        for i, roi in enumerate(rois):
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+            small = cv2.resize(gray, (INPUT_SIZE, INPUT_SIZE), interpolation=cv2.INTER_AREA)
+            np.multiply(small, 1.0 / 255.0, out=batch[i, :, :, 0], casting="unsafe")
+        return batch
+
+    def predict(self, rois):
+        """
+        Clasifica una lista de rostros con una sola pasada del modelo.
+        :param rois: Lista de recortes BGR (o en escala de grises).
+        :return: Lista de (emoción dominante, {emoción: puntaje 0-100}).
+        """
+        if not rois:
+            return []
+        batch = self.preprocess(rois)
+        scores = np.asarray(self.model(batch, training=False)) * 100.0
+        results = []
+        for row in scores:
+            results.append((EMOTION_LABELS[int(np.argmax(row))],
+                            {label: float(value) for label, value in zip(EMOTION_LABELS, row)}))
+        return results
+
+    def classify(self, rois):
+        """
+        Devuelve sólo la emoción dominante de cada rostro.
+        """
+        return [dominant for dominant, _ in self.predict(rois)]
@@ -1,6 +1,96 @@
 import cv2
 import mediapipe as mp
 
+from processing.tracking import IoUTracker
+
+mp_face_detection = mp.solutions.face_detection
+
+
+class FaceDetectionService:
+    """
+    Detector de rostros de MediaPipe con ciclo de vida explícito.
+
+    El grafo de MediaPipe se crea una sola vez y se reutiliza en todos los frames;
+    ``close()`` (o salir del bloque ``with``) lo libera. Opcionalmente detecta sobre
+    una versión reducida del frame (las coordenadas se devuelven en el frame original)
+    y, en modo video, asigna IDs estables a los rostros entre frames.
+    """
+
+    def __init__(self, min_detection_confidence=0.5, model_selection=0, downscale=1.0, tracking=False):
+        """
+        :param min_detection_confidence: Confianza mínima de detección.
+        :param model_selection: 0 = rostros cercanos (< 2 m), 1 = rostros lejanos.
+        :param downscale: Factor de escala del frame antes de detectar (1.0 = sin reducir).
+        :param tracking: Asignar IDs estables entre frames (modo video).
+        """
+        self.downscale = downscale
+        self._detector = mp_face_detection.FaceDetection(
+            min_detection_confidence=min_detection_confidence, model_selection=model_selection)
+        self._tracker = IoUTracker(iou_threshold=0.3, max_misses=3) if tracking else None
+
+    def close(self):
+        if self._detector is not None:
+            self._detector.close()
+            self._detector = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def process(self, frame):
+        """
+        Ejecuta MediaPipe sobre el frame (BGR) y devuelve sus resultados sin procesar.
+        """
+        if self._detector is None:
+            raise RuntimeError("FaceDetectionService ya fue cerrado")
+        if self.downscale != 1.0:
+            frame = cv2.resize(frame, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+        return self._detector.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def detect(self, frame):
+        """
+        Detecta rostros en el frame.
+        :return: Lista de (x1, y1, x2, y2) en coordenadas del frame original.
+        """
+        h, w = frame.shape[:2]
+        results = self.process(frame)
+        boxes = []
+        for detection in results.detections or []:
+            # Las coordenadas relativas no dependen de la escala usada para detectar
+            rel = detection.location_data.relative_bounding_box
+            x1 = max(0, int(rel.xmin * w))
+            y1 = max(0, int(rel.ymin * h))
+            x2 = min(w, int((rel.xmin + rel.width) * w))
+            y2 = min(h, int((rel.ymin + rel.height) * h))
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2, y2))
+        return boxes
+
+    def __call__(self, frame):
+        return self.detect(frame)
+
+    def detect_tracked(self, frame):
+        """
+        Detecta rostros y les asigna un ID estable (requiere ``tracking=True``).
+        :return: Lista de (id, (x1, y1, x2, y2)).
+        """
+        if self._tracker is None:
+            raise RuntimeError("detect_tracked requiere FaceDetectionService(tracking=True)")
+        boxes = self.detect(frame)
+        return [(track.id, boxes[i]) for track, i in self._tracker.update(boxes)]
+
+    def detect_batch(self, frames):
+        """
+        Detecta rostros en un conjunto de imágenes independientes (procesamiento offline).
+        :return: Una lista de cajas por imagen.
+        """
+        return [self.detect(frame) for frame in frames]
+
+
+_shared_service = None
+
 
 def detect_emotions(frame):
     """
@@ -8,13 +98,8 @@ def detect_emotions(frame):
     :param frame: Frame de video en formato BGR.
     :return: Resultados de detección de emociones.
     """
-    mp_face_detection = mp.solutions.face_detection
-    face_detection = mp_face_detection.FaceDetection(min_detection_confidence=0.5)
-
-    # Convertir el frame a RGB
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    # Procesar la imagen para detectar emociones/rostros
-    results = face_detection.process(frame_rgb)
-
-    return results
+    global _shared_service
+    # Reutilizar el mismo grafo de MediaPipe en todas las llamadas
+    if _shared_service is None:
+        _shared_service = FaceDetectionService(min_detection_confidence=0.5)
+    return _shared_service.process(frame)
@@ -0,0 +1,114 @@
+from collections import Counter, deque
+
+import cv2
+import numpy as np
+
+from processing.tracking import IoUTracker
+
+
+class HaarFaceDetector:
+    """
+    Detector de rostros Haar que trabaja sobre una versión reducida del frame.
+    Se llama como ``detector(frame) -> [(x1, y1, x2, y2), ...]``.
+    """
+
+    def __init__(self, cascade, downscale=0.5):
+        self.cascade = cascade
+        self.downscale = downscale
+
+    def __call__(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+        min_size = max(1, int(30 * self.downscale))
+        faces = self.cascade.detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+        scale = 1.0 / self.downscale
+        return [(int(x * scale), int(y * scale), int((x + w) * scale), int((y + h) * scale))
+                for (x, y, w, h) in faces]
+
+
+class FaceEmotionTracker:
+    """
+    Sigue rostros entre frames para no ejecutar el detector ni el clasificador de
+    emociones en cada rostro de cada frame.
+
+    - El detector de rostros (Haar reducido o ``FaceDetectionService`` de MediaPipe)
+      corre cada ``detect_every`` frames; entre detecciones se conservan las cajas.
+    - La emoción de cada track se vuelve a clasificar cada ``reclassify_every`` frames
+      o cuando su apariencia cambia más de ``change_threshold``.
+    - La etiqueta mostrada es la mayoría de las últimas ``smoothing`` clasificaciones.
+    """
+
+    def __init__(self, detector, detect_every=5, reclassify_every=15,
+                 change_threshold=12.0, smoothing=5, max_misses=2):
+        """
+        :param detector: Función ``frame -> [(x1, y1, x2, y2), ...]``, p. ej. ``HaarFaceDetector``.
+        :param detect_every: Frames entre ejecuciones del detector.
+        :param reclassify_every: Frames máximos entre clasificaciones de un mismo rostro.
+        :param change_threshold: Diferencia media (0-255) de la miniatura que fuerza reclasificar.
+        :param smoothing: Tamaño de la ventana de votación de la emoción.
+        :param max_misses: Detecciones fallidas antes de descartar un rostro.
+        """
+        self.detector = detector
+        self.detect_every = detect_every
+        self.reclassify_every = reclassify_every
+        self.change_threshold = change_threshold
+        self.smoothing = smoothing
+        self.tracker = IoUTracker(iou_threshold=0.3, max_misses=max_misses)
+        self.frame_index = 0
+        self.detections = 0
+        self.classifications = 0
+
+    def _detect(self, frame):
+        self.detections += 1
+        return self.detector(frame)
+
+    @staticmethod
+    def _thumbnail(roi):
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (16, 16), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _needs_classification(self, track, thumb):
+        last = track.data.get("classified_at")
+        if last is None or self.frame_index - last >= self.reclassify_every:
+            return True
+        diff = np.abs(thumb - track.data["thumbnail"]).mean()
+        return diff > self.change_threshold
+
+    def update(self, frame, classify):
+        """
+        Procesa un frame.
+        :param frame: Frame BGR.
+        :param classify: Función que recibe una lista de ROIs y devuelve una emoción por ROI.
+        :return: Lista de (track_id, (x, y, w, h), emoción suavizada).
+        """
+        if self.frame_index % self.detect_every == 0 or not self.tracker.tracks:
+            self.tracker.update(self._detect(frame))
+        self.frame_index += 1
+
+        h, w = frame.shape[:2]
+        visible = []
+        pending = []
+        for track in self.tracker.tracks:
+            if track.misses:
+                continue
+            x1, y1, x2, y2 = track.box
+            x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+            roi = frame[y1:y2, x1:x2]
+            if roi.size == 0:
+                continue
+            thumb = self._thumbnail(roi)
+            if self._needs_classification(track, thumb):
+                pending.append((track, roi, thumb))
+            visible.append((track, (x1, y1, x2 - x1, y2 - y1)))
+
+        if pending:
+            emotions = classify([roi for _, roi, _ in pending])
+            self.classifications += len(pending)
+            for (track, _, thumb), emotion in zip(pending, emotions):
+                history = track.data.setdefault("history", deque(maxlen=self.smoothing))
+                history.append(emotion)
+                track.data["thumbnail"] = thumb
+                track.data["classified_at"] = self.frame_index
+                track.data["emotion"] = Counter(history).most_common(1)[0][0]
+
+        return [(track.id, box, track.data.get("emotion", "unknown")) for track, box in visible]
@@ -0,0 +1,139 @@
+from collections import Counter, deque
+
+import numpy as np
+
+# Índices de landmarks de MediaPipe Hands
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+FINGER_MCPS = np.array([5, 9, 13, 17])   # índice, medio, anular, meñique
+FINGER_PIPS = np.array([6, 10, 14, 18])
+FINGER_TIPS = np.array([8, 12, 16, 20])
+INDEX_MCP, MIDDLE_MCP, PINKY_MCP = 5, 9, 17
+INDEX_TIP, MIDDLE_TIP = 8, 12
+
+NO_GESTURE = "No Gesture"
+GESTURES = np.array([
+    "OK Sign", "Two Fingers Crossed", "Victory", "Pointing", "Thumbs Up",
+    "Thumbs Down", "Fist", "Palm Sideways", "Five Fingers Spread", "Open Hand",
+    NO_GESTURE,
+])
+
+
+def landmarks_to_array(multi_hand_landmarks):
+    """
+    Convierte los landmarks de todas las manos en un arreglo (manos, 21, 3) con x, y, z.
+    """
+    if not multi_hand_landmarks:
+        return np.empty((0, 21, 3), dtype=np.float32)
+    return np.array(
+        [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in multi_hand_landmarks],
+        dtype=np.float32,
+    )
+
+
+def _dist(a, b):
+    return np.linalg.norm(a - b, axis=-1)
+
+
+def hand_features(points, aspect=1.0):
+    """
+    Calcula los rasgos de todas las manos a la vez.
+    :param points: Arreglo (manos, 21, 3) de ``landmarks_to_array``.
+    :param aspect: Ancho / alto de la imagen, para que x e y estén en la misma escala.
+    :return: Diccionario de arreglos por mano.
+    """
+    p = points[..., :2] * np.array([aspect, 1.0], dtype=np.float32)
+    wrist = p[:, WRIST]
+    size = np.maximum(_dist(p[:, MIDDLE_MCP], wrist), 1e-6)
+
+    # Dedo extendido: la punta está claramente más lejos de la muñeca que la articulación media
+    tips_dist = _dist(p[:, FINGER_TIPS], wrist[:, None])
+    pips_dist = _dist(p[:, FINGER_PIPS], wrist[:, None])
+    fingers = tips_dist > pips_dist * 1.2
+    thumb = _dist(p[:, THUMB_TIP], p[:, PINKY_MCP]) > _dist(p[:, THUMB_IP], p[:, PINKY_MCP]) * 1.1
+
+    # Pulgar arriba/abajo: su punta es el punto más alto (o más bajo) de la mano; y crece hacia abajo
+    others_y = np.delete(p[..., 1], [THUMB_IP, THUMB_TIP], axis=1)
+    thumb_y = p[:, THUMB_TIP, 1]
+    thumb_up = thumb_y < others_y.min(axis=1) - 0.15 * size
+    thumb_down = thumb_y > others_y.max(axis=1) + 0.15 * size
+
+    # Apertura entre índice y meñique
+    index_dir = p[:, INDEX_TIP] - p[:, INDEX_MCP]
+    pinky_dir = p[:, FINGER_TIPS[3]] - p[:, PINKY_MCP]
+    cos = (index_dir * pinky_dir).sum(-1) / np.maximum(
+        np.linalg.norm(index_dir, axis=-1) * np.linalg.norm(pinky_dir, axis=-1), 1e-6)
+    spread = cos < np.cos(np.radians(35))
+
+    # Mano horizontal: la palma apunta hacia un lado
+    palm = p[:, MIDDLE_MCP] - wrist
+    sideways = np.abs(palm[:, 0]) > 1.2 * np.abs(palm[:, 1])
+
+    # Dedos cruzados: el orden en x de las puntas de índice y medio se invierte respecto a los nudillos
+    crossed = np.sign(p[:, INDEX_TIP, 0] - p[:, MIDDLE_TIP, 0]) != np.sign(p[:, INDEX_MCP, 0] - p[:, MIDDLE_MCP, 0])
+
+    ok_touch = _dist(p[:, THUMB_TIP], p[:, INDEX_TIP]) < 0.3 * size
+
+    return {
+        "fingers": fingers, "thumb": thumb, "thumb_up": thumb_up, "thumb_down": thumb_down,
+        "spread": spread, "sideways": sideways, "crossed": crossed, "ok_touch": ok_touch,
+    }
+
+
+def classify_hands(points, aspect=1.0):
+    """
+    Clasifica el gesto de todas las manos de un frame en una sola operación vectorizada.
+    :param points: Arreglo (manos, 21, 3).
+    :return: Arreglo con el nombre del gesto de cada mano.
+    """
+    if len(points) == 0:
+        return np.empty(0, dtype=GESTURES.dtype)
+    f = hand_features(points, aspect)
+    index, middle, ring, pinky = f["fingers"].T
+    four = f["fingers"].all(axis=1)
+    none = ~f["fingers"].any(axis=1)
+    only_index = index & ~middle & ~ring & ~pinky
+    index_middle = index & middle & ~ring & ~pinky
+
+    conditions = [
+        f["ok_touch"] & middle & ring & pinky,        # OK Sign
+        index_middle & f["crossed"],                  # Two Fingers Crossed
+        index_middle,                                 # Victory
+        only_index,                                   # Pointing
+        none & f["thumb_up"],                         # Thumbs Up
+        none & f["thumb_down"],                       # Thumbs Down
+        none,                                         # Fist
+        four & f["sideways"],                         # Palm Sideways
+        four & f["thumb"] & f["spread"],              # Five Fingers Spread
+        four,                                         # Open Hand
+    ]
+    choice = np.select(conditions, np.arange(len(conditions)), default=len(GESTURES) - 1)
+    return GESTURES[choice]
+
+
+class GestureSmoother:
+    """
+    Estabiliza el gesto entre frames: un gesto nuevo sólo se acepta cuando aparece en
+    al menos ``min_votes`` de los últimos ``window`` frames (histéresis), así un frame
+    aislado no provoca un cambio de filtro.
+    """
+
+    def __init__(self, window=7, min_votes=5):
+        self.history = deque(maxlen=window)
+        self.min_votes = min_votes
+        self.current = NO_GESTURE
+
+    def update(self, gesture):
+        """
+        :param gesture: Gesto detectado en el frame actual.
+        :return: Gesto estable.
+        """
+        self.history.append(gesture)
+        candidate, votes = Counter(self.history).most_common(1)[0]
+        if candidate != self.current and votes >= self.min_votes:
+            self.current = candidate
+        return self.current
+
+    def reset(self):
+        self.history.clear()
+        self.current = NO_GESTURE
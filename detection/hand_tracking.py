@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+
+class AdaptiveHandTracker:
+    """
+    Envuelve ``mp.solutions.hands.Hands`` para reducir el costo por frame:
+
+    - Si el frame casi no cambió respecto al último procesado, reutiliza los landmarks
+      anteriores sin ejecutar MediaPipe (hasta ``max_skip`` frames seguidos).
+    - Si hay una mano conocida, busca sólo en una región alrededor de ella.
+    - Si no hay mano conocida, se perdió en la región o pasaron ``full_every``
+      inferencias (para encontrar manos nuevas), busca en el frame completo reducido.
+
+    Los landmarks devueltos siempre están normalizados respecto al frame completo.
+    """
+
+    def __init__(self, hands, downscale=0.5, roi_margin=0.35, motion_threshold=2.0,
+                 max_skip=10, max_side=320, full_every=30):
+        """
+        :param hands: Instancia de ``mp.solutions.hands.Hands`` con ``static_image_mode=True``: las
+                      imágenes enviadas (regiones y frame reducido) cambian de tamaño y posición.
+        :param downscale: Escala del frame para la búsqueda completa.
+        :param roi_margin: Margen alrededor de la mano conocida, relativo a su tamaño.
+        :param motion_threshold: Diferencia media (0-255) mínima para volver a inferir.
+        :param max_skip: Frames seguidos máximos sin inferencia.
+        :param max_side: Lado máximo de la región antes de enviarla a MediaPipe.
+        :param full_every: Inferencias entre búsquedas completas aunque haya una mano seguida.
+        """
+        self.hands = hands
+        self.downscale = downscale
+        self.roi_margin = roi_margin
+        self.motion_threshold = motion_threshold
+        self.max_skip = max_skip
+        self.max_side = max_side
+        self.full_every = full_every
+        self._inferences = 0
+        self.landmarks = None
+        self.handedness = None
+        self._thumb = None
+        self._skipped = 0
+        self.stats = {"frames": 0, "omitidos": 0, "roi": 0, "completo": 0, "perdidos": 0}
+
+    def _motion(self, frame):
+        small = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+        thumb = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+        motion = float("inf") if self._thumb is None else float(np.abs(thumb - self._thumb).mean())
+        return thumb, motion
+
+    def _run(self, image, x0, y0, scale_w, scale_h, full_w, full_h, max_side=None):
+        resized = image
+        longest = max(image.shape[:2])
+        if max_side and longest > max_side:
+            factor = max_side / longest
+            resized = cv2.resize(image, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+        results = self.hands.process(cv2.cvtColor(resized, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            return None, None
+        # Pasar de coordenadas de la región a coordenadas normalizadas del frame completo
+        for hand in results.multi_hand_landmarks:
+            for lm in hand.landmark:
+                lm.x = (x0 + lm.x * scale_w) / full_w
+                lm.y = (y0 + lm.y * scale_h) / full_h
+        return results.multi_hand_landmarks, results.multi_handedness
+
+    def _roi(self, w, h):
+        xs = [lm.x for hand in self.landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in self.landmarks for lm in hand.landmark]
+        x1, x2 = min(xs) * w, max(xs) * w
+        y1, y2 = min(ys) * h, max(ys) * h
+        side = max(x2 - x1, y2 - y1) * (1 + 2 * self.roi_margin)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        rx1, ry1 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        rx2, ry2 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        return rx1, ry1, rx2, ry2
+
+    def process(self, frame):
+        """
+        Procesa un frame BGR.
+        :return: Tupla (multi_hand_landmarks o None, se_ejecutó_inferencia).
+        """
+        self.stats["frames"] += 1
+        thumb, motion = self._motion(frame)
+        if motion < self.motion_threshold and self._skipped < self.max_skip:
+            self._skipped += 1
+            self.stats["omitidos"] += 1
+            return self.landmarks, False
+
+        self._skipped = 0
+        self._thumb = thumb
+        self._inferences += 1
+        h, w = frame.shape[:2]
+        landmarks = handedness = None
+        if self.landmarks and self._inferences % self.full_every:
+            x1, y1, x2, y2 = self._roi(w, h)
+            if x2 - x1 > 16 and y2 - y1 > 16:
+                self.stats["roi"] += 1
+                landmarks, handedness = self._run(frame[y1:y2, x1:x2], x1, y1, x2 - x1, y2 - y1, w, h,
+                                                  max_side=self.max_side)
+                if landmarks is None:
+                    self.stats["perdidos"] += 1
+
+        if landmarks is None:
+            # Sin mano conocida o se perdió: búsqueda en el frame completo reducido
+            self.stats["completo"] += 1
+            small = cv2.resize(frame, None, fx=self.downscale, fy=self.downscale, interpolation=cv2.INTER_AREA)
+            landmarks, handedness = self._run(small, 0, 0, w, h, w, h)
+
+        self.landmarks, self.handedness = landmarks, handedness
+        return landmarks, True
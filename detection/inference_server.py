@@ -0,0 +1,233 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+
+from processing.capture import FrameGrabber
+
+# Segundos máximos que se espera el resultado de un frame
+INFER_TIMEOUT = 30.0
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+class InferenceServer:
+    """
+    Servicio local de inferencia YOLO compartido por varios streams.
+
+    Los frames de todos los streams entran a una cola; un único hilo los agrupa hasta
+    ``max_batch`` frames o hasta que vence ``max_delay`` desde el primero, ejecuta una
+    sola pasada del modelo y devuelve a cada stream su resultado. Así se carga un único
+    modelo en memoria y el costo fijo por llamada se reparte entre los frames del lote.
+    """
+
+    def __init__(self, model, max_batch=8, max_delay=0.01):
+        """
+        :param model: Modelo YOLO de ultralytics (acepta una lista de imágenes).
+        :param max_batch: Tamaño máximo de lote.
+        :param max_delay: Segundos máximos que espera un frame a que se llene el lote.
+        """
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._requests = queue.Queue()
+        self._thread = None
+        self._running = False
+        self.batches = 0
+        self.frames = 0
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="InferenceServer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Detiene el hilo del servidor. Los frames que quedaban en la cola terminan con un
+        error en lugar de dejar esperando a quien los envió.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        while True:
+            try:
+                _, _, future = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("El servidor de inferencia se detuvo"))
+
+    def submit(self, frame, stream_id=None):
+        """
+        Encola un frame para inferencia.
+        :param frame: Frame BGR.
+        :param stream_id: Identificador del stream (informativo).
+        :return: ``Future`` con el resultado de ultralytics para ese frame.
+        """
+        future = Future()
+        if not self._running:
+            future.set_exception(RuntimeError("El servidor de inferencia no está activo"))
+            return future
+        self._requests.put((frame, stream_id, future))
+        return future
+
+    def infer(self, frame, stream_id=None, timeout=INFER_TIMEOUT):
+        """
+        Inferencia bloqueante de un frame a través del lote compartido.
+        :param timeout: Segundos máximos de espera (``concurrent.futures.TimeoutError`` al vencer).
+        """
+        return self.submit(frame, stream_id).result(timeout)
+
+    def client(self, stream_id=None):
+        """
+        Devuelve un objeto que se usa como un modelo YOLO (``model(frame)[0]``)
+        pero que envía los frames al servidor compartido.
+        """
+        return StreamClient(self, stream_id)
+
+    def _collect(self):
+        try:
+            batch = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+            frames = [frame for frame, _, _ in batch]
+            try:
+                results = self.model(frames, verbose=False)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.frames += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch": round(self.frames / self.batches, 2) if self.batches else 0.0,
+            "queued": self._requests.qsize(),
+        }
+
+
+class StreamClient:
+    """
+    Adaptador con la interfaz de llamada de un modelo YOLO para un stream.
+    """
+
+    def __init__(self, server, stream_id=None):
+        self.server = server
+        self.stream_id = stream_id
+
+    @property
+    def names(self):
+        return self.server.model.names
+
+    def __call__(self, frames, **kwargs):
+        """
+        :param frames: Un frame o una lista de frames, como con un modelo de ultralytics
+                       (``TiledDetector`` y ``ColorGate`` envían lotes de recortes).
+        :return: Lista con un resultado por frame.
+        """
+        if isinstance(frames, (list, tuple)):
+            # Cada frame entra por separado a la cola: el servidor los agrupa con los de otros streams
+            futures = [self.server.submit(frame, self.stream_id) for frame in frames]
+            return [future.result(INFER_TIMEOUT) for future in futures]
+        return [self.server.infer(frames, self.stream_id)]
+
+
+def get_server(name, loader, max_batch=8, max_delay=0.01):
+    """
+    Devuelve el servidor compartido para un modelo, creándolo la primera vez.
+    :param name: Clave del modelo (por ejemplo, la ruta de los pesos).
+    :param loader: Función sin argumentos que carga el modelo.
+    """
+    with _servers_lock:
+        server = _servers.get(name)
+        if server is None:
+            server = InferenceServer(loader(), max_batch=max_batch, max_delay=max_delay).start()
+            _servers[name] = server
+        return server
+
+
+def shutdown_servers():
+    """
+    Detiene todos los servidores de inferencia activos.
+    """
+    with _servers_lock:
+        for server in _servers.values():
+            server.stop()
+        _servers.clear()
+
+
+def run_streams(sources, server, process_frame, window_name, width=1280, height=720):
+    """
+    Procesa varios streams en paralelo compartiendo un servidor de inferencia.
+    Cada stream tiene su hilo de procesamiento; el hilo principal sólo muestra las ventanas.
+    :param sources: Lista de fuentes de video (ver ``processing.capture.open_source``).
+    :param server: ``InferenceServer`` compartido.
+    :param process_frame: Función ``(frame, model) -> frame`` del modo (p. ej. ``pdetection.process_frame``).
+    :param window_name: Prefijo de las ventanas de OpenCV.
+    """
+    grabbers = [FrameGrabber(source, width, height).start() for source in sources]
+    latest = [None] * len(grabbers)
+    stop = threading.Event()
+
+    def worker(index):
+        model = server.client(index)
+        grabber = grabbers[index]
+        while not stop.is_set():
+            ret, frame = grabber.read(timeout=0.5)
+            if not ret:
+                if grabber.finished:
+                    break
+                continue
+            with grabber.timer.measure("inferencia"):
+                latest[index] = process_frame(frame, model).copy()
+
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(len(grabbers))]
+    for thread in workers:
+        thread.start()
+
+    print(f"Iniciando {window_name} con {len(grabbers)} streams. Presiona 'q' para salir.")
+    try:
+        while any(thread.is_alive() for thread in workers):
+            for i, frame in enumerate(latest):
+                if frame is not None:
+                    cv2.imshow(f"{window_name} [{i}]", frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        stop.set()
+        for thread in workers:
+            thread.join(timeout=2.0)
+        for grabber in grabbers:
+            grabber.stop()
+        cv2.destroyAllWindows()
+
+    print(f"Servidor de inferencia: {server.stats()}")
+    for i, grabber in enumerate(grabbers):
+        print(f"Stream {i} ({sources[i]}):")
+        print(grabber.timer.report())
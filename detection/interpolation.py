@@ -0,0 +1,157 @@
+import math
+import time
+
+import cv2
+import numpy as np
+
+
+class DetectionInterpolator:
+    """
+    Ejecuta el detector sólo cada ``every`` frames y entre detecciones desplaza las
+    cajas con flujo óptico (Lucas-Kanade sobre puntos de cada caja, en una versión
+    reducida en grises del frame).
+
+    Con ``adaptive=True`` el intervalo se ajusta solo: se elige el menor ``every``
+    tal que el detector quepa en ese número de frames de la cámara. ``every`` puede
+    cambiarse en cualquier momento (p. ej. desde el teclado).
+    """
+
+    def __init__(self, detect, every=3, adaptive=False, max_every=8, scale=0.5, max_points=20):
+        """
+        :param detect: Función ``frame -> [(x1, y1, x2, y2, ...), ...]``; los campos
+                       después de la caja se conservan tal cual entre detecciones.
+        :param every: Frames por detección (1 = detectar siempre).
+        :param adaptive: Ajustar ``every`` según la latencia medida del detector.
+        :param max_every: Máximo de frames por detección en modo adaptativo.
+        :param scale: Escala del frame para el flujo óptico.
+        :param max_points: Puntos seguidos por caja.
+        """
+        self.detect = detect
+        self.every = max(1, int(every))
+        self.adaptive = adaptive
+        self.max_every = max_every
+        self.scale = scale
+        self.max_points = max_points
+        self.detections = []
+        # Indica si el último frame procesado ejecutó el detector
+        self.detected = False
+        self._boxes = np.empty((0, 4), dtype=np.float32)
+        self._points = None
+        self._owners = None
+        self._gray = None
+        self._needs_seed = False
+        self._since_detection = 0
+        self._detect_time = None
+        self._interval = None
+        self._last_call = None
+        self._last_detect = 0.0
+        self.stats = {"detecciones": 0, "interpoladas": 0, "cajas_perdidas": 0}
+
+    def set_every(self, every):
+        self.every = max(1, min(int(every), self.max_every))
+
+    def _to_gray(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _seed_points(self, gray):
+        points, owners = [], []
+        h, w = gray.shape
+        for i, (x1, y1, x2, y2) in enumerate(self._boxes * self.scale):
+            x1, y1 = max(0, int(x1)), max(0, int(y1))
+            x2, y2 = min(w, int(x2)), min(h, int(y2))
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            corners = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.max_points, 0.01, 3)
+            if corners is None:
+                continue
+            corners = corners.reshape(-1, 2) + (x1, y1)
+            points.append(corners)
+            owners.append(np.full(len(corners), i))
+        if points:
+            self._points = np.concatenate(points).astype(np.float32).reshape(-1, 1, 2)
+            self._owners = np.concatenate(owners)
+        else:
+            self._points, self._owners = None, None
+
+    def _run_detector(self, frame, gray):
+        start = time.perf_counter()
+        self.detections = list(self.detect(frame))
+        elapsed = self._last_detect = time.perf_counter() - start
+        self._detect_time = elapsed if self._detect_time is None else 0.8 * self._detect_time + 0.2 * elapsed
+        self._boxes = np.array([d[:4] for d in self.detections], dtype=np.float32).reshape(-1, 4)
+        self._gray = gray
+        # Los puntos se eligen recién al interpolar: con every=1 no se calculan nunca
+        self._needs_seed = True
+        self._since_detection = 0
+        self.stats["detecciones"] += 1
+
+    def _propagate(self, gray):
+        self.stats["interpoladas"] += 1
+        if self._needs_seed:
+            self._seed_points(self._gray)
+            self._needs_seed = False
+        if self._points is None:
+            self._gray = gray
+            return
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, self._points, None,
+                                                    winSize=(15, 15), maxLevel=2)
+        status = status.reshape(-1).astype(bool)
+        old, new = self._points.reshape(-1, 2), moved.reshape(-1, 2)
+        for i in range(len(self._boxes)):
+            sel = status & (self._owners == i)
+            if sel.sum() < 3:
+                self.stats["cajas_perdidas"] += int(sel.sum() == 0 and (self._owners == i).any())
+                continue
+            p0, p1 = old[sel], new[sel]
+            dx, dy = np.median(p1 - p0, axis=0) / self.scale
+            # Escala: cambio de la dispersión de los puntos respecto a su centro
+            s0 = np.linalg.norm(p0 - np.median(p0, axis=0), axis=1)
+            s1 = np.linalg.norm(p1 - np.median(p1, axis=0), axis=1)
+            ratio = float(np.clip(np.median(s1[s0 > 1e-3] / s0[s0 > 1e-3]) if (s0 > 1e-3).any() else 1.0, 0.8, 1.25))
+            x1, y1, x2, y2 = self._boxes[i]
+            cx, cy = (x1 + x2) / 2 + dx, (y1 + y2) / 2 + dy
+            hw, hh = (x2 - x1) / 2 * ratio, (y2 - y1) / 2 * ratio
+            self._boxes[i] = (cx - hw, cy - hh, cx + hw, cy + hh)
+        keep = status
+        self._points = moved[keep].reshape(-1, 1, 2)
+        self._owners = self._owners[keep]
+        if len(self._points) == 0:
+            self._points, self._owners = None, None
+        self._gray = gray
+
+    def _update_every(self):
+        if not self.adaptive or self._detect_time is None or not self._interval:
+            return
+        self.every = max(1, min(self.max_every, math.ceil(self._detect_time / self._interval)))
+
+    def process(self, frame):
+        """
+        Procesa un frame: detecta si toca, o desplaza las cajas de la última detección.
+        :return: Detecciones del frame con las cajas actualizadas.
+        """
+        now = time.perf_counter()
+        key_frame = self._gray is None or self._since_detection + 1 >= self.every
+        if self._last_call is not None:
+            # Intervalo entre frames de la cámara, sin contar el tiempo del detector
+            interval = max(now - self._last_call - self._last_detect, 1e-4)
+            self._interval = interval if self._interval is None else 0.9 * self._interval + 0.1 * interval
+        self._last_call = now
+        self._last_detect = 0.0
+
+        gray = self._to_gray(frame)
+        self.detected = key_frame
+        if key_frame:
+            self._run_detector(frame, gray)
+            self._update_every()
+            return self.detections
+
+        self._since_detection += 1
+        self._propagate(gray)
+        h, w = frame.shape[:2]
+        boxes = np.rint(self._boxes).astype(int)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+        return [(*map(int, box), *det[4:]) for box, det in zip(boxes, self.detections)]
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import numpy as np
+
+from config import MODEL_MEMORY_BUDGET_MB
+
+
+def warmup_yolo(model, size=640):
+    """
+    Ejecuta una inferencia sobre un frame negro para inicializar el modelo YOLO.
+    """
+    model(np.zeros((size, size, 3), dtype=np.uint8), verbose=False)
+
+
+def estimate_size_mb(model):
+    """
+    Estima la memoria de un modelo a partir de sus parámetros (PyTorch o Keras).
+    :return: Tamaño aproximado en MB, o 0 si no se puede estimar.
+    """
+    if isinstance(model, tuple):
+        # Cargadores que devuelven (modelo, clases)
+        model = model[0]
+    try:
+        if hasattr(model, "parameters"):
+            total = sum(p.numel() * p.element_size() for p in model.parameters())
+            return total / (1024 * 1024)
+        if hasattr(model, "count_params"):
+            return model.count_params() * 4 / (1024 * 1024)
+    except Exception:
+        pass
+    return 0.0
+
+
+class _Entry:
+    def __init__(self, loader, warmup, size_mb):
+        self.loader = loader
+        self.warmup = warmup
+        self.size_mb = size_mb
+        self.model = None
+        self.last_used = 0.0
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Registro de modelos del proceso: cada modelo se carga una sola vez, la primera vez
+    que se usa, y se conserva entre cambios de modo. Tras cargarlo se ejecuta una
+    inferencia de calentamiento para que el primer frame real no sea lento. Si se
+    define un presupuesto de memoria, se descargan los modelos usados hace más tiempo.
+    """
+
+    def __init__(self, memory_budget_mb=0):
+        """
+        :param memory_budget_mb: Memoria máxima para modelos cargados (0 = sin límite).
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, warmup=None, size_mb=None):
+        """
+        Registra un modelo sin cargarlo.
+        :param name: Nombre del modelo.
+        :param loader: Función sin argumentos que carga el modelo.
+        :param warmup: Función ``warmup(model)`` ejecutada una vez tras cargarlo.
+        :param size_mb: Tamaño en MB; si no se indica se estima al cargar.
+        """
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(loader, warmup, size_mb)
+
+    def get(self, name):
+        """
+        Devuelve el modelo, cargándolo y calentándolo si es la primera vez.
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.model is None:
+                start = time.perf_counter()
+                model = entry.loader()
+                if entry.warmup is not None:
+                    entry.warmup(model)
+                if entry.size_mb is None:
+                    entry.size_mb = estimate_size_mb(model)
+                entry.model = model
+                print(f"Modelo '{name}' listo en {time.perf_counter() - start:.2f} s")
+            entry.last_used = time.monotonic()
+            model = entry.model
+        self._enforce_budget(keep=name)
+        return model
+
+    def is_loaded(self, name):
+        entry = self._entries.get(name)
+        return entry is not None and entry.model is not None
+
+    def evict(self, name):
+        """
+        Descarga un modelo; se volverá a cargar en el siguiente ``get``.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        with entry.lock:
+            if entry.model is not None:
+                entry.model = None
+                print(f"Modelo '{name}' descargado de memoria")
+
+    def evict_idle(self, max_idle_seconds):
+        """
+        Descarga los modelos que no se usan desde hace más de ``max_idle_seconds``.
+        """
+        now = time.monotonic()
+        for name, entry in list(self._entries.items()):
+            if entry.model is not None and now - entry.last_used > max_idle_seconds:
+                self.evict(name)
+
+    def loaded_size_mb(self):
+        return sum(entry.size_mb or 0.0 for entry in self._entries.values() if entry.model is not None)
+
+    def _enforce_budget(self, keep):
+        if not self.memory_budget_mb:
+            return
+        loaded = sorted(
+            (entry.last_used, name) for name, entry in self._entries.items()
+            if entry.model is not None and name != keep
+        )
+        for _, name in loaded:
+            if self.loaded_size_mb() <= self.memory_budget_mb:
+                break
+            self.evict(name)
+
+    def status(self):
+        """
+        Estado de cada modelo registrado (cargado, tamaño y segundos sin uso).
+        """
+        now = time.monotonic()
+        return {
+            name: {
+                "loaded": entry.model is not None,
+                "size_mb": round(entry.size_mb or 0.0, 1),
+                "idle_s": round(now - entry.last_used, 1) if entry.model is not None else None,
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# Registro compartido por todos los modos de la aplicación
+registry = ModelRegistry(MODEL_MEMORY_BUDGET_MB)
@@ -1,7 +1,12 @@
 import cv2
+import numpy as np
 import torch
-from yolov5.utils.general import non_max_suppression, scale_boxes
+from yolov5.utils.general import non_max_suppression
 import ssl
+from detection.model_registry import registry
+from processing.letterbox import default_letterbox
+from processing.metrics import metrics
+from ui.overlays import default_renderer
 
 # Deshabilitar la verificación SSL para evitar errores con la descarga de modelos
 ssl._create_default_https_context = ssl._create_unverified_context
@@ -16,7 +21,7 @@ def load_model():
     """
     print("Cargando modelo YOLOv5...")
     try:
-        model = torch.hub.load('ultralytics/yolov5', 'custom', path=MODEL_PATH, force_reload=True, trust_repo=True)
+        model = torch.hub.load('ultralytics/yolov5', 'custom', path=MODEL_PATH, force_reload=False, trust_repo=True)
         model.eval()  # Modo evaluación
         CLASSES = model.names  # Nombres de las clases detectadas
         print("Modelo YOLOv5 cargado correctamente.")
@@ -26,6 +31,22 @@ def load_model():
         print(f"Error al cargar el modelo YOLOv5: {e}")
         raise
 
+def warmup_model(loaded):
+    """
+    Ejecuta una inferencia sobre un tensor vacío para inicializar el modelo.
+    """
+    model, _ = loaded
+    with torch.no_grad():
+        model(torch.zeros(1, 3, 640, 640))
+
+registry.register("yolov5", load_model, warmup=warmup_model)
+
+def get_model():
+    """
+    Devuelve (modelo, clases) del registro compartido; la descarga y carga ocurren una sola vez.
+    """
+    return registry.get("yolov5")
+
 def detect_products(frame, model, CLASSES):
     """
     Detecta productos en un frame utilizando YOLOv5.
@@ -34,34 +55,29 @@ def detect_products(frame, model, CLASSES):
     :param CLASSES: Lista de nombres de las clases.
     :return: Frame con productos detectados.
     """
-    # Preprocesar el frame para YOLO
-    img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    img_resized = cv2.resize(img, (640, 640))  # Redimensionar al tamaño esperado por YOLO
-    img_tensor = torch.from_numpy(img_resized).permute(2, 0, 1).float().div(255.0).unsqueeze(0)
+    # Preprocesar el frame para YOLO: bandas (sin deformar) en un buffer reutilizado
+    letterbox = default_letterbox(640)
+    img_tensor = letterbox.to_tensor(frame)
 
     # Realizar la detección
     with torch.no_grad():
         results = model(img_tensor)[0]
 
-    # Verificar que los resultados sean válidos
-    if results is None or results.numel() == 0:
-        print("El modelo no detectó objetos.")
-        return frame
-
     # Aplicar NMS para filtrar detecciones
-    detections = non_max_suppression(results, conf_thres=0.4, iou_thres=0.5)[0]
+    detections = non_max_suppression(results, conf_thres=0.4, iou_thres=0.5)[0] if results is not None else None
     if detections is None or len(detections) == 0:
-        print("No se encontraron detecciones después de NMS.")
+        metrics.count("frames sin detecciones")
         return frame
 
-    # Dibujar detecciones en el frame
-    for *xyxy, conf, cls in detections:
-        coords = scale_boxes(img_tensor.shape[2:], torch.tensor(xyxy), frame.shape[:2]).round().int()
-        x1, y1, x2, y2 = coords.tolist()
-        label = f"{CLASSES[int(cls)]} {conf:.2f}"
+    # Todas las cajas al frame original de una vez
+    detections = detections.cpu().numpy()
+    boxes = np.rint(letterbox.scale_boxes(detections[:, :4])).astype(int)
 
-        # Dibujar las detecciones en el frame
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    # Dibujar detecciones en el frame
+    overlay = default_renderer()
+    for (x1, y1, x2, y2), conf, cls in zip(boxes.tolist(), detections[:, 4], detections[:, 5].astype(int)):
+        label = f"{CLASSES[cls]} {conf:.2f}"
+        overlay.rectangle((x1, y1), (x2, y2), (0, 255, 0), 2)
+        overlay.text(label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
-    return frame
+    return overlay.flush(frame)
@@ -0,0 +1,77 @@
+from processing.knowledge_base import knowledge_base
+from processing.tracking import IoUTracker
+
+
+class ProductOverlayCache:
+    """
+    Sigue los productos entre frames y guarda por track lo que no cambia mientras el
+    producto siga a la vista: saludabilidad, filtro, recomendaciones, color y los
+    textos de sus etiquetas. Todo se calcula al aparecer el producto y se descarta
+    cuando su track desaparece.
+
+    El texto con la confianza sólo cambia cuando la confianza varía al menos
+    ``conf_step``, así la etiqueta rasterizada sigue en la caché de sprites
+    (``ui.overlays``) en lugar de generarse una nueva en cada frame.
+    """
+
+    def __init__(self, filter_for_score, iou_threshold=0.3, max_misses=3, conf_step=0.05):
+        """
+        :param filter_for_score: Función ``saludabilidad -> nombre de filtro``.
+        :param iou_threshold: IoU mínima para asociar una detección a un producto seguido.
+        :param max_misses: Frames sin detección antes de descartar el producto.
+        :param conf_step: Cambio mínimo de confianza para actualizar la etiqueta.
+        """
+        self.filter_for_score = filter_for_score
+        self.conf_step = conf_step
+        self.tracker = IoUTracker(iou_threshold=iou_threshold, max_misses=max_misses, match_labels=True)
+        self.created = 0
+        self.evicted = 0
+        self.label_updates = 0
+
+    def _create(self, label):
+        kb = knowledge_base()
+        health = kb.healthiness(label)
+        filter_type = self.filter_for_score(health)
+        recommendations = kb.recommendations(label, limit=2)
+        self.created += 1
+        return {
+            "health": health,
+            "filter": filter_type,
+            "color": kb.color(label),
+            "recommendations": recommendations,
+            "filter_label": f"Filtro: {filter_type}",
+            "health_label": f"Saludabilidad: {health}",
+            "recommendation_label": f"Prueba: {', '.join(recommendations)}" if recommendations else None,
+            "conf": None,
+        }
+
+    def update(self, detections):
+        """
+        :param detections: Lista de (x1, y1, x2, y2, conf, clase, ...).
+        :return: Una entrada de caché (diccionario) por detección, en el mismo orden.
+        """
+        matches = self.tracker.update([d[:4] for d in detections], [d[5] for d in detections])
+        self.evicted += len(self.tracker.removed)
+        for track in self.tracker.removed:
+            track.data.clear()
+
+        entries = [None] * len(detections)
+        for track, i in matches:
+            entry = track.data
+            if not entry:
+                entry.update(self._create(track.label))
+            conf = detections[i][4]
+            if entry["conf"] is None or abs(conf - entry["conf"]) >= self.conf_step:
+                entry["conf"] = conf
+                entry["label"] = f"{track.label}: {conf}%"
+                self.label_updates += 1
+            entries[i] = entry
+        return entries
+
+    def stats(self):
+        return {
+            "productos_seguidos": len(self.tracker.tracks),
+            "creados": self.created,
+            "descartados": self.evicted,
+            "etiquetas_actualizadas": self.label_updates,
+        }
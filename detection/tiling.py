@@ -0,0 +1,190 @@
+import threading
+
+import cv2
+import numpy as np
+
+from config import TILE_BATCH, TILE_OVERLAP, TILE_REFRESH, TILE_SIZE
+from processing.letterbox import boxes_to_arrays
+
+
+def tile_grid(height, width, tile=640, overlap=0.2):
+    """
+    Recortes que cubren el frame con solapamiento; los últimos de cada fila y
+    columna se alinean con el borde en lugar de salirse.
+    :return: Lista de (x1, y1, x2, y2).
+    """
+    step = max(1, int(tile * (1 - overlap)))
+
+    def starts(size):
+        if size <= tile:
+            return [0]
+        positions = list(range(0, size - tile, step))
+        return positions + [size - tile]
+
+    tw, th = min(tile, width), min(tile, height)
+    return [(x, y, x + tw, y + th) for y in starts(height) for x in starts(width)]
+
+
+def merge_detections(boxes, confs, classes, iou_threshold=0.5):
+    """
+    NMS entre recortes, por clase. Además de la IoU se usa la intersección sobre la
+    caja menor: un producto cortado por el borde de un recorte queda contenido en la
+    caja completa del recorte vecino y también se descarta.
+    :return: Índices de las detecciones conservadas, de mayor a menor confianza.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=int)
+    boxes = np.asarray(boxes, dtype=np.float32)
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    order = np.argsort(-np.asarray(confs))
+    keep = []
+    while len(order):
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        rest_same = rest[classes[rest] == classes[i]]
+        xx1 = np.maximum(boxes[i, 0], boxes[rest_same, 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[rest_same, 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[rest_same, 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[rest_same, 3])
+        inter = np.maximum(xx2 - xx1, 0) * np.maximum(yy2 - yy1, 0)
+        iou = inter / np.maximum(areas[i] + areas[rest_same] - inter, 1e-6)
+        ios = inter / np.maximum(np.minimum(areas[i], areas[rest_same]), 1e-6)
+        suppressed = rest_same[(iou >= iou_threshold) | (ios >= 0.8)]
+        order = rest[~np.isin(rest, suppressed)]
+    return np.array(keep, dtype=int)
+
+
+class TiledDetector:
+    """
+    Inferencia por recortes para cámaras de alta resolución: el frame se divide en
+    recortes solapados de ``tile`` píxeles que se pasan al modelo en lotes, así los
+    productos pequeños no desaparecen al reducir el frame completo. Las cajas se
+    llevan al frame y se fusionan con NMS entre recortes.
+
+    Los recortes que no cambiaron desde su última inferencia no se vuelven a inferir: se
+    reutilizan sus detecciones. Cada recorte se compara con la miniatura guardada cuando
+    se infirió (no con el frame anterior), así los cambios lentos se acumulan hasta
+    superar el umbral; además, cada ``refresh`` frames se vuelve a inferir aunque no
+    haya cambiado. Con ``full_frame`` se agrega el frame completo al lote para los
+    productos grandes que no caben en un recorte.
+    """
+
+    def __init__(self, model, tile=TILE_SIZE, overlap=TILE_OVERLAP, batch=TILE_BATCH, iou_threshold=0.5,
+                 change_threshold=0.002, full_frame=True, refresh=TILE_REFRESH):
+        """
+        :param model: Modelo YOLO de ultralytics (acepta listas de imágenes).
+        :param tile: Lado de los recortes en píxeles.
+        :param overlap: Fracción de solapamiento entre recortes vecinos.
+        :param batch: Recortes por llamada al modelo.
+        :param iou_threshold: IoU del NMS entre recortes.
+        :param change_threshold: Fracción de píxeles cambiados a partir de la cual un recorte
+                                 se considera cambiado; 0 infiere siempre todos.
+        :param full_frame: Incluir también el frame completo.
+        :param refresh: Frames tras los que un recorte se vuelve a inferir aunque no haya cambiado; 0 nunca.
+        """
+        self.model = model
+        self.tile = tile
+        self.overlap = overlap
+        self.batch = max(1, batch)
+        self.iou_threshold = iou_threshold
+        self.change_threshold = change_threshold
+        self.full_frame = full_frame
+        self.refresh = refresh
+        self._shape = None
+        self._tiles = []
+        self._cells = []
+        self._has_full_frame = False
+        self._cache = []
+        self._references = []
+        self._ages = []
+        self.stats = {"recortes_inferidos": 0, "recortes_omitidos": 0}
+
+    def _configure(self, shape):
+        self._shape = shape
+        self._tiles = tile_grid(shape[0], shape[1], self.tile, self.overlap)
+        self._has_full_frame = self.full_frame and len(self._tiles) > 1
+        if self._has_full_frame:
+            self._tiles.append((0, 0, shape[1], shape[0]))
+        self._cache = [None] * len(self._tiles)
+        self._references = [None] * len(self._tiles)
+        self._ages = [0] * len(self._tiles)
+        self._cells = []
+
+    def _thumbnail(self, frame):
+        # Comparación en una miniatura en grises (1/8): barata frente a una inferencia
+        small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), None, fx=0.125, fy=0.125,
+                           interpolation=cv2.INTER_AREA)
+        if not self._cells:
+            h, w = small.shape
+            for x1, y1, x2, y2 in self._tiles:
+                ax1, ay1 = min(x1 // 8, w - 1), min(y1 // 8, h - 1)
+                self._cells.append((ax1, ay1, max(min(x2 // 8, w), ax1 + 1), max(min(y2 // 8, h), ay1 + 1)))
+        return small
+
+    def _changed(self, small):
+        if self.change_threshold <= 0:
+            return [True] * len(self._tiles)
+        changed = []
+        for i, (ax1, ay1, ax2, ay2) in enumerate(self._cells):
+            reference = self._references[i]
+            if reference is None or (self.refresh and self._ages[i] >= self.refresh):
+                changed.append(True)
+                continue
+            # Píxeles que se alejaron de la miniatura de la última inferencia más que el ruido del sensor
+            moved = cv2.absdiff(small[ay1:ay2, ax1:ax2], reference) > 20
+            changed.append(np.count_nonzero(moved) >= self.change_threshold * moved.size)
+        if self._has_full_frame:
+            # El frame completo se vuelve a inferir también si cambió cualquiera de sus recortes
+            changed[-1] = changed[-1] or any(changed[:-1])
+        return changed
+
+    def __call__(self, frame):
+        """
+        :return: Tupla (cajas int (N, 4), confianzas (N,), clases int (N,)) en coordenadas del frame.
+        """
+        if frame.shape[:2] != self._shape:
+            self._configure(frame.shape[:2])
+        small = self._thumbnail(frame)
+        # Frames transcurridos desde la última inferencia de cada recorte
+        for i in range(len(self._tiles)):
+            self._ages[i] += 1
+        changed = self._changed(small)
+        pending = [i for i, flag in enumerate(changed) if flag or self._cache[i] is None]
+        self.stats["recortes_inferidos"] += len(pending)
+        self.stats["recortes_omitidos"] += len(self._tiles) - len(pending)
+        for i in pending:
+            ax1, ay1, ax2, ay2 = self._cells[i]
+            self._references[i] = small[ay1:ay2, ax1:ax2].copy()
+            self._ages[i] = 0
+
+        for start in range(0, len(pending), self.batch):
+            chunk = pending[start:start + self.batch]
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in (self._tiles[i] for i in chunk)]
+            for i, result in zip(chunk, self.model(crops, verbose=False)):
+                boxes, confs, classes = boxes_to_arrays(result.boxes)
+                x1, y1 = self._tiles[i][:2]
+                self._cache[i] = (boxes + (x1, y1, x1, y1), confs, classes)
+
+        boxes = np.concatenate([c[0] for c in self._cache])
+        confs = np.concatenate([c[1] for c in self._cache])
+        classes = np.concatenate([c[2] for c in self._cache])
+        if len(self._tiles) > 1:
+            keep = merge_detections(boxes, confs, classes, self.iou_threshold)
+            boxes, confs, classes = boxes[keep], confs[keep], classes[keep]
+        return boxes, confs, classes
+
+
+_detectors = threading.local()
+
+
+def default_tiled_detector(model):
+    """
+    Detector por recortes del hilo actual para ``model`` (el estado de cambios es por stream).
+    """
+    detectors = getattr(_detectors, "detectors", None)
+    if detectors is None:
+        detectors = _detectors.detectors = {}
+    detector = detectors.get(id(model))
+    if detector is None or detector.model is not model:
+        detector = detectors[id(model)] = TiledDetector(model)
+    return detector
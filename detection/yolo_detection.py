@@ -1,17 +1,12 @@
 from ultralytics import YOLO
-import cv2
-import cvzone
 import math
+from processing.roi_filters import default_engine
+from processing.filters import apply_filters
+from processing.knowledge_base import knowledge_base
+from ui.overlays import default_renderer
 
-# Definir las clases y sus colores
+# Clases del modelo; los colores vienen de la base de conocimiento
 classNames = ['apple', 'instant_noodle', 'juice', 'orange', 'sandwich']
-classColors = {
-    'apple': (0, 255, 0),         # Verde
-    'instant_noodle': (0, 255, 255),  # Amarillo
-    'juice': (255, 165, 0),       # Naranja
-    'orange': (255, 0, 0),        # Rojo
-    'sandwich': (128, 0, 128)     # Morado
-}
 
 def load_model(model_path="best.pt"):
     """
@@ -24,29 +19,6 @@ def load_model(model_path="best.pt"):
     print("Modelo YOLO cargado correctamente.")
     return model
 
-def apply_filters(roi, brightness, blur, hue):
-    """
-    Aplica filtros de brillo, desenfoque y tonalidad a la región de interés.
-    :param roi: Región de interés.
-    :param brightness: Nivel de brillo.
-    :param blur: Nivel de desenfoque.
-    :param hue: Valor de tonalidad.
-    :return: Región de interés filtrada.
-    """
-    # Aplicar brillo
-    roi = cv2.convertScaleAbs(roi, alpha=brightness / 50, beta=0)
-
-    # Aplicar desenfoque
-    if blur > 0:
-        roi = cv2.GaussianBlur(roi, (blur * 2 + 1, blur * 2 + 1), 0)
-
-    # Cambiar tonalidad (espacio HSV)
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    hsv[:, :, 0] = (hsv[:, :, 0] + hue) % 180
-    roi = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-
-    return roi
-
 def process_frame(frame, model, brightness, blur, hue):
     """
     Procesa el frame con el modelo YOLO y aplica filtros a las regiones detectadas.
@@ -59,33 +31,30 @@ def process_frame(frame, model, brightness, blur, hue):
     """
     results = model(frame, stream=True)
 
-    for r in results:
-        boxes = r.boxes
-        for box in boxes:
-            # Coordenadas del bounding box
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
+    def roi_filter(roi):
+        return apply_filters(roi, brightness, blur, hue)
 
-            # Extraer la región de interés (ROI)
-            roi = frame[y1:y2, x1:x2]
+    overlay = default_renderer()
+    for r in results:
+        boxes = [(*map(int, box.xyxy[0]), box) for box in r.boxes]
 
-            # Aplicar filtros a la ROI
-            if roi.size > 0:  # Evitar errores si el ROI está vacío
-                roi_filtered = apply_filters(roi, brightness, blur, hue)
-                frame[y1:y2, x1:x2] = roi_filtered  # Reemplazar en la imagen original
+        # Aplicar filtros a las ROIs: se calculan una vez sobre la unión de las cajas
+        default_engine().apply(frame, [(x1, y1, x2, y2, roi_filter) for x1, y1, x2, y2, _ in boxes])
 
+        for x1, y1, x2, y2, box in boxes:
             # Obtener clase y confianza
             conf = math.ceil((box.conf[0] * 100)) / 100
             cls = int(box.cls[0])
             currentClass = classNames[cls]
 
             # Seleccionar el color basado en la clase detectada
-            myColor = classColors.get(currentClass, (0, 0, 255))  # Rojo por defecto si no se encuentra la clase
+            myColor = knowledge_base().color(currentClass, (0, 0, 255))  # Rojo por defecto si no se encuentra la clase
 
             # Dibujar bounding box y texto
-            cvzone.putTextRect(frame, f'{currentClass} {conf}',
-                               (max(0, x1), max(35, y1)),
-                               scale=0.5, thickness=1, colorB=myColor,
-                               colorT=(255, 255, 255), offset=5)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), myColor, 3)
+            overlay.text_rect(f'{currentClass} {conf}',
+                              (max(0, x1), max(35, y1)),
+                              scale=0.5, thickness=1, colorB=myColor,
+                              colorT=(255, 255, 255), offset=5)
+            overlay.rectangle((x1, y1), (x2, y2), myColor, 3)
 
-    return frame
+    return overlay.flush(frame)
@@ -1,45 +1,96 @@
+import time
+
+_START = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox
-from PP.PPE.pdetection import load_model, process_frame  # YOLO detection
-from PP.PPE.detection_haar import run_yolo_detection  # YOLO preentrenado en COCO
-from PP.PPE.emotion_detection import detect_emotion  # Detección de emociones
-from PP.PPE.gesture_detection import detect_and_apply_filters  # Detección de gestos
+from processing.capture import FrameGrabber
+from processing.pipeline import run_pipeline
+from processing.metrics import metrics, start_exporter, stop_exporter
+from ui.overlays import default_renderer, sprite_cache
+from ui.mode_loader import ModeLoader
+from ui.live_view import LiveViewWindow
+from detection.inference_server import get_server, run_streams
+from config import (CAMERA_SOURCE, CAMERA_SOURCES, FRAME_WIDTH, FRAME_HEIGHT, PIPELINE_MODE, PRODUCT_DETECT_EVERY,
+                    PRELOAD_MODE, LIVE_VIEW)
 import cv2
 
+# Los modos (y sus dependencias pesadas: ultralytics, DeepFace, MediaPipe) se importan al elegirlos
+modes = ModeLoader()
+
+# Ventana de la vista en vivo (una sola, reutilizada entre modos)
+live_window = None
+
 
 def run_object_classification():
     """
     Ejecuta la clasificación de objetos con YOLO personalizado.
     """
-    model = load_model()
-    cap = cv2.VideoCapture(1)
-    cap.set(3, 1280)
-    cap.set(4, 720)
+    pdetection = modes.load("productos")
+    get_model, process_frame = pdetection.get_model, pdetection.process_frame
+    if len(CAMERA_SOURCES) > 1:
+        # Varias cámaras comparten un único modelo con inferencia por lotes
+        server = get_server("productos", get_model)
+        run_streams(CAMERA_SOURCES, server, process_frame, "Clasificación de Objetos", FRAME_WIDTH, FRAME_HEIGHT)
+        return
+
+    model = get_model()
+    if PIPELINE_MODE:
+        run_pipeline(pdetection.pipeline_stages(model), "Clasificación de Objetos", CAMERA_SOURCE,
+                     FRAME_WIDTH, FRAME_HEIGHT)
+        return
+
+    # Detección cada K frames con las cajas interpoladas entre medio (teclas +/- cambian K, 'a' lo hace adaptativo).
+    # Con K=1 se detecta en todos los frames, pero K sigue pudiendo cambiarse desde el teclado
+    interpolator = pdetection.create_interpolator(model, PRODUCT_DETECT_EVERY)
+
+    metrics.begin("clasificación")
+    grabber = FrameGrabber(CAMERA_SOURCE, FRAME_WIDTH, FRAME_HEIGHT, timer=metrics).start()
 
     print("Iniciando clasificación de objetos. Presiona 'q' para salir.")
     while True:
-        ret, frame = cap.read()
+        ret, frame = grabber.read()
         if not ret:
             print("Error: No se pudo capturar el video.")
             break
 
         # Procesar frame con YOLO
-        frame = process_frame(frame, model, 50, 0, 0)  # Sin filtros adicionales
-        cv2.imshow("Clasificación de Objetos", frame)
-
+        frame = pdetection.render_detections(frame, interpolator.process(frame))
+        if interpolator.every > 1 or interpolator.adaptive:
+            # Sólo con interpolación: con K=1 fijo se detecta en todos los frames, como sin interpolador
+            mode = "auto" if interpolator.adaptive else "fijo"
+            overlay = default_renderer()
+            overlay.text(f"Deteccion cada {interpolator.every} frames ({mode})", (10, 30),
+                         cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+            overlay.flush(frame)
+        cv2.imshow("Clasificación de Objetos", metrics.end_frame(frame))
+        grabber.mark_displayed()
+
+        key = cv2.waitKey(1) & 0xFF
         # Salir con 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if key == ord('q'):
             break
+        if key in (ord('+'), ord('-')):
+            interpolator.adaptive = False
+            interpolator.set_every(interpolator.every + (1 if key == ord('+') else -1))
+        elif key == ord('a'):
+            interpolator.adaptive = not interpolator.adaptive
 
-    cap.release()
+    grabber.stop()
     cv2.destroyAllWindows()
+    if metrics.enabled:
+        print(metrics.report())
+        print(f"Etiquetas de productos: {pdetection.overlay_cache().stats()}, sprites: {sprite_cache.stats()}")
+        if pdetection.color_gate() is not None:
+            print(f"Filtro de color: {pdetection.color_gate().stats}")
+        print(f"Detección interpolada: {interpolator.stats}")
 
 
 def run_general_object_detection():
     """
     Ejecuta la detección de objetos generales con YOLO (modelo COCO preentrenado).
     """
-    run_yolo_detection()
+    modes.load("coco").run_yolo_detection()
 
 
 def run_filter_application():
@@ -53,14 +104,35 @@ def run_emotion_detection():
     """
     Ejecuta la detección de emociones faciales.
     """
-    detect_emotion()
+    modes.load("emociones").detect_emotion()
 
 
 def run_gesture_detection():
     """
     Ejecuta la detección de gestos de manos con aplicación de filtros globales.
     """
-    detect_and_apply_filters()
+    modes.load("gestos").detect_and_apply_filters()
+
+
+def start_mode(root, mode, run_loop):
+    """
+    Abre un modo en la vista en vivo, o en su propia ventana de OpenCV si la vista
+    está desactivada o se usan varias cámaras / el pipeline concurrente.
+    :param mode: Nombre del modo en ``ModeLoader``.
+    :param run_loop: Función bloqueante del modo.
+    """
+    global live_window
+    if not LIVE_VIEW or len(CAMERA_SOURCES) > 1 or PIPELINE_MODE:
+        run_loop()
+        return
+    if live_window is None:
+        live_window = LiveViewWindow(root, modes, on_close=close_live_window)
+    live_window.show(mode)
+
+
+def close_live_window():
+    global live_window
+    live_window = None
 
 
 def show_about():
@@ -109,6 +181,7 @@ def main():
     """
     Interfaz gráfica para el menú principal.
     """
+    start_exporter()
     root = tk.Tk()
     root.title("Sistema Integral de Detección y Clasificación")
     root.geometry("600x700")  # Tamaño más grande
@@ -127,15 +200,39 @@ def main():
     title_label.pack(pady=30)
 
     # Crear botones personalizados
-    create_custom_button(root, "Clasificación de Objetos Personalizados", run_object_classification).pack(pady=15)
-    create_custom_button(root, "Detección de Objetos Generales (COCO)", run_general_object_detection).pack(pady=15)
-    create_custom_button(root, "Detección de Emociones", run_emotion_detection).pack(pady=15)
-    create_custom_button(root, "Detección de Gestos (Manos)", run_gesture_detection).pack(pady=15)
+    create_custom_button(root, "Clasificación de Objetos Personalizados",
+                         lambda: start_mode(root, "productos", run_object_classification)).pack(pady=15)
+    create_custom_button(root, "Detección de Objetos Generales (COCO)",
+                         lambda: start_mode(root, "coco", run_general_object_detection)).pack(pady=15)
+    create_custom_button(root, "Detección de Emociones",
+                         lambda: start_mode(root, "emociones", run_emotion_detection)).pack(pady=15)
+    create_custom_button(root, "Detección de Gestos (Manos)",
+                         lambda: start_mode(root, "gestos", run_gesture_detection)).pack(pady=15)
     create_custom_button(root, "Acerca de", show_about).pack(pady=15)
     create_custom_button(root, "Salir", root.destroy).pack(pady=30)
 
+    # Una vez visible el menú, precargar el modo más usado en segundo plano
+    root.after(0, on_menu_ready)
+
     # Iniciar la interfaz gráfica
     root.mainloop()
+    if live_window is not None:
+        live_window.view.stop()
+    stop_exporter()
+    if metrics.enabled:
+        print(modes.report())
+
+
+def on_menu_ready():
+    """
+    Registra el tiempo de arranque del menú e inicia la precarga configurada.
+    """
+    startup = time.perf_counter() - _START
+    metrics.add("arranque del menú", startup)
+    if metrics.enabled:
+        print(f"Menú listo en {startup * 1000:.0f} ms")
+    if PRELOAD_MODE in modes.modules:
+        modes.preload(PRELOAD_MODE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from processing.timing import StageTimer
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class ImageDirectorySource:
+    """
+    Fuente de frames a partir de un directorio de imágenes (orden alfabético).
+    Imita la interfaz de ``cv2.VideoCapture`` usada por el resto del código.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.position = 0
+
+    def isOpened(self):
+        return self.position < len(self.files)
+
+    def set(self, prop, value):
+        # Las imágenes se entregan con su tamaño original
+        return False
+
+    def read(self, image=None):
+        while self.position < len(self.files):
+            path = self.files[self.position]
+            self.position += 1
+            frame = cv2.imread(path)
+            if frame is None:
+                print(f"Advertencia: no se pudo leer la imagen {path}")
+                continue
+            if image is not None and image.shape == frame.shape:
+                image[...] = frame
+                return True, image
+            return True, frame
+        return False, None
+
+    def release(self):
+        self.position = len(self.files)
+
+
+def is_live_source(source):
+    """
+    Indica si la fuente es una cámara (índice entero) y no un archivo o directorio.
+    """
+    return isinstance(source, int) or (isinstance(source, str) and source.isdigit())
+
+
+def open_source(source, width=1280, height=720):
+    """
+    Abre una fuente de video: índice de cámara, archivo de video o directorio de imágenes.
+    :param source: Índice de cámara (int o str numérico), ruta de video o directorio.
+    :param width: Ancho solicitado a la cámara.
+    :param height: Alto solicitado a la cámara.
+    :return: Objeto con la interfaz de ``cv2.VideoCapture``.
+    """
+    if is_live_source(source):
+        cap = cv2.VideoCapture(int(source))
+        cap.set(3, width)
+        cap.set(4, height)
+        return cap
+    if os.path.isdir(source):
+        return ImageDirectorySource(source)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"La fuente de video no existe: {source}")
+    return cv2.VideoCapture(source)
+
+
+class FrameGrabber:
+    """
+    Captura frames en un hilo de fondo sobre un anillo acotado de buffers preasignados.
+
+    El hilo de captura escribe en un buffer libre y el bucle principal recibe el frame
+    más reciente sin copiarlo. Con fuentes en vivo los frames no leídos se descartan
+    (``drop_frames``) para no acumular latencia; con archivos o directorios se entregan
+    todos en orden.
+    """
+
+    def __init__(self, source=1, width=1280, height=720, buffers=3, drop_frames=None, timer=None):
+        """
+        :param source: Índice de cámara, ruta de video o directorio de imágenes.
+        :param width: Ancho solicitado a la cámara.
+        :param height: Alto solicitado a la cámara.
+        :param buffers: Número de buffers del anillo (mínimo 3).
+        :param drop_frames: Descartar frames viejos. Por defecto sólo con cámaras.
+        :param timer: ``StageTimer`` compartido; se crea uno si no se indica.
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.drop_frames = is_live_source(source) if drop_frames is None else drop_frames
+        self.timer = timer or StageTimer()
+
+        self._buffers = [None] * max(3, buffers)
+        self._stamps = [0.0] * len(self._buffers)
+        self._pending = deque()
+        self._held = None
+        self._writing = None
+        self._finished = False
+        self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self._cap = None
+        self.frame_time = None
+        self.frames_read = 0
+
+    def start(self):
+        """
+        Abre la fuente y lanza el hilo de captura.
+        """
+        self._cap = open_source(self.source, self.width, self.height)
+        self._running = True
+        self._finished = False
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def _free_slot(self):
+        for i in range(len(self._buffers)):
+            if i != self._held and i not in self._pending:
+                return i
+        if self.drop_frames and self._pending:
+            # Reutilizar el frame pendiente más viejo
+            return self._pending[0]
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                slot = self._free_slot()
+                while self._running and slot is None:
+                    self._cond.wait()
+                    slot = self._free_slot()
+                if not self._running:
+                    break
+                if slot in self._pending:
+                    self._pending.remove(slot)
+                    self.timer.count("frames descartados")
+                self._writing = slot
+
+            start = time.perf_counter()
+            ret, frame = self._cap.read(self._buffers[slot]) if self._buffers[slot] is not None \
+                else self._cap.read()
+            elapsed = time.perf_counter() - start
+
+            with self._cond:
+                self._writing = None
+                if not ret:
+                    self._finished = True
+                    self._cond.notify_all()
+                    break
+                self.timer.add("captura", elapsed)
+                self._buffers[slot] = frame
+                self._stamps[slot] = time.perf_counter()
+                if self.drop_frames:
+                    self.timer.count("frames descartados", len(self._pending))
+                    self._pending.clear()
+                self._pending.append(slot)
+                self._cond.notify_all()
+
+        self._cap.release()
+
+    def read(self, timeout=None):
+        """
+        Devuelve el siguiente frame disponible, como ``cv2.VideoCapture.read``.
+        El frame entregado pertenece al bucle hasta la siguiente llamada a ``read``.
+        :param timeout: Segundos máximos de espera; ``None`` espera indefinidamente.
+        :return: Tupla (ret, frame).
+        """
+        start = time.perf_counter()
+        with self._cond:
+            self._held = None
+            self._cond.notify_all()
+            deadline = None if timeout is None else start + timeout
+            while not self._pending and not self._finished:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return False, None
+                self._cond.wait(remaining)
+            if not self._pending:
+                return False, None
+            slot = self._pending.popleft()
+            self._held = slot
+            self.frame_time = self._stamps[slot]
+            self.frames_read += 1
+        self.timer.add("espera", time.perf_counter() - start)
+        return True, self._buffers[slot]
+
+    @property
+    def finished(self):
+        """
+        Indica si la fuente se agotó y ya no quedan frames por entregar.
+        """
+        with self._cond:
+            return self._finished and not self._pending
+
+    def mark_displayed(self):
+        """
+        Registra la latencia desde la captura del último frame hasta su visualización.
+        """
+        if self.frame_time is not None:
+            self.timer.add("captura→display", time.perf_counter() - self.frame_time)
+
+    def stop(self):
+        """
+        Detiene el hilo de captura y libera la fuente.
+        """
+        with self._cond:
+            self._running = False
+            self._held = None
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
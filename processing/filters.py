@@ -1,10 +1,216 @@
+from functools import lru_cache
+
 import cv2
+import numpy as np
+
+_IDENTITY = np.arange(256, dtype=np.uint8)
+
+
+class Filter:
+    """
+    Filtro sobre un frame BGR: se llama como función ``frame -> frame``.
+    """
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+    def __call__(self, frame):
+        return self.fn(frame)
+
+    def __repr__(self):
+        return f"Filter({self.name!r})"
+
+
+class PointOp(Filter):
+    """
+    Operación puntual precompilada en una tabla de 256 entradas y aplicada con ``cv2.LUT``.
+    Dos operaciones puntuales seguidas se combinan en una sola tabla.
+    """
+
+    def __init__(self, name, lut):
+        self.lut = lut
+        super().__init__(name, lambda frame: cv2.LUT(frame, self.lut))
+
+    def then(self, other):
+        return PointOp(f"{self.name} + {other.name}", other.lut[self.lut])
+
+
+# --- Operaciones puntuales -------------------------------------------------
+
+@lru_cache(maxsize=64)
+def brightness_contrast(alpha, beta=0):
+    """
+    Equivalente a ``cv2.convertScaleAbs(frame, alpha=alpha, beta=beta)``.
+    """
+    # Calcular la tabla con la propia función de OpenCV garantiza el mismo redondeo
+    lut = cv2.convertScaleAbs(_IDENTITY.reshape(1, 256), alpha=alpha, beta=beta).reshape(256)
+    return PointOp(f"Brillo({alpha}, {beta})", lut)
+
+
+@lru_cache(maxsize=None)
+def negative():
+    return PointOp("Negative", 255 - _IDENTITY)
+
+
+@lru_cache(maxsize=None)
+def solarization(threshold=127):
+    # Igual que bitwise_not(threshold(frame, 127, 255, THRESH_BINARY))
+    return PointOp("Solarization", np.where(_IDENTITY > threshold, 0, 255).astype(np.uint8))
+
+
+@lru_cache(maxsize=180)
+def hue_shift(shift):
+    """
+    Desplaza la tonalidad ``shift`` unidades (escala HSV de OpenCV, 0-179).
+    El tono no es una operación puntual sobre BGR, así que se convierte a HSV una vez
+    y el desplazamiento se aplica con una tabla de 3 canales (sólo cambia H).
+    """
+    shift = int(shift) % 180
+    if shift == 0:
+        return Filter("Hue(0)", lambda frame: frame)
+    lut = np.empty((1, 256, 3), dtype=np.uint8)
+    lut[0, :, 0] = (np.arange(256) + shift) % 180
+    lut[0, :, 1] = _IDENTITY
+    lut[0, :, 2] = _IDENTITY
+
+    def apply(frame):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        cv2.LUT(hsv, lut, dst=hsv)
+        return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+
+    return Filter(f"Hue({shift})", apply)
+
+
+# --- Filtros espaciales ----------------------------------------------------
+
+@lru_cache(maxsize=32)
+def gaussian_blur(ksize=15):
+    return Filter(f"Gaussian Blur({ksize})", lambda frame: cv2.GaussianBlur(frame, (ksize, ksize), 0))
+
+
+@lru_cache(maxsize=32)
+def box_blur(ksize=15):
+    return Filter(f"Smooth({ksize})", lambda frame: cv2.blur(frame, (ksize, ksize)))
+
+
+def _sobel(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    # CV_16S basta para derivadas 3x3 de imágenes de 8 bits
+    abs_sobel_x = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 1, 0, ksize=3))
+    abs_sobel_y = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 0, 1, ksize=3))
+    return cv2.merge((abs_sobel_x, abs_sobel_y, gray))
+
+
+def _laplacian(frame):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    abs_laplacian = cv2.convertScaleAbs(cv2.Laplacian(gray, cv2.CV_16S))
+    return cv2.merge((abs_laplacian, abs_laplacian, abs_laplacian))
+
+
+_SEPIA = np.array([[0.272, 0.534, 0.131],
+                   [0.349, 0.686, 0.168],
+                   [0.393, 0.769, 0.189]])
+
+
+def _canny(frame):
+    edges = cv2.Canny(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 100, 200)
+    return cv2.merge((edges, edges, edges))
+
+
+def _pixelation(frame):
+    h, w = frame.shape[:2]
+    temp = cv2.resize(frame, (max(1, w // 10), max(1, h // 10)), interpolation=cv2.INTER_LINEAR)
+    return cv2.resize(temp, (w, h), interpolation=cv2.INTER_NEAREST)
+
+
+# Registro de filtros por nombre (los nombres usados por gestos, saludabilidad y emociones)
+FILTERS = {
+    "Gaussian Blur": gaussian_blur(15),
+    "Sobel": Filter("Sobel", _sobel),
+    "Laplacian": Filter("Laplacian", _laplacian),
+    "Smooth": box_blur(15),
+    "Negative": negative(),
+    "Sepia": Filter("Sepia", lambda frame: cv2.transform(frame, _SEPIA)),
+    "Color Shift": Filter("Color Shift", lambda frame: np.ascontiguousarray(frame[:, :, ::-1])),
+    "Canny": Filter("Canny", _canny),
+    "Pixelation": Filter("Pixelation", _pixelation),
+    "Solarization": solarization(),
+    "Happy": brightness_contrast(1.5, 50),
+    "Sad": gaussian_blur(15),
+    "Fear": hue_shift(50),
+}
+
+
+def register_filter(name, fn):
+    """
+    Agrega un filtro al registro.
+    :param name: Nombre del filtro.
+    :param fn: Función ``frame -> frame`` o ``Filter``.
+    """
+    FILTERS[name] = fn if isinstance(fn, Filter) else Filter(name, fn)
+
+
+def get_filter(filter_type):
+    """
+    Devuelve el filtro registrado (o el propio ``Filter`` si ya lo es).
+    """
+    if isinstance(filter_type, Filter):
+        return filter_type
+    return FILTERS.get(filter_type)
+
+
+@lru_cache(maxsize=128)
+def _compile(filters):
+    steps = []
+    for f in filters:
+        if steps and isinstance(f, PointOp) and isinstance(steps[-1], PointOp):
+            # Fusionar operaciones puntuales consecutivas en una sola tabla
+            steps[-1] = steps[-1].then(f)
+        else:
+            steps.append(f)
+    if len(steps) == 1:
+        return steps[0]
+
+    def apply(frame):
+        for step in steps:
+            frame = step(frame)
+        return frame
+
+    return Filter(" -> ".join(step.name for step in steps), apply)
+
+
+def chain(*filters):
+    """
+    Compone varios filtros (nombres o ``Filter``) en uno solo, en orden.
+    Las operaciones puntuales consecutivas se combinan en una única pasada de ``cv2.LUT``.
+    """
+    resolved = tuple(get_filter(f) for f in filters)
+    if any(f is None for f in resolved):
+        missing = [name for name, f in zip(filters, resolved) if f is None]
+        raise KeyError(f"Filtros no registrados: {missing}")
+    return _compile(resolved)
+
+
+def apply_filter(frame, filter_type):
+    """
+    Aplica un filtro del registro por nombre; si no existe devuelve el frame sin cambios.
+    """
+    f = get_filter(filter_type)
+    return f(frame) if f is not None else frame
+
 
 def apply_filters(roi, brightness, blur, hue):
-    roi = cv2.convertScaleAbs(roi, alpha=brightness / 50, beta=0)
+    """
+    Aplica brillo, desenfoque y tonalidad a la región de interés.
+    :param roi: Región de interés.
+    :param brightness: Nivel de brillo (50 = sin cambio).
+    :param blur: Nivel de desenfoque.
+    :param hue: Desplazamiento de tonalidad.
+    :return: Región de interés filtrada.
+    """
+    steps = [brightness_contrast(brightness / 50, 0)]
     if blur > 0:
-        roi = cv2.GaussianBlur(roi, (blur * 2 + 1, blur * 2 + 1), 0)
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    hsv[:, :, 0] = (hsv[:, :, 0] + hue) % 180
-    roi = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
-    return roi
+        steps.append(gaussian_blur(blur * 2 + 1))
+    steps.append(hue_shift(hue))
+    return chain(*steps)(roi)
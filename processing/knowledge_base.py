@@ -0,0 +1,267 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import PRODUCT_DATABASE
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+class Product:
+    """
+    Entrada de la base de conocimiento. Usa ``__slots__`` para que catálogos de
+    decenas de miles de productos ocupen poca memoria.
+    """
+
+    __slots__ = ("name", "category", "healthy", "healthiness", "color", "recommendations")
+
+    def __init__(self, name, category=None, healthy=False, healthiness=None, color=None, recommendations=()):
+        self.name = name
+        self.category = category
+        self.healthy = bool(healthy)
+        # Sin puntaje explícito se aproxima a partir del indicador saludable
+        self.healthiness = int(healthiness) if healthiness is not None else (70 if self.healthy else 30)
+        self.color = tuple(color) if color else None
+        self.recommendations = tuple(recommendations or ())
+
+    def to_dict(self):
+        return {
+            "category": self.category,
+            "healthy": self.healthy,
+            "healthiness": self.healthiness,
+            "color": list(self.color) if self.color else None,
+            "recommendations": list(self.recommendations),
+        }
+
+    def __repr__(self):
+        return f"Product({self.name!r}, {self.category!r}, healthiness={self.healthiness})"
+
+
+def resolve_path(path):
+    """
+    Resuelve rutas relativas respecto a la raíz del proyecto, no al directorio actual.
+    """
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [Product(name, **entry) for name, entry in data.items()]
+
+
+def load_sqlite(path):
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = connection.execute(
+            "SELECT name, category, healthy, healthiness, color, recommendations FROM products").fetchall()
+    finally:
+        connection.close()
+    return [Product(name, category, healthy, healthiness,
+                    json.loads(color) if color else None,
+                    json.loads(recommendations) if recommendations else ())
+            for name, category, healthy, healthiness, color, recommendations in rows]
+
+
+def load_products(path):
+    """
+    Carga los productos de un archivo JSON (``{nombre: {...}}``) o de una base SQLite
+    con una tabla ``products``.
+    """
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return load_sqlite(path)
+    return load_json(path)
+
+
+def export_sqlite(products, path):
+    """
+    Guarda los productos en una base SQLite (formato recomendado para catálogos grandes).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(
+            "CREATE TABLE products (name TEXT PRIMARY KEY, category TEXT, healthy INTEGER, "
+            "healthiness INTEGER, color TEXT, recommendations TEXT)")
+        connection.execute("CREATE INDEX products_category ON products (category, healthy)")
+        connection.executemany(
+            "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)",
+            [(p.name, p.category, int(p.healthy), p.healthiness,
+              json.dumps(list(p.color)) if p.color else None,
+              json.dumps(list(p.recommendations)))
+             for p in products])
+        connection.commit()
+    finally:
+        connection.close()
+
+
+class _Index:
+    """
+    Índices inmutables de una versión cargada del catálogo; se reemplazan completos al recargar.
+    """
+
+    def __init__(self, products):
+        self.products = {p.name: p for p in products}
+        self.by_category = {}
+        self.by_health = {True: [], False: []}
+        for product in self.products.values():
+            self.by_category.setdefault(product.category, []).append(product.name)
+            self.by_health[product.healthy].append(product.name)
+        # Alternativas saludables de cada categoría, de más a menos saludable
+        self.healthy_by_category = {
+            category: tuple(sorted((n for n in names if self.products[n].healthy),
+                                   key=lambda n: -self.products[n].healthiness))
+            for category, names in self.by_category.items()
+        }
+
+
+class ProductKnowledgeBase:
+    """
+    Base de conocimiento de productos: recomendaciones, saludabilidad y color por clase.
+
+    El archivo se lee una sola vez y se indexa por nombre, categoría y saludable, así
+    cada consulta es O(1). Si el archivo cambia en disco (se compara su ``mtime`` como
+    mucho cada ``check_interval`` segundos) se vuelve a cargar sin reiniciar la aplicación.
+    """
+
+    def __init__(self, path=PRODUCT_DATABASE, check_interval=1.0):
+        """
+        :param path: Archivo JSON o SQLite; las rutas relativas parten de la raíz del proyecto.
+        :param check_interval: Segundos entre comprobaciones de cambios en disco (0 = siempre).
+        """
+        self.path = resolve_path(path)
+        self.check_interval = check_interval
+        self._index = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _current(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self.check_interval:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                try:
+                    mtime = os.path.getmtime(self.path)
+                except OSError:
+                    mtime = None
+                if self._index is None or mtime != self._mtime:
+                    self._load(mtime)
+        return self._index
+
+    def _load(self, mtime):
+        try:
+            products = load_products(self.path) if mtime is not None else []
+        except (OSError, ValueError, TypeError, sqlite3.Error) as e:
+            if self._index is not None:
+                # Archivo a medio escribir o inválido: conservar la versión anterior
+                print(f"No se pudo recargar {self.path}: {e}")
+                return
+            raise
+        if mtime is None:
+            print(f"Base de conocimiento no encontrada: {self.path}")
+        self._index = _Index(products)
+        self._mtime = mtime
+        self.reloads += 1
+
+    def reload(self):
+        """
+        Fuerza la recarga del archivo.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            self._load(mtime)
+
+    def get(self, name):
+        """
+        :return: ``Product`` o None si no existe.
+        """
+        return self._current().products.get(name)
+
+    def __contains__(self, name):
+        return name in self._current().products
+
+    def __len__(self):
+        return len(self._current().products)
+
+    def names(self):
+        return list(self._current().products)
+
+    def healthiness(self, name, default=0):
+        product = self.get(name)
+        return product.healthiness if product else default
+
+    def color(self, name, default=(0, 255, 255)):
+        product = self.get(name)
+        return product.color if product and product.color else default
+
+    def recommendations(self, name, limit=None):
+        """
+        Recomendaciones para un producto: las definidas en el catálogo o, si no tiene y
+        no es saludable, las alternativas más saludables de su categoría.
+        """
+        index = self._current()
+        product = index.products.get(name)
+        if product is None:
+            return []
+        recommended = product.recommendations
+        if not recommended and not product.healthy:
+            recommended = [n for n in index.healthy_by_category.get(product.category, ()) if n != name]
+        return list(recommended[:limit] if limit else recommended)
+
+    def by_category(self, category, healthy=None):
+        """
+        Productos de una categoría, opcionalmente filtrados por saludable.
+        """
+        index = self._current()
+        if healthy:
+            return list(index.healthy_by_category.get(category, ()))
+        names = index.by_category.get(category, [])
+        if healthy is None:
+            return list(names)
+        return [n for n in names if not index.products[n].healthy]
+
+    def healthy_products(self, healthy=True):
+        return list(self._current().by_health[bool(healthy)])
+
+    def categories(self):
+        return list(self._current().by_category)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def knowledge_base():
+    """
+    Base de conocimiento compartida del proceso (``config.PRODUCT_DATABASE``).
+    """
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = ProductKnowledgeBase()
+    return _default
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convierte el catálogo de productos a SQLite.")
+    parser.add_argument("source", help="Catálogo JSON o SQLite")
+    parser.add_argument("target", help="Base SQLite de salida")
+    args = parser.parse_args()
+    items = load_products(resolve_path(args.source))
+    export_sqlite(items, args.target)
+    print(f"{len(items)} productos guardados en {args.target}")
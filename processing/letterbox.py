@@ -0,0 +1,134 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class Letterbox:
+    """
+    Preprocesado de frames para detectores YOLO sin deformar la imagen: el frame se
+    escala conservando su proporción y se centra con bandas de relleno.
+
+    El lienzo, el tensor de entrada y el blob se reservan una sola vez (mientras no
+    cambie el tamaño del frame) y se reutilizan; la normalización se hace en el mismo
+    buffer. ``scale_boxes`` devuelve todas las cajas al frame original de una vez.
+    """
+
+    def __init__(self, size=640, stride=32, auto=False, fill=114):
+        """
+        :param size: Lado máximo de la entrada del modelo.
+        :param stride: Múltiplo requerido por el modelo (con ``auto``).
+        :param auto: Usar el rectángulo mínimo múltiplo de ``stride`` en lugar del cuadrado completo.
+        :param fill: Valor de las bandas de relleno.
+        """
+        self.size = size
+        self.stride = stride
+        self.auto = auto
+        self.fill = fill
+        self.input_shape = None
+        self.ratio = 1.0
+        self.pad = (0, 0)
+        self._canvas = None
+        self._roi = None
+        self._resized = (0, 0)
+        self._blob = None
+        self._tensor = None
+
+    def _configure(self, h, w):
+        r = min(self.size / h, self.size / w)
+        nw, nh = int(round(w * r)), int(round(h * r))
+        if self.auto:
+            out_w, out_h = nw + (self.size - nw) % self.stride, nh + (self.size - nh) % self.stride
+        else:
+            out_w = out_h = self.size
+        left, top = (out_w - nw) // 2, (out_h - nh) // 2
+        self.input_shape = (h, w)
+        self.ratio = r
+        self.pad = (left, top)
+        self._resized = (nw, nh)
+        self._canvas = np.full((out_h, out_w, 3), self.fill, dtype=np.uint8)
+        self._roi = self._canvas[top:top + nh, left:left + nw]
+        self._blob = None
+        self._tensor = None
+
+    def __call__(self, frame):
+        """
+        Escribe el frame con bandas en el lienzo reutilizado.
+        :return: Lienzo BGR uint8 (no conservar entre llamadas).
+        """
+        h, w = frame.shape[:2]
+        if (h, w) != self.input_shape:
+            self._configure(h, w)
+        if self._resized == (w, h):
+            self._roi[...] = frame
+        else:
+            cv2.resize(frame, self._resized, dst=self._roi, interpolation=cv2.INTER_LINEAR)
+        return self._canvas
+
+    def to_blob(self, frame):
+        """
+        Entrada NCHW float32 RGB en [0, 1] para ONNX / OpenCV DNN (buffer reutilizado).
+        """
+        canvas = self(frame)
+        if self._blob is None:
+            self._blob = np.empty((1, 3) + canvas.shape[:2], dtype=np.float32)
+        # BGR -> RGB y HWC -> CHW en la misma operación que la normalización
+        np.multiply(canvas[..., ::-1].transpose(2, 0, 1), np.float32(1 / 255), out=self._blob[0], casting="unsafe")
+        return self._blob
+
+    def to_tensor(self, frame):
+        """
+        Entrada NCHW float32 RGB en [0, 1] para PyTorch (tensor reutilizado, en memoria
+        fijada si hay CUDA para copiarlo a la GPU sin bloquear).
+        """
+        import torch
+
+        canvas = self(frame)
+        if self._tensor is None:
+            self._tensor = torch.empty((1, 3) + canvas.shape[:2], dtype=torch.float32,
+                                       pin_memory=torch.cuda.is_available())
+        source = torch.from_numpy(canvas)
+        for channel in range(3):
+            # Canal RGB c = canal BGR 2 - c; copy_ convierte a float sin tensores intermedios completos
+            self._tensor[0, channel].copy_(source[..., 2 - channel])
+        return self._tensor.mul_(1 / 255)
+
+    def scale_boxes(self, boxes):
+        """
+        Pasa cajas (N, 4) en coordenadas del lienzo al frame original, todas a la vez.
+        :return: Arreglo float32 (N, 4) recortado a los bordes del frame.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        left, top = self.pad
+        h, w = self.input_shape
+        out = (boxes - np.array([left, top, left, top], dtype=np.float32)) / self.ratio
+        out[:, [0, 2]] = out[:, [0, 2]].clip(0, w)
+        out[:, [1, 3]] = out[:, [1, 3]].clip(0, h)
+        return out
+
+
+def boxes_to_arrays(boxes):
+    """
+    Convierte ``result.boxes`` de ultralytics en arreglos de NumPy de una sola vez.
+    :return: Tupla (cajas int (N, 4), confianzas (N,), clases int (N,)).
+    """
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 4), dtype=int), np.empty(0, dtype=np.float32), np.empty(0, dtype=int)
+    return (boxes.xyxy.cpu().numpy().astype(int), boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy().astype(int))
+
+
+_letterboxes = threading.local()
+
+
+def default_letterbox(size=640, auto=True):
+    """
+    Letterbox del hilo actual para el tamaño indicado (sus buffers no se comparten entre hilos).
+    """
+    cache = getattr(_letterboxes, "cache", None)
+    if cache is None:
+        cache = _letterboxes.cache = {}
+    letterbox = cache.get((size, auto))
+    if letterbox is None:
+        letterbox = cache[(size, auto)] = Letterbox(size, auto=auto)
+    return letterbox
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+from config import METRICS_ENABLED, METRICS_FILE, METRICS_HUD, METRICS_INTERVAL, METRICS_PORT
+from processing.timing import StageTimer
+
+
+class _NullSpan:
+    """
+    Span vacío que se devuelve con las métricas desactivadas (sin medir ni reservar memoria).
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Capa de instrumentación de las sesiones en vivo: spans con nombre (captura,
+    inferencia, filtros, dibujo...), contadores, FPS y HUD opcional en pantalla.
+
+    Tiene la misma interfaz que ``StageTimer`` (``add``, ``count``, ``measure``,
+    ``summary``, ``report``), así puede pasarse como ``timer`` a ``FrameGrabber``.
+    Desactivada, cada llamada retorna de inmediato y ``measure`` devuelve un span vacío.
+    """
+
+    def __init__(self, enabled=False, hud=False, window=120):
+        """
+        :param enabled: Registrar tiempos y contadores.
+        :param hud: Dibujar FPS y latencia sobre el frame en ``end_frame``.
+        :param window: Muestras recientes por etapa para percentiles y FPS.
+        """
+        self.enabled = enabled
+        self.hud = hud
+        self.window = window
+        self.timer = StageTimer()
+        self.session = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._recent = {}
+        self._frames = deque(maxlen=window)
+        self._hud_text = None
+        self._hud_updated = 0.0
+
+    def begin(self, session):
+        """
+        Empieza una sesión (un modo de la aplicación) con los contadores en cero.
+        """
+        self.session = session
+        self.started_at = time.time()
+        self.reset()
+
+    def add(self, stage, seconds):
+        if not self.enabled:
+            return
+        self.timer.add(stage, seconds)
+        with self._lock:
+            recent = self._recent.get(stage)
+            if recent is None:
+                recent = self._recent[stage] = deque(maxlen=self.window)
+            recent.append(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.timer.count(name, amount)
+
+    def measure(self, stage):
+        """
+        Span con nombre: ``with metrics.measure("inferencia"): ...``.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    span = measure
+
+    def reset(self):
+        self.timer.reset()
+        with self._lock:
+            self._recent.clear()
+            self._frames.clear()
+
+    def fps(self):
+        with self._lock:
+            if len(self._frames) < 2:
+                return 0.0
+            return (len(self._frames) - 1) / max(self._frames[-1] - self._frames[0], 1e-6)
+
+    def end_frame(self, frame=None):
+        """
+        Marca el fin de un frame (para el FPS) y dibuja el HUD si está activo.
+        :return: El mismo frame.
+        """
+        if not self.enabled:
+            return frame
+        now = time.perf_counter()
+        with self._lock:
+            self._frames.append(now)
+        self.timer.count("frames")
+        if self.hud and frame is not None:
+            self._draw_hud(frame, now)
+        return frame
+
+    def _draw_hud(self, frame, now):
+        from ui.overlays import default_renderer
+
+        # El texto se actualiza dos veces por segundo para no rasterizar una etiqueta nueva en cada frame
+        if self._hud_text is None or now - self._hud_updated > 0.5:
+            latency = self.recent("captura→display")
+            text = f"FPS: {self.fps():.0f}"
+            if latency:
+                text += f"  latencia: {latency['p50']:.0f} ms (p95 {latency['p95']:.0f})"
+            self._hud_text, self._hud_updated = text, now
+        overlay = default_renderer()
+        overlay.text(self._hud_text, (10, frame.shape[0] - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        overlay.flush(frame)
+
+    def recent(self, stage):
+        """
+        Percentiles (ms) de las últimas ``window`` mediciones de una etapa, o None.
+        """
+        with self._lock:
+            samples = list(self._recent.get(stage, ()))
+        if not samples:
+            return None
+        p50, p95, p99 = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+        return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+    def summary(self):
+        return self.timer.summary()
+
+    def snapshot(self):
+        """
+        Estado completo de las métricas, serializable a JSON.
+        """
+        data = self.timer.summary()
+        for stage, values in data["stages"].items():
+            values.update(self.recent(stage) or {})
+        return {
+            "session": self.session,
+            "enabled": self.enabled,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "fps": round(self.fps(), 2),
+            **data,
+        }
+
+    def report(self):
+        return self.timer.report() + f"\n  {'fps':<20} {self.fps():.1f}"
+
+
+def write_snapshot(metrics, path):
+    """
+    Escribe las métricas en un archivo JSON de forma atómica.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class MetricsExporter:
+    """
+    Publica las métricas periódicamente en un archivo JSON y/o en
+    ``http://127.0.0.1:<puerto>/metrics``.
+    """
+
+    def __init__(self, metrics, path=None, port=None, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.port = port
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.path:
+            self._thread = threading.Thread(target=self._dump_loop, name="MetricsDump", daemon=True)
+            self._thread.start()
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.rstrip("/") not in ("", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+            threading.Thread(target=self._server.serve_forever, name="MetricsHTTP", daemon=True).start()
+            print(f"Métricas disponibles en http://127.0.0.1:{self.port}/metrics")
+        return self
+
+    def _dump_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                write_snapshot(self.metrics, self.path)
+            except OSError as e:
+                print(f"No se pudieron escribir las métricas en {self.path}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.path and self.metrics.enabled:
+            write_snapshot(self.metrics, self.path)
+
+
+# Instancia del proceso, configurada con HEALTHYLENS_METRICS / HEALTHYLENS_HUD
+metrics = Metrics(enabled=METRICS_ENABLED or METRICS_HUD, hud=METRICS_HUD)
+
+_exporter = None
+
+
+def start_exporter():
+    """
+    Inicia la exportación configurada (``METRICS_FILE`` / ``METRICS_PORT``) si las métricas están activas.
+    """
+    global _exporter
+    if _exporter is None and metrics.enabled and (METRICS_FILE or METRICS_PORT):
+        _exporter = MetricsExporter(metrics, METRICS_FILE, METRICS_PORT, METRICS_INTERVAL).start()
+    return _exporter
+
+
+def stop_exporter():
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop()
+        _exporter = None
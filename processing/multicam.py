@@ -0,0 +1,460 @@
+"""
+Clasificación de productos en varias cámaras por equipo, repartida entre núcleos.
+
+Cada cámara tiene un proceso de captura que escribe los frames en un anillo de
+``multiprocessing.shared_memory``; los procesos de trabajo (uno por núcleo, fijados
+con ``sched_setaffinity``) leen los frames directamente de la memoria compartida, sin
+copiarlos, y sólo devuelven por una cola registros pequeños con las detecciones. El
+proceso principal agrega estadísticas por stream.
+
+Ejemplos:
+    python -m processing.multicam --sources 0 1 2 3 --workers 4 --mode detect
+    python -m processing.multicam --sources videos/a.mp4 videos/b.mp4 --mode render --duration 60 --output multicam.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from config import CAMERA_SOURCE, CAMERA_SOURCES, FRAME_HEIGHT, FRAME_WIDTH, TILED_INFERENCE
+from detection.tiling import TiledDetector
+
+# Modos de los procesos de trabajo: dibujar como process_frame, sólo detectar, o nada
+# (``captura`` mide el transporte de frames sin cargar modelos)
+MODES = ("render", "detect", "captura")
+
+# Campos de la cabecera (int64) del anillo
+_LATEST, _LATEST_SLOT, _HELD, _TAKEN, _FINISHED = range(5)
+_HEADER_FIELDS = 8
+
+
+class SharedFrameRing:
+    """
+    Anillo de frames de tamaño fijo en memoria compartida, con un escritor (la captura)
+    y un lector (el proceso de trabajo del stream).
+
+    Como en ``FrameGrabber``, el lector recibe el frame más reciente sin copiarlo y es
+    dueño de ese buffer hasta ``release``; el escritor nunca escribe en el buffer tomado
+    ni en el último publicado. La cabecera sólo se modifica con ``lock`` tomado.
+    """
+
+    def __init__(self, shape, slots=4, name=None, lock=None, create=False):
+        """
+        :param shape: Forma de cada frame (alto, ancho, 3).
+        :param slots: Buffers del anillo (mínimo 3).
+        :param name: Nombre del segmento de memoria compartida (para adjuntarse a uno existente).
+        :param lock: ``multiprocessing.Lock`` compartido por escritor y lector.
+        :param create: Crear el segmento en lugar de adjuntarse.
+        """
+        self.shape = tuple(shape)
+        self.slots = max(3, slots)
+        self.lock = lock
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = (_HEADER_FIELDS + 2 * self.slots) * 8
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + frame_bytes * self.slots)
+        else:
+            # Los procesos hijos (spawn) comparten el resource_tracker del principal, que es quien lo libera
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        header = np.ndarray((_HEADER_FIELDS + 2 * self.slots,), dtype=np.int64, buffer=self.shm.buf)
+        self.header = header[:_HEADER_FIELDS]
+        self.frame_numbers = header[_HEADER_FIELDS:_HEADER_FIELDS + self.slots]
+        # Instante de captura de cada buffer, en ns de time.time_ns (comparable entre procesos)
+        self.stamps = header[_HEADER_FIELDS + self.slots:]
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                                 offset=header_bytes)
+        if create:
+            header[:] = 0
+            self.header[[_LATEST, _LATEST_SLOT, _HELD, _TAKEN]] = -1
+
+    def spec(self):
+        """
+        Datos para adjuntarse al anillo desde otro proceso.
+        """
+        return {"name": self.name, "shape": self.shape, "slots": self.slots, "lock": self.lock}
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], spec["slots"], name=spec["name"], lock=spec["lock"])
+
+    def _pending(self):
+        # Hay un frame publicado que el lector todavía no tomó
+        return self.header[_LATEST] >= 0 and self.header[_LATEST] != self.header[_TAKEN]
+
+    # --- escritor ---
+
+    def reserve(self, wait_for_reader=False, stop=None):
+        """
+        Elige el buffer donde escribir el siguiente frame (ni el tomado por el lector ni el último publicado).
+        :param wait_for_reader: Esperar a que se lea el último frame en lugar de reemplazarlo (archivos).
+        :param stop: ``Event`` que interrumpe la espera.
+        :return: Índice del buffer, o None si se pidió detener.
+        """
+        while True:
+            with self.lock:
+                if not (wait_for_reader and self._pending()):
+                    held, latest = self.header[_HELD], self.header[_LATEST_SLOT]
+                    return next(slot for slot in range(self.slots) if slot != held and slot != latest)
+            if stop is not None and stop.is_set():
+                return None
+            time.sleep(0.001)
+
+    def publish(self, slot, frame_number):
+        with self.lock:
+            self.frame_numbers[slot] = frame_number
+            self.stamps[slot] = time.time_ns()
+            self.header[_LATEST] = frame_number
+            self.header[_LATEST_SLOT] = slot
+
+    def finish(self):
+        with self.lock:
+            self.header[_FINISHED] = 1
+
+    # --- lector ---
+
+    def acquire(self):
+        """
+        Toma el frame publicado más reciente si todavía no se leyó.
+        :return: Tupla (número de frame, instante de captura en ns, vista del frame) o None.
+                 La vista es válida hasta ``release``.
+        """
+        with self.lock:
+            if not self._pending():
+                return None
+            slot = self.header[_LATEST_SLOT]
+            self.header[_HELD] = slot
+            self.header[_TAKEN] = self.header[_LATEST]
+            return int(self.frame_numbers[slot]), int(self.stamps[slot]), self.frames[slot]
+
+    def release(self):
+        with self.lock:
+            self.header[_HELD] = -1
+
+    @property
+    def finished(self):
+        with self.lock:
+            return bool(self.header[_FINISHED]) and not self._pending()
+
+    def close(self):
+        # Las vistas de NumPy deben soltarse antes de cerrar el segmento
+        self.header = self.frame_numbers = self.stamps = self.frames = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def pin_to_core(core):
+    """
+    Fija el proceso actual a un núcleo (sólo Linux) y limita los hilos de OpenCV y
+    PyTorch a uno, para que los procesos no compitan entre sí por los núcleos.
+    """
+    if core is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {core})
+    cv2.setNumThreads(1)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(1)
+
+
+def capture_process(source, spec, stop):
+    """
+    Proceso de captura: lee la fuente y escribe cada frame directamente en un buffer del anillo.
+    """
+    from processing.capture import is_live_source, open_source
+
+    ring = SharedFrameRing.attach(spec)
+    height, width = ring.shape[:2]
+    cap = open_source(source, width, height)
+    # Con archivos no se descartan frames: el lector marca el ritmo
+    wait_for_reader = not is_live_source(source)
+    frame_number = 0
+    try:
+        while not stop.is_set():
+            slot = ring.reserve(wait_for_reader, stop)
+            if slot is None:
+                break
+            buffer = ring.frames[slot]
+            ret, frame = cap.read(buffer)
+            if not ret:
+                break
+            if frame is not buffer:
+                # La fuente entregó otro tamaño (o no admite leer en un buffer dado)
+                if frame.shape != buffer.shape:
+                    cv2.resize(frame, (width, height), dst=buffer, interpolation=cv2.INTER_AREA)
+                else:
+                    np.copyto(buffer, frame)
+            ring.publish(slot, frame_number)
+            frame_number += 1
+    finally:
+        ring.finish()
+        cap.release()
+        ring.close()
+
+
+def _load_worker_mode(mode):
+    if mode == "captura":
+        return None, None
+    from PP.PPE import pdetection
+
+    model = pdetection.get_model()
+    return pdetection, model
+
+
+def worker_process(index, streams, mode, core, results, stop):
+    """
+    Proceso de trabajo: atiende por turnos los anillos de sus streams y envía a
+    ``results`` un registro pequeño por frame (nunca el frame). Un error al procesar
+    un frame se envía como registro ``error`` y el trabajador sigue con el siguiente.
+    :param streams: Lista de (id de stream, spec del anillo).
+    """
+    pdetection, model = _load_worker_mode(mode)
+    pin_to_core(core)
+    rings = [(stream_id, SharedFrameRing.attach(spec)) for stream_id, spec in streams]
+    # Una caché de etiquetas (y un detector por recortes) por stream: el estado no se mezcla entre cámaras
+    caches = {stream_id: pdetection.ProductOverlayCache(pdetection.get_filter_by_healthiness)
+              for stream_id, _ in rings} if mode == "render" else {}
+    tilers = {stream_id: TiledDetector(model) for stream_id, _ in rings} \
+        if TILED_INFERENCE and mode != "captura" else {}
+    results.put(("listo", index, None))
+    try:
+        active = list(rings)
+        while active and not stop.is_set():
+            idle = True
+            for stream_id, ring in list(active):
+                item = ring.acquire()
+                if item is None:
+                    if ring.finished:
+                        active.remove((stream_id, ring))
+                        results.put(("fin", stream_id, None))
+                    continue
+                idle = False
+                frame_number, stamp, frame = item
+                start = time.perf_counter()
+                try:
+                    if mode == "captura":
+                        detections = []
+                    else:
+                        detections = pdetection.detect_products(frame, model, tilers.get(stream_id))
+                        if mode == "render":
+                            # Se dibuja sobre el buffer compartido, que sigue siendo del lector
+                            pdetection.render_detections(frame, detections, cache=caches[stream_id])
+                except Exception as e:
+                    results.put(("error", stream_id, repr(e)))
+                    continue
+                finally:
+                    ring.release()
+                elapsed = time.perf_counter() - start
+                results.put(("frame", stream_id, (frame_number, stamp, elapsed,
+                                                  [tuple(d[:6]) for d in detections])))
+            if idle:
+                time.sleep(0.001)
+    finally:
+        for _, ring in rings:
+            ring.close()
+
+
+class StreamStats:
+    """
+    Estadísticas de un stream en el proceso principal.
+    """
+
+    def __init__(self, source, window=300):
+        self.source = source
+        self.frames = 0
+        self.detections = 0
+        self.finished = False
+        self.started = None
+        self.last = None
+        self.last_frame_number = -1
+        self.skipped = 0
+        self.errors = 0
+        self._latency = deque(maxlen=window)
+        self._process = deque(maxlen=window)
+
+    def add(self, frame_number, stamp, elapsed, detections):
+        now = time.time_ns()
+        if self.started is None:
+            self.started = now
+        self.last = now
+        self.frames += 1
+        self.detections += len(detections)
+        # Frames que la captura reemplazó antes de que el trabajador los leyera
+        self.skipped += max(0, frame_number - self.last_frame_number - 1)
+        self.last_frame_number = frame_number
+        self._latency.append((now - stamp) / 1e6)
+        self._process.append(elapsed * 1000)
+
+    def summary(self):
+        seconds = (self.last - self.started) / 1e9 if self.frames > 1 else 0.0
+        latency = np.asarray(self._latency) if self._latency else np.zeros(1)
+        process = np.asarray(self._process) if self._process else np.zeros(1)
+        return {
+            "source": str(self.source),
+            "frames": self.frames,
+            "fps": round((self.frames - 1) / seconds, 2) if seconds > 0 else 0.0,
+            "latency_p50_ms": round(float(np.percentile(latency, 50)), 2),
+            "latency_p95_ms": round(float(np.percentile(latency, 95)), 2),
+            "process_mean_ms": round(float(process.mean()), 2),
+            "detections": self.detections,
+            "skipped_frames": self.skipped,
+            "errors": self.errors,
+            "finished": self.finished,
+        }
+
+
+def print_stats(stats):
+    print(f"{'stream':<8} {'fps':>7} {'lat p50':>9} {'lat p95':>9} {'proc (ms)':>10} {'omitidos':>9}  fuente")
+    total = 0.0
+    for stream_id, s in stats.items():
+        data = s.summary()
+        total += data["fps"]
+        print(f"{stream_id:<8} {data['fps']:>7.2f} {data['latency_p50_ms']:>9.2f} {data['latency_p95_ms']:>9.2f} "
+              f"{data['process_mean_ms']:>10.2f} {data['skipped_frames']:>9}  {data['source']}")
+    print(f"{'total':<8} {total:>7.2f}")
+
+
+def run_multicam(sources, workers=None, mode="detect", width=FRAME_WIDTH, height=FRAME_HEIGHT, slots=4,
+                 cores=None, duration=None, interval=5.0):
+    """
+    Ejecuta la clasificación sobre varias fuentes con procesos de captura y de trabajo.
+    :param sources: Fuentes de video (ver ``processing.capture.open_source``).
+    :param workers: Procesos de trabajo (por defecto, uno por núcleo disponible y como máximo uno por stream).
+    :param mode: Uno de ``MODES``.
+    :param cores: Núcleos a los que fijar los trabajadores (por defecto, los disponibles).
+    :param duration: Segundos máximos de ejecución (None = hasta que terminen las fuentes o Ctrl+C).
+    :param interval: Segundos entre reportes de estadísticas.
+    :return: Diccionario con las estadísticas por stream.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo desconocido: {mode}")
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else [None] * os.cpu_count()
+    cores = list(cores) if cores else available
+    workers = max(1, min(workers or len(cores), len(sources)))
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    results = context.Queue()
+    rings = [SharedFrameRing((height, width, 3), slots, lock=context.Lock(), create=True) for _ in sources]
+    stats = {i: StreamStats(source) for i, source in enumerate(sources)}
+    processes = []
+    try:
+        # Los streams se reparten entre trabajadores por turnos
+        assignments = [list(range(w, len(sources), workers)) for w in range(workers)]
+        for w, streams in enumerate(assignments):
+            assigned = [(i, rings[i].spec()) for i in streams]
+            processes.append(context.Process(target=worker_process, name=f"Trabajador-{w}", daemon=True,
+                                             args=(w, assigned, mode, cores[w % len(cores)], results, stop)))
+        for process in processes:
+            process.start()
+
+        # Las capturas empiezan cuando todos los trabajadores cargaron su modelo
+        ready = 0
+        while ready < workers:
+            try:
+                kind, _, _ = results.get(timeout=1.0)
+            except queue.Empty:
+                if not all(process.is_alive() for process in processes):
+                    raise RuntimeError("Un proceso de trabajo terminó durante la carga del modelo")
+                continue
+            ready += kind == "listo"
+        captures = [context.Process(target=capture_process, name=f"Captura-{i}", daemon=True,
+                                    args=(source, rings[i].spec(), stop)) for i, source in enumerate(sources)]
+        processes.extend(captures)
+        for process in captures:
+            process.start()
+
+        print(f"Clasificación en {len(sources)} streams con {workers} procesos de trabajo ({mode}). "
+              f"Ctrl+C para salir.")
+        start = last_report = last_check = time.perf_counter()
+        while not all(s.finished for s in stats.values()):
+            now = time.perf_counter()
+            if duration is not None and now - start >= duration:
+                break
+            if now - last_report >= interval:
+                print_stats(stats)
+                last_report = now
+            if now - last_check >= 0.5:
+                # Un trabajador caído no enviará el "fin" de sus streams: se dan por terminados
+                for w, streams in enumerate(assignments):
+                    pending = [i for i in streams if not stats[i].finished]
+                    if pending and not processes[w].is_alive():
+                        print(f"El trabajador {w} terminó (código {processes[w].exitcode}); "
+                              f"streams abandonados: {pending}")
+                        for i in pending:
+                            stats[i].finished = True
+                last_check = now
+            try:
+                kind, stream_id, data = results.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if kind == "frame":
+                stats[stream_id].add(*data)
+            elif kind == "fin":
+                stats[stream_id].finished = True
+            elif kind == "error":
+                if not stats[stream_id].errors:
+                    print(f"Error en el stream {stream_id}: {data}")
+                stats[stream_id].errors += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for process in processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        for ring in rings:
+            ring.close()
+            ring.unlink()
+
+    print_stats(stats)
+    return {stream_id: s.summary() for stream_id, s in stats.items()}
+
+
+def parse_cores(text):
+    """
+    "0-3,6" -> [0, 1, 2, 3, 6]
+    """
+    cores = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        cores.extend(range(int(first), int(last or first) + 1))
+    return cores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificación de productos en varias cámaras y núcleos.")
+    parser.add_argument("--sources", nargs="+", default=CAMERA_SOURCES or [CAMERA_SOURCE],
+                        help="Cámaras, videos o directorios de imágenes")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos de trabajo (por defecto, uno por núcleo)")
+    parser.add_argument("--mode", choices=MODES, default="detect")
+    parser.add_argument("--cores", type=parse_cores, default=None, help="Núcleos para los trabajadores, p. ej. 0-3")
+    parser.add_argument("--width", type=int, default=FRAME_WIDTH)
+    parser.add_argument("--height", type=int, default=FRAME_HEIGHT)
+    parser.add_argument("--slots", type=int, default=4, help="Buffers por anillo")
+    parser.add_argument("--duration", type=float, default=None, help="Segundos de ejecución")
+    parser.add_argument("--interval", type=float, default=5.0, help="Segundos entre reportes")
+    parser.add_argument("--output", default=None, help="Guardar las estadísticas en JSON")
+    args = parser.parse_args(argv)
+
+    summary = run_multicam(args.sources, args.workers, args.mode, args.width, args.height, args.slots,
+                           args.cores, args.duration, args.interval)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "streams": summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from processing.capture import FrameGrabber
+from processing.timing import StageTimer
+
+_END = object()
+
+
+class _Failed:
+    """
+    Marca un frame cuyo procesamiento falló; las etapas siguientes lo dejan pasar.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+
+class Stage:
+    """
+    Etapa del pipeline: una función ``item -> item`` ejecutada por uno o más hilos.
+    """
+
+    def __init__(self, name, fn, workers=1):
+        """
+        :param name: Nombre de la etapa (para las estadísticas).
+        :param fn: Función que recibe la salida de la etapa anterior.
+        :param workers: Hilos que ejecutan la etapa. Usar 1 si ``fn`` no es thread-safe
+                        (por ejemplo, una única instancia de modelo YOLO).
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+class Pipeline:
+    """
+    Ejecuta etapas de forma concurrente, conectadas por colas acotadas.
+
+    Cada etapa corre en sus propios hilos (OpenCV y PyTorch liberan el GIL durante
+    el cómputo pesado), de modo que el throughput queda limitado por la etapa más
+    lenta y no por la suma de todas. Las colas acotadas aplican backpressure: si una
+    etapa se atrasa, las anteriores se bloquean en lugar de acumular frames. La salida
+    se reordena por número de secuencia, así que los frames salen en orden.
+    """
+
+    def __init__(self, stages, queue_size=2):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.timer = StageTimer()
+        self._queues = []
+        self._threads = []
+        self._stop = threading.Event()
+        self._counts = {}
+        self._started = None
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _capture(self, source, out_q):
+        seq = 0
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            ret, frame = source()
+            if not ret:
+                break
+            # La fuente puede reutilizar el buffer en la siguiente lectura
+            frame = frame.copy()
+            self.timer.add("captura", time.perf_counter() - start)
+            self._counts["captura"] += 1
+            if not self._put(out_q, (seq, frame)):
+                return
+            seq += 1
+        self._put(out_q, _END)
+
+    def _work(self, stage, in_q, out_q, remaining):
+        while True:
+            item = self._get(in_q)
+            if item is _END:
+                # Reenviar el fin a los demás hilos de la etapa; el último lo propaga
+                self._put(in_q, _END)
+                with remaining["lock"]:
+                    remaining["count"] -= 1
+                    last = remaining["count"] == 0
+                if last:
+                    self._put(out_q, _END)
+                return
+            seq, value = item
+            if not isinstance(value, _Failed):
+                start = time.perf_counter()
+                try:
+                    value = stage.fn(value)
+                except Exception as e:
+                    print(f"Error en la etapa '{stage.name}': {e}")
+                    value = _Failed(e)
+                self.timer.add(stage.name, time.perf_counter() - start)
+                with remaining["lock"]:
+                    self._counts[stage.name] += 1
+            if not self._put(out_q, (seq, value)):
+                return
+
+    def run(self, source):
+        """
+        Lanza el pipeline y entrega los resultados de la última etapa en orden.
+        :param source: Función sin argumentos que devuelve (ret, frame), p. ej. ``FrameGrabber.read``.
+                       El frame se copia al entrar al pipeline, así que la fuente puede reutilizar buffers.
+        :return: Generador de resultados; cerrarlo detiene el pipeline.
+        """
+        self._stop.clear()
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._counts = {"captura": 0, "salida": 0}
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._capture, args=(source, self._queues[0]), daemon=True)]
+        for i, stage in enumerate(self.stages):
+            self._counts[stage.name] = 0
+            remaining = {"count": stage.workers, "lock": threading.Lock()}
+            for _ in range(stage.workers):
+                self._threads.append(threading.Thread(
+                    target=self._work, args=(stage, self._queues[i], self._queues[i + 1], remaining),
+                    name=f"Pipeline-{stage.name}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+        pending = {}
+        next_seq = 0
+        out_q = self._queues[-1]
+        try:
+            while True:
+                item = self._get(out_q)
+                if item is _END:
+                    break
+                seq, value = item
+                pending[seq] = value
+                while next_seq in pending:
+                    value = pending.pop(next_seq)
+                    next_seq += 1
+                    if isinstance(value, _Failed):
+                        continue
+                    self._counts["salida"] += 1
+                    yield value
+        finally:
+            self.stop()
+
+    def stop(self):
+        """
+        Detiene todos los hilos del pipeline.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def stats(self):
+        """
+        FPS por etapa, tiempo medio por frame y profundidad actual de cada cola.
+        """
+        elapsed = max(time.perf_counter() - (self._started or time.perf_counter()), 1e-6)
+        timings = self.timer.summary()["stages"]
+        names = ["captura"] + [stage.name for stage in self.stages] + ["salida"]
+        stats = {}
+        for i, name in enumerate(names):
+            entry = {
+                "fps": round(self._counts.get(name, 0) / elapsed, 2),
+                "mean_ms": timings.get(name, {}).get("mean_ms", 0.0),
+            }
+            if i < len(self._queues):
+                entry["queue"] = self._queues[i].qsize()
+            stats[name] = entry
+        return stats
+
+    def report(self):
+        lines = ["Estadísticas del pipeline:"]
+        for name, s in self.stats().items():
+            queue_info = f"  cola={s['queue']}" if "queue" in s else ""
+            lines.append(f"  {name:<12} {s['fps']:>7.2f} FPS  media={s['mean_ms']:.2f} ms{queue_info}")
+        return "\n".join(lines)
+
+
+def run_pipeline(stages, window_name, source, width=1280, height=720, queue_size=2):
+    """
+    Ejecuta un modo en vivo con el pipeline concurrente y muestra los frames en una ventana.
+    :param stages: Lista de ``Stage`` que reciben el frame capturado.
+    :param window_name: Nombre de la ventana de OpenCV.
+    :param source: Fuente de video (ver ``processing.capture.open_source``).
+    """
+    grabber = FrameGrabber(source, width, height).start()
+    pipeline = Pipeline(stages, queue_size=queue_size)
+    print(f"Iniciando {window_name} en modo pipeline. Presiona 'q' para salir.")
+    last_report = time.perf_counter()
+    try:
+        for frame in pipeline.run(grabber.read):
+            cv2.imshow(window_name, frame)
+            if time.perf_counter() - last_report > 5.0:
+                print(pipeline.report())
+                last_report = time.perf_counter()
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        pipeline.stop()
+        grabber.stop()
+        cv2.destroyAllWindows()
+    print(pipeline.report())
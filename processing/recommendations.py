@@ -1,8 +1,4 @@
-import json
+from processing.knowledge_base import knowledge_base
 
 def generate_recommendations(product):
-    with open('assets/database.json') as db:
-        data = json.load(db)
-        if product in data:
-            return data[product]['recommendations']
-    return []
+    return knowledge_base().recommendations(product)
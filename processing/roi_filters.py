@@ -0,0 +1,140 @@
+import threading
+
+import cv2
+import numpy as np
+
+from processing.filters import get_filter
+
+_local = threading.local()
+
+# Cajas más cercanas que el radio de los kernels (15x15) se filtran juntas
+KERNEL_MARGIN = 7
+
+
+def merge_boxes(boxes, margin=0):
+    """
+    Agrupa cajas que se superponen (o están a menos de ``margin`` píxeles).
+    :param boxes: Lista de (x1, y1, x2, y2).
+    :return: Lista de (rectángulo_unión, cajas_del_grupo).
+    """
+    clusters = []
+    for box in boxes:
+        rect, members = box, [box]
+        merged = True
+        while merged:
+            merged = False
+            for i, (other, other_members) in enumerate(clusters):
+                if (rect[0] - margin < other[2] and other[0] - margin < rect[2]
+                        and rect[1] - margin < other[3] and other[1] - margin < rect[3]):
+                    rect = (min(rect[0], other[0]), min(rect[1], other[1]),
+                            max(rect[2], other[2]), max(rect[3], other[3]))
+                    members = other_members + members
+                    del clusters[i]
+                    merged = True
+                    break
+        clusters.append((rect, members))
+    return clusters
+
+
+class RoiFilterEngine:
+    """
+    Aplica filtros a varias regiones de un frame calculando cada filtro una sola vez.
+
+    Las regiones se agrupan por filtro y las cajas que se superponen se unen en un solo
+    rectángulo; cada filtro se calcula una vez sobre esa unión y luego se copia sólo
+    dentro de cada caja. El costo depende del área cubierta y no del número de
+    detecciones, y las zonas superpuestas no se filtran dos veces. Los buffers se
+    reutilizan entre frames y los filtros de bordes usan intermedios de 16 bits en
+    lugar de float64.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _buffer(self, name, h, w, channels=1, dtype=np.uint8):
+        """
+        Devuelve una vista contigua (h, w[, c]) sobre un buffer reutilizable.
+        """
+        size = h * w * channels
+        buf = self._buffers.get((name, dtype))
+        if buf is None or buf.size < size:
+            buf = np.empty(size, dtype=dtype)
+            self._buffers[(name, dtype)] = buf
+        shape = (h, w, channels) if channels > 1 else (h, w)
+        return buf[:size].reshape(shape)
+
+    def _gray(self, src):
+        h, w = src.shape[:2]
+        return cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._buffer("gris", h, w))
+
+    def _filter(self, src, filter_type, slot):
+        h, w = src.shape[:2]
+        out = self._buffer(f"salida{slot}", h, w, 3)
+        if callable(filter_type):
+            out[...] = filter_type(src)
+        elif filter_type == "Gaussian Blur":
+            cv2.GaussianBlur(src, (15, 15), 0, dst=out)
+        elif filter_type == "Smooth":
+            cv2.blur(src, (15, 15), dst=out)
+        elif filter_type == "Sobel":
+            gray = self._gray(src)
+            sobel_x = cv2.Sobel(gray, cv2.CV_16S, 1, 0, dst=self._buffer("sobel_x", h, w, dtype=np.int16), ksize=3)
+            sobel_y = cv2.Sobel(gray, cv2.CV_16S, 0, 1, dst=self._buffer("sobel_y", h, w, dtype=np.int16), ksize=3)
+            abs_x = cv2.convertScaleAbs(sobel_x, dst=self._buffer("abs_x", h, w))
+            abs_y = cv2.convertScaleAbs(sobel_y, dst=self._buffer("abs_y", h, w))
+            cv2.merge((abs_x, abs_y, gray), dst=out)
+        elif filter_type == "Laplacian":
+            gray = self._gray(src)
+            laplacian = cv2.Laplacian(gray, cv2.CV_16S, dst=self._buffer("laplaciano", h, w, dtype=np.int16))
+            abs_lap = cv2.convertScaleAbs(laplacian, dst=self._buffer("abs_x", h, w))
+            cv2.merge((abs_lap, abs_lap, abs_lap), dst=out)
+        else:
+            registered = get_filter(filter_type)
+            if registered is None:
+                return None
+            out[...] = registered(src)
+        return out
+
+    def apply(self, frame, regions):
+        """
+        Aplica los filtros en el frame (in-place).
+        :param frame: Frame BGR.
+        :param regions: Lista de (x1, y1, x2, y2, filtro). El filtro es un nombre del
+                        registro de ``processing.filters`` o una función ``roi -> roi``;
+                        se evalúa una vez sobre la unión de sus cajas.
+        :return: El mismo frame.
+        """
+        fh, fw = frame.shape[:2]
+        groups = {}
+        for x1, y1, x2, y2, filter_type in regions:
+            x1, x2 = max(0, x1), min(fw, x2)
+            y1, y2 = max(0, y1), min(fh, y2)
+            if x2 > x1 and y2 > y1:
+                groups.setdefault(filter_type, []).append((x1, y1, x2, y2))
+
+        # Calcular todos los filtros sobre el frame original antes de componer
+        filtered = []
+        slot = 0
+        for filter_type, boxes in groups.items():
+            for (ux1, uy1, ux2, uy2), members in merge_boxes(boxes, margin=KERNEL_MARGIN):
+                out = self._filter(frame[uy1:uy2, ux1:ux2], filter_type, slot)
+                if out is None:
+                    break
+                filtered.append((out, ux1, uy1, members))
+                slot += 1
+
+        # Componer: cada caja actúa como máscara rectangular sobre el resultado filtrado
+        for out, ux1, uy1, boxes in filtered:
+            for x1, y1, x2, y2 in boxes:
+                frame[y1:y2, x1:x2] = out[y1 - uy1:y2 - uy1, x1 - ux1:x2 - ux1]
+        return frame
+
+
+def default_engine():
+    """
+    Motor de filtros del hilo actual (los buffers no se comparten entre hilos).
+    """
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        engine = _local.engine = RoiFilterEngine()
+    return engine
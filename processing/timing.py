@@ -0,0 +1,75 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Acumula tiempos y contadores por etapa (captura, inferencia, display...).
+    Es seguro de usar desde varios hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._times = {}
+        self._counters = {}
+
+    def add(self, stage, seconds):
+        """
+        Registra una medición de tiempo para una etapa.
+        :param stage: Nombre de la etapa.
+        :param seconds: Duración en segundos.
+        """
+        with self._lock:
+            count, total, peak = self._times.get(stage, (0, 0.0, 0.0))
+            self._times[stage] = (count + 1, total + seconds, max(peak, seconds))
+
+    def count(self, name, amount=1):
+        """
+        Incrementa un contador (frames descartados, detecciones, etc.).
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextmanager
+    def measure(self, stage):
+        """
+        Mide el tiempo del bloque ``with`` y lo registra en la etapa indicada.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self._times.clear()
+            self._counters.clear()
+
+    def summary(self):
+        """
+        Devuelve un diccionario con conteo, media y máximo (ms) por etapa, y los contadores.
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for stage, (count, total, peak) in self._times.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def report(self):
+        """
+        Devuelve un resumen legible de los tiempos por etapa.
+        """
+        data = self.summary()
+        lines = ["Tiempos por etapa:"]
+        for stage, s in data["stages"].items():
+            lines.append(f"  {stage:<20} n={s['count']:<6} media={s['mean_ms']:.2f} ms  max={s['max_ms']:.2f} ms")
+        for name, value in data["counters"].items():
+            lines.append(f"  {name:<20} {value}")
+        return "\n".join(lines)
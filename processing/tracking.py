@@ -0,0 +1,108 @@
+import itertools
+
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Calcula la IoU entre todas las cajas de dos listas (formato x1, y1, x2, y2).
+    :return: Matriz (len(a), len(b)).
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class Track:
+    """
+    Objeto seguido entre frames. ``data`` guarda información asociada al track
+    (emoción, etiquetas, etc.) que se conserva mientras el objeto siga visible.
+    """
+
+    def __init__(self, track_id, box, label=None):
+        self.id = track_id
+        self.box = tuple(box)
+        self.label = label
+        self.hits = 1
+        self.misses = 0
+        self.age = 0
+        self.data = {}
+
+
+class IoUTracker:
+    """
+    Asigna IDs estables a las detecciones asociándolas por IoU con los tracks previos.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=5, match_labels=False):
+        """
+        :param iou_threshold: IoU mínima para asociar una detección a un track.
+        :param max_misses: Actualizaciones sin detección antes de eliminar un track.
+        :param match_labels: Sólo asociar detecciones con la misma etiqueta (clase).
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.match_labels = match_labels
+        self.tracks = []
+        self.removed = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes, labels=None):
+        """
+        Actualiza los tracks con las detecciones del frame.
+        :param boxes: Lista de (x1, y1, x2, y2).
+        :param labels: Etiquetas opcionales de cada caja.
+        :return: Lista de (track, índice_de_detección) para las detecciones del frame.
+                 Los tracks eliminados en esta llamada quedan en ``self.removed``.
+        """
+        labels = labels if labels is not None else [None] * len(boxes)
+        matches = []
+        unmatched = set(range(len(boxes)))
+        matched_tracks = set()
+
+        if self.tracks and boxes:
+            ious = iou_matrix([t.box for t in self.tracks], boxes)
+            if self.match_labels:
+                same = np.array([[t.label == label for label in labels] for t in self.tracks])
+                ious = np.where(same, ious, 0.0)
+            # Asociación voraz por IoU descendente
+            for flat in np.argsort(-ious, axis=None):
+                ti, di = divmod(int(flat), len(boxes))
+                if ious[ti, di] < self.iou_threshold:
+                    break
+                if ti in matched_tracks or di not in unmatched:
+                    continue
+                track = self.tracks[ti]
+                track.box = tuple(boxes[di])
+                track.hits += 1
+                track.misses = 0
+                matched_tracks.add(ti)
+                unmatched.discard(di)
+                matches.append((track, di))
+
+        self.removed = []
+        alive = []
+        for ti, track in enumerate(self.tracks):
+            track.age += 1
+            if ti not in matched_tracks:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    self.removed.append(track)
+                    continue
+            alive.append(track)
+
+        for di in sorted(unmatched):
+            track = Track(next(self._ids), boxes[di], labels[di])
+            alive.append(track)
+            matches.append((track, di))
+
+        self.tracks = alive
+        return matches
@@ -0,0 +1,58 @@
+"""
+Modelos falsos con la interfaz de resultados de ultralytics, para probar sin pesos ni torch.
+"""
+import numpy as np
+
+
+class FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+class FakeBoxes:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = FakeTensor(np.asarray(xyxy, dtype=np.float32).reshape(-1, 4))
+        self.conf = FakeTensor(np.asarray(conf, dtype=np.float32))
+        self.cls = FakeTensor(np.asarray(cls, dtype=np.float32))
+
+    def __len__(self):
+        return len(self.conf.array)
+
+
+class FakeResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class BrightSpotModel:
+    """
+    "Detecta" la caja que rodea a los píxeles blancos de cada imagen (clase 0).
+    Como un modelo de ultralytics, acepta una imagen o una lista y devuelve un resultado por imagen.
+    """
+
+    names = {0: "apple"}
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images, verbose=False):
+        if not isinstance(images, (list, tuple)):
+            images = [images]
+        for image in images:
+            if not isinstance(image, np.ndarray):
+                raise TypeError(f"Se esperaba una imagen, no {type(image).__name__}")
+        self.calls.append(len(images))
+        return [self._detect(image) for image in images]
+
+    @staticmethod
+    def _detect(image):
+        ys, xs = np.nonzero(image.min(axis=2) == 255)
+        if len(xs) == 0:
+            return FakeResult(FakeBoxes(np.empty((0, 4)), [], []))
+        return FakeResult(FakeBoxes([[xs.min(), ys.min(), xs.max() + 1, ys.max() + 1]], [0.9], [0]))
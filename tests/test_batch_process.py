@@ -0,0 +1,68 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+import batch_process
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(25):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_collect_units_chunks_videos_and_images(tmp_path, video):
+    cv2.imwrite(str(tmp_path / "foto.jpg"), np.zeros((8, 8, 3), dtype=np.uint8))
+    (tmp_path / "notas.txt").write_text("no es media")
+    units = batch_process.collect_units([str(tmp_path)], chunk_size=10)
+    assert units == [
+        (video, 0, 10, True), (video, 10, 20, True), (video, 20, 25, True),
+        (str(tmp_path / "foto.jpg"), 0, 1, False),
+    ]
+
+
+def test_collect_units_prefers_recorded_frame_counts(video):
+    units = batch_process.collect_units([video], chunk_size=10, frame_counts={video: 12})
+    assert units == [(video, 0, 10, True), (video, 10, 12, True)]
+
+
+def test_collect_units_counts_videos_without_frame_count(video, monkeypatch):
+    capture = cv2.VideoCapture
+
+    class NoCount:
+        def __init__(self, path):
+            self._cap = capture(path)
+
+        def get(self, prop):
+            return 0 if prop == cv2.CAP_PROP_FRAME_COUNT else self._cap.get(prop)
+
+        def __getattr__(self, name):
+            return getattr(self._cap, name)
+
+    monkeypatch.setattr(batch_process.cv2, "VideoCapture", NoCount)
+    counts = {}
+    units = batch_process.collect_units([video], chunk_size=10, frame_counts=counts)
+    assert counts == {video: 25}
+    assert units[-1] == (video, 20, 25, True)
+
+
+def test_load_done_truncates_partial_last_line(tmp_path):
+    output = tmp_path / "resultados.jsonl"
+    lines = [json.dumps({"source": "a.mp4", "frame": i, "detections": []}) for i in range(3)]
+    output.write_text("\n".join(lines) + "\n" + '{"source": "a.mp4", "fra')
+    assert batch_process.load_done(str(output)) == {("a.mp4", 0), ("a.mp4", 1), ("a.mp4", 2)}
+    assert output.read_text().endswith("\n")
+    assert len(output.read_text().splitlines()) == 3
+
+
+def test_frame_counts_round_trip(tmp_path):
+    output = str(tmp_path / "resultados.jsonl")
+    assert batch_process.load_frame_counts(output) == {}
+    batch_process.save_frame_counts(output, {"a.mp4": 120})
+    assert batch_process.load_frame_counts(output) == {"a.mp4": 120}
@@ -0,0 +1,92 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from processing.capture import FrameGrabber, ImageDirectorySource
+
+
+@pytest.fixture
+def images(tmp_path):
+    for i in range(12):
+        cv2.imwrite(str(tmp_path / f"{i:03d}.png"), np.full((24, 32, 3), i * 20, dtype=np.uint8))
+    (tmp_path / "leeme.txt").write_text("no es una imagen")
+    return str(tmp_path)
+
+
+def read_all(grabber):
+    values = []
+    while True:
+        ret, frame = grabber.read(timeout=2.0)
+        if not ret:
+            return values
+        values.append(int(frame[0, 0, 0]))
+
+
+def test_directory_source_reads_images_in_order(images):
+    source = ImageDirectorySource(images)
+    values = []
+    while source.isOpened():
+        ret, frame = source.read()
+        values.append(int(frame[0, 0, 0]))
+    assert values == [i * 20 for i in range(12)]
+    assert source.read() == (False, None)
+
+
+def test_file_sources_deliver_every_frame_in_order(images):
+    grabber = FrameGrabber(images, buffers=3).start()
+    try:
+        assert read_all(grabber) == [i * 20 for i in range(12)]
+        assert grabber.finished
+        assert grabber.frames_read == 12
+    finally:
+        grabber.stop()
+
+
+def test_held_frame_is_not_overwritten_until_next_read(images):
+    grabber = FrameGrabber(images, buffers=3).start()
+    try:
+        ret, frame = grabber.read(timeout=2.0)
+        value = int(frame[0, 0, 0])
+        # La captura llena los otros buffers y se bloquea: el frame entregado no cambia
+        time.sleep(0.2)
+        assert int(frame[0, 0, 0]) == value
+    finally:
+        grabber.stop()
+
+
+def test_ring_reuses_preallocated_buffers(images):
+    grabber = FrameGrabber(images, buffers=3).start()
+    try:
+        ids = set()
+        while True:
+            ret, frame = grabber.read(timeout=2.0)
+            if not ret:
+                break
+            ids.add(id(frame))
+        assert len(ids) <= 3
+    finally:
+        grabber.stop()
+
+
+def test_drop_frames_delivers_the_newest_frame(images):
+    grabber = FrameGrabber(images, drop_frames=True).start()
+    try:
+        time.sleep(0.3)
+        values = read_all(grabber)
+        assert values[-1] == 11 * 20
+        assert len(values) < 12
+        assert grabber.timer.summary()["counters"]["frames descartados"] > 0
+    finally:
+        grabber.stop()
+
+
+def test_read_times_out_without_frames(tmp_path):
+    grabber = FrameGrabber(str(tmp_path)).start()
+    try:
+        ret, frame = grabber.read(timeout=0.5)
+        assert not ret and frame is None
+        assert grabber.finished
+    finally:
+        grabber.stop()
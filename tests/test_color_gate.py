@@ -0,0 +1,78 @@
+import numpy as np
+
+from detection.color_gate import ColorGate, color_luts
+from processing.letterbox import boxes_to_arrays
+from tests.fakes import BrightSpotModel
+
+RANGES = {
+    "red": [(0, 120, 70), (10, 255, 255)],
+    "green": [(36, 100, 100), (86, 255, 255)],
+}
+
+
+def test_color_luts_bits():
+    luts, names = color_luts(RANGES)
+    assert names == ["red", "green"]
+    assert luts.shape == (3, 256)
+    # Un bit por color en cada tabla
+    assert luts[0, 5] == 1 and luts[0, 60] == 2 and luts[0, 30] == 0
+    assert luts[1, 99] == 0 and luts[1, 119] == 2 and luts[1, 120] == 3
+    assert luts[2, 80] == 1 and luts[2, 100] == 3
+
+
+def test_color_luts_red_wraps_around_hue_circle():
+    luts, _ = color_luts(RANGES)
+    assert luts[0, 175] & 1
+    assert luts[0, 180] & 1
+    assert not luts[0, 160] & 1
+
+
+def test_color_luts_rejects_more_than_eight_colors():
+    ranges = {f"c{i}": [(0, 0, 0), (1, 1, 1)] for i in range(9)}
+    try:
+        color_luts(ranges)
+    except ValueError:
+        return
+    raise AssertionError("Se esperaba ValueError")
+
+
+def _frame_with_red_blob():
+    frame = np.full((480, 640, 3), 128, dtype=np.uint8)
+    frame[200:280, 300:380] = (0, 0, 220)  # Rojo en BGR
+    frame[230:240, 330:345] = 255  # "Producto" que detecta el modelo falso
+    return frame
+
+
+def test_gray_frame_skips_the_model():
+    gate = ColorGate(RANGES)
+    calls = []
+    boxes, confs, classes = gate.detect(np.full((480, 640, 3), 128, dtype=np.uint8),
+                                        lambda frame: calls.append(frame))
+    assert calls == [] and len(boxes) == 0
+    assert gate.stats["llamadas_ahorradas"] == 1
+
+
+def test_regions_find_the_colored_blob():
+    regions = ColorGate(RANGES).regions(_frame_with_red_blob())
+    assert len(regions) == 1
+    x1, y1, x2, y2, color = regions[0]
+    assert color == "red"
+    assert abs(x1 - 300) <= 8 and abs(y1 - 200) <= 8 and abs(x2 - 380) <= 8 and abs(y2 - 280) <= 8
+
+
+def test_crops_go_through_the_batch_callable():
+    model = BrightSpotModel()
+    gate = ColorGate(RANGES)
+    batches = []
+
+    def detect_batch(images):
+        batches.append(len(images))
+        return [boxes_to_arrays(result.boxes) for result in model(images)]
+
+    def detect_frame(frame):
+        raise AssertionError("Con recortes no debe inferirse el frame completo")
+
+    boxes, confs, classes = gate.detect(_frame_with_red_blob(), detect_frame, detect_batch, crops=True)
+    assert batches == [1]
+    assert boxes.tolist() == [[330, 230, 345, 240]]
+    assert gate.stats["recortes"] == 1
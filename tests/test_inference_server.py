@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from detection.inference_server import InferenceServer
+from detection.tiling import TiledDetector
+from tests.fakes import BrightSpotModel
+
+
+@pytest.fixture
+def server():
+    server = InferenceServer(BrightSpotModel(), max_batch=4, max_delay=0.005).start()
+    yield server
+    server.stop()
+
+
+def test_client_single_frame(server):
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    frame[10:20, 30:40] = 255
+    results = server.client(0)(frame)
+    assert len(results) == 1
+    assert results[0].boxes.xyxy.numpy().tolist() == [[30, 10, 40, 20]]
+
+
+def test_client_list_returns_one_result_per_frame(server):
+    frames = [np.zeros((50, 50, 3), dtype=np.uint8) for _ in range(6)]
+    frames[4][5:8, 5:8] = 255
+    results = server.client(0)(frames)
+    assert len(results) == 6
+    assert [len(r.boxes) for r in results] == [0, 0, 0, 0, 1, 0]
+    # Los frames de la lista se agrupan en lotes del servidor
+    assert max(server.model.calls) > 1
+
+
+def test_tiled_detector_through_stream_client(server):
+    frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+    frame[1500:1520, 3000:3030] = 255
+    tiler = TiledDetector(server.client(0), tile=640, batch=8)
+    boxes, confs, classes = tiler(frame)
+    assert boxes.tolist() == [[3000, 1500, 3030, 1520]]
+    assert classes.tolist() == [0]
+
+
+def test_stop_fails_pending_requests():
+    server = InferenceServer(BrightSpotModel())
+    server._running = True
+    future = server.submit(np.zeros((4, 4, 3), dtype=np.uint8))
+    server.stop()
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
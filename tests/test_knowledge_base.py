@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from processing.knowledge_base import ProductKnowledgeBase, export_sqlite, load_products
+
+CATALOG = {
+    "apple": {"category": "fruit", "healthy": True, "healthiness": 90, "color": [0, 255, 0],
+              "recommendations": ["orange"]},
+    "orange": {"category": "fruit", "healthy": True, "healthiness": 85},
+    "soda": {"category": "drink", "healthy": False, "healthiness": 10},
+    "water": {"category": "drink", "healthy": True, "healthiness": 95},
+    "juice": {"category": "drink", "healthy": True, "healthiness": 60},
+}
+
+
+def write_catalog(path, catalog, mtime=None):
+    path.write_text(json.dumps(catalog), encoding="utf-8")
+    if mtime is not None:
+        # La recarga compara el mtime; se fija explícitamente para no depender de la resolución del sistema
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "productos.json"
+    write_catalog(path, CATALOG, mtime=1_000_000)
+    return path
+
+
+def test_lookups(catalog):
+    kb = ProductKnowledgeBase(str(catalog), check_interval=0)
+    assert len(kb) == 5 and "apple" in kb
+    assert kb.healthiness("apple") == 90
+    assert kb.healthiness("desconocido", default=-1) == -1
+    assert kb.color("apple") == (0, 255, 0)
+    assert kb.color("orange") == (0, 255, 255)
+    assert kb.recommendations("apple") == ["orange"]
+    # Sin recomendaciones propias, un producto no saludable recibe las alternativas de su categoría
+    assert kb.recommendations("soda") == ["water", "juice"]
+    assert kb.recommendations("soda", limit=1) == ["water"]
+    assert kb.by_category("drink", healthy=False) == ["soda"]
+    assert kb.reloads == 1
+
+
+def test_reloads_when_the_file_changes(catalog):
+    kb = ProductKnowledgeBase(str(catalog), check_interval=0)
+    assert kb.healthiness("soda") == 10
+    write_catalog(catalog, dict(CATALOG, soda={"category": "drink", "healthiness": 20}), mtime=1_000_010)
+    assert kb.healthiness("soda") == 20
+    assert kb.reloads == 2
+
+
+def test_check_interval_delays_the_reload(catalog):
+    kb = ProductKnowledgeBase(str(catalog), check_interval=3600)
+    assert kb.healthiness("soda") == 10
+    write_catalog(catalog, dict(CATALOG, soda={"category": "drink", "healthiness": 20}), mtime=1_000_010)
+    assert kb.healthiness("soda") == 10
+    kb.reload()
+    assert kb.healthiness("soda") == 20
+
+
+def test_invalid_file_keeps_the_previous_version(catalog, capsys):
+    kb = ProductKnowledgeBase(str(catalog), check_interval=0)
+    assert len(kb) == 5
+    catalog.write_text('{"apple": {', encoding="utf-8")
+    os.utime(catalog, (1_000_010, 1_000_010))
+    assert len(kb) == 5 and kb.healthiness("apple") == 90
+    assert kb.reloads == 1
+    assert "No se pudo recargar" in capsys.readouterr().out
+
+
+def test_missing_file_is_an_empty_catalog(tmp_path, capsys):
+    kb = ProductKnowledgeBase(str(tmp_path / "no_existe.json"), check_interval=0)
+    assert len(kb) == 0
+    assert kb.recommendations("apple") == []
+    assert "no encontrada" in capsys.readouterr().out
+
+
+def test_sqlite_round_trip(catalog, tmp_path):
+    path = str(tmp_path / "productos.sqlite")
+    export_sqlite(load_products(str(catalog)), path)
+    products = {p.name: p.to_dict() for p in load_products(path)}
+    assert products == {p.name: p.to_dict() for p in load_products(str(catalog))}
+    kb = ProductKnowledgeBase(path, check_interval=0)
+    assert kb.recommendations("soda") == ["water", "juice"]
@@ -0,0 +1,75 @@
+import multiprocessing
+import threading
+
+import pytest
+
+from processing.multicam import SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing((4, 6, 3), slots=3, lock=multiprocessing.Lock(), create=True)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+def write(ring, value, frame_number, **kwargs):
+    slot = ring.reserve(**kwargs)
+    ring.frames[slot][...] = value
+    ring.publish(slot, frame_number)
+    return slot
+
+
+def test_reader_gets_the_latest_frame_once(ring):
+    assert ring.acquire() is None
+    write(ring, 10, 0)
+    write(ring, 20, 1)
+    frame_number, stamp, frame = ring.acquire()
+    assert frame_number == 1 and stamp > 0
+    assert (frame == 20).all()
+    ring.release()
+    assert ring.acquire() is None
+
+
+def test_writer_skips_the_held_and_latest_buffers(ring):
+    write(ring, 10, 0)
+    _, _, held = ring.acquire()
+    # Con el buffer tomado por el lector el escritor sigue publicando sin tocarlo
+    slots = {write(ring, 20 + i, i + 1) for i in range(5)}
+    assert len(slots) == 2
+    assert (held == 10).all()
+    ring.release()
+    frame_number, _, frame = ring.acquire()
+    assert frame_number == 5 and (frame == 24).all()
+
+
+def test_attached_ring_shares_the_buffers(ring):
+    reader = SharedFrameRing.attach(ring.spec())
+    try:
+        write(ring, 7, 3)
+        frame_number, _, frame = reader.acquire()
+        assert frame_number == 3 and (frame == 7).all()
+        reader.release()
+        del frame
+    finally:
+        reader.close()
+
+
+def test_wait_for_reader_blocks_until_the_frame_is_taken(ring):
+    write(ring, 1, 0, wait_for_reader=True)
+    stop = threading.Event()
+    stop.set()
+    assert ring.reserve(wait_for_reader=True, stop=stop) is None
+    ring.acquire()
+    ring.release()
+    assert ring.reserve(wait_for_reader=True, stop=stop) is not None
+
+
+def test_finished_after_the_last_frame_is_read(ring):
+    write(ring, 1, 0)
+    ring.finish()
+    assert not ring.finished
+    ring.acquire()
+    ring.release()
+    assert ring.finished
@@ -0,0 +1,67 @@
+import numpy as np
+
+from detection.tiling import TiledDetector, merge_detections, tile_grid
+from tests.fakes import BrightSpotModel
+
+
+def merge(boxes, confs, classes, **kwargs):
+    return merge_detections(np.array(boxes), np.array(confs), np.array(classes), **kwargs).tolist()
+
+
+def test_tile_grid_covers_the_frame_and_stays_inside():
+    tiles = tile_grid(1080, 1920, tile=640, overlap=0.2)
+    assert all(x2 - x1 == 640 and y2 - y1 == 640 for x1, y1, x2, y2 in tiles)
+    assert max(x2 for _, _, x2, _ in tiles) == 1920 and max(y2 for _, _, _, y2 in tiles) == 1080
+    assert tile_grid(480, 600, tile=640) == [(0, 0, 600, 480)]
+
+
+def test_merge_keeps_the_most_confident_of_overlapping_boxes():
+    boxes = [[0, 0, 100, 100], [5, 5, 105, 105], [300, 300, 400, 400]]
+    assert merge(boxes, [0.6, 0.9, 0.7], [0, 0, 0]) == [1, 2]
+
+
+def test_merge_drops_boxes_cut_by_a_tile_border():
+    # La mitad de un producto cortado por el recorte queda dentro de la caja completa (IoU 0.5, IoS 1)
+    boxes = [[0, 0, 100, 100], [0, 0, 50, 100]]
+    assert merge(boxes, [0.8, 0.9], [0, 0], iou_threshold=0.6) == [1]
+
+
+def test_merge_is_per_class():
+    boxes = [[0, 0, 100, 100], [0, 0, 100, 100]]
+    assert merge(boxes, [0.8, 0.9], [0, 1]) == [1, 0]
+
+
+def test_merge_without_boxes():
+    assert merge(np.empty((0, 4)), [], []) == []
+
+
+def test_unchanged_tiles_reuse_their_detections():
+    model = BrightSpotModel()
+    tiler = TiledDetector(model, tile=640, overlap=0.2, batch=8, refresh=0)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    frame[500:530, 1000:1040] = 255
+    boxes, confs, classes = tiler(frame)
+    assert boxes.tolist() == [[1000, 500, 1040, 530]]
+    inferred = tiler.stats["recortes_inferidos"]
+
+    boxes, _, _ = tiler(frame.copy())
+    assert boxes.tolist() == [[1000, 500, 1040, 530]]
+    assert tiler.stats["recortes_inferidos"] == inferred
+    assert tiler.stats["recortes_omitidos"] == inferred
+
+    # Sólo se vuelven a inferir los recortes que contienen el cambio (y el frame completo)
+    frame[100:130, 100:140] = 255
+    boxes, _, _ = tiler(frame)
+    assert sorted(boxes.tolist()) == [[100, 100, 140, 130], [1000, 500, 1040, 530]]
+    assert 0 < tiler.stats["recortes_inferidos"] - inferred < inferred
+
+
+def test_refresh_infers_unchanged_tiles_again():
+    tiler = TiledDetector(BrightSpotModel(), tile=640, refresh=2)
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    tiler(frame)
+    inferred = tiler.stats["recortes_inferidos"]
+    tiler(frame)
+    assert tiler.stats["recortes_inferidos"] == inferred
+    tiler(frame)
+    assert tiler.stats["recortes_inferidos"] == 2 * inferred
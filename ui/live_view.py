@@ -0,0 +1,266 @@
+import threading
+import time
+import tkinter as tk
+
+import cv2
+
+from config import CAMERA_SOURCE, FRAME_HEIGHT, FRAME_WIDTH, PRODUCT_DETECT_EVERY
+from processing.capture import FrameGrabber
+from processing.metrics import metrics
+
+# Texto de los botones de la vista en vivo, en el orden del menú
+MODE_TITLES = {
+    "productos": "Productos",
+    "coco": "Objetos (COCO)",
+    "emociones": "Emociones",
+    "gestos": "Gestos",
+}
+
+
+class LatestFrame:
+    """
+    Casilla con el último frame listo para mostrar. El hilo de trabajo la sobrescribe
+    y la interfaz toma sólo el más reciente: nunca se acumulan frames atrasados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+        self.replaced = 0
+
+    def put(self, item):
+        with self._lock:
+            if self._item is not None:
+                self.replaced += 1
+            self._item = item
+
+    def take(self):
+        """
+        :return: Último elemento publicado, o None si no hay uno nuevo desde la última llamada.
+        """
+        with self._lock:
+            item, self._item = self._item, None
+        return item
+
+
+def create_mode_processor(loader, mode):
+    """
+    Prepara un modo para la vista en vivo (carga de modelos incluida).
+    :return: Tupla (procesar_frame, cerrar o None).
+    """
+    module = loader.load(mode)
+    if mode == "productos":
+        model = module.get_model()
+        if PRODUCT_DETECT_EVERY != "1":
+            interpolator = module.create_interpolator(model, PRODUCT_DETECT_EVERY)
+            return (lambda frame: module.render_detections(frame, interpolator.process(frame))), None
+        return (lambda frame: module.process_frame(frame, model)), None
+
+    if mode == "coco":
+        model = module.get_yolo_model()
+        return (lambda frame: module.process_frame(frame, model)), None
+
+    if mode == "emociones":
+        tracker, classifier = module.create_emotion_tracker()
+
+        def process(frame):
+            with metrics.measure("rostros y emociones"):
+                faces = tracker.update(frame, classifier.classify)
+            metrics.count("rostros", len(faces))
+            with metrics.measure("filtros y dibujo"):
+                return module.render_emotions(frame, faces)
+        return process, lambda: module.close_emotion_tracker(tracker)
+
+    if mode == "gestos":
+        hands = module.create_hands()
+        session = module.GestureFilterSession(hands, timer=metrics)
+        return session.process, hands.close
+
+    raise ValueError(f"Modo desconocido: {mode}")
+
+
+class LiveView:
+    """
+    Video procesado dentro de una ventana de Tk sin bloquear su ``mainloop``.
+
+    Un hilo de trabajo lee la cámara, aplica el modo activo y publica el frame ya
+    convertido en la casilla ``LatestFrame``; la interfaz lo recoge con ``after``.
+    La cámara se abre una sola vez y cada modo se prepara la primera vez que se usa y
+    se conserva: volver a un modo ya usado sólo cambia la función que procesa el frame.
+    El hilo de trabajo es el dueño de la cámara y de los modos, y los libera al terminar.
+    """
+
+    def __init__(self, parent, loader, source=CAMERA_SOURCE, width=FRAME_WIDTH, height=FRAME_HEIGHT,
+                 max_width=960, poll_ms=15):
+        """
+        :param parent: Contenedor de Tk.
+        :param loader: ``ModeLoader`` con el que se importan los modos.
+        :param source: Fuente de video de ``FrameGrabber``.
+        :param max_width: Ancho máximo mostrado (los frames más anchos se reducen).
+        :param poll_ms: Intervalo con el que la interfaz busca un frame nuevo.
+        """
+        self.parent = parent
+        self.loader = loader
+        self.source = source
+        self.width = width
+        self.height = height
+        self.max_width = max_width
+        self.poll_ms = poll_ms
+        self.label = tk.Label(parent, bg="black")
+        self.status = tk.Label(parent, text="Abriendo cámara...", font=("Helvetica", 12), anchor="w")
+        self.slot = LatestFrame()
+        self.mode = None
+        self.grabber = None
+        self._requested = None
+        self._requested_at = 0.0
+        self._processors = {}
+        self._closers = []
+        self._status_text = None
+        self._photo = None
+        self._photo_size = None
+        self._running = False
+        self._thread = None
+        self._after = None
+
+    def start(self):
+        self.grabber = FrameGrabber(self.source, self.width, self.height, timer=metrics).start()
+        self._running = True
+        self._thread = threading.Thread(target=self._work, name="LiveView", daemon=True)
+        self._thread.start()
+        self._poll()
+        return self
+
+    def set_mode(self, mode):
+        """
+        Cambia el modo activo; el hilo de trabajo lo aplica desde el siguiente frame.
+        """
+        self._requested_at = time.perf_counter()
+        self._requested = mode
+
+    def _switch(self, mode):
+        if mode not in self._processors:
+            self._status_text = f"Cargando {MODE_TITLES.get(mode, mode)}..."
+            try:
+                process, close = create_mode_processor(self.loader, mode)
+            except Exception as e:
+                print(f"No se pudo iniciar el modo {mode} ({type(e).__name__}: {e})")
+                self._status_text = f"Error en {MODE_TITLES.get(mode, mode)}: {e}"
+                # Volver al modo anterior, salvo que durante la carga se haya pedido otro
+                if self._requested == mode:
+                    self._requested = self.mode
+                return
+            self._processors[mode] = process
+            if close is not None:
+                self._closers.append(close)
+        self.mode = mode
+        metrics.begin(mode)
+        elapsed = time.perf_counter() - self._requested_at
+        metrics.add("cambio de modo", elapsed)
+        self._status_text = f"Modo: {MODE_TITLES.get(mode, mode)} (cambio en {elapsed * 1000:.0f} ms)"
+
+    def _work(self):
+        grabber = self.grabber
+        try:
+            while self._running:
+                if self._requested != self.mode:
+                    self._switch(self._requested)
+                ret, frame = grabber.read(timeout=0.5)
+                if not ret:
+                    if grabber.finished:
+                        self._status_text = "La fuente de video terminó."
+                        break
+                    continue
+                process = self._processors.get(self.mode)
+                if process is not None:
+                    frame = process(frame)
+                self.slot.put(self._encode(metrics.end_frame(frame)))
+                grabber.mark_displayed()
+        finally:
+            # Se cierra aquí y no en stop(): un modo puede seguir cargándose cuando la
+            # interfaz deja de esperar, y sus recursos se agregan desde este hilo
+            grabber.stop()
+            for close in self._closers:
+                close()
+            self._closers.clear()
+            self._processors.clear()
+
+    def _encode(self, frame):
+        # PPM binario: Tk lo decodifica sin depender de PIL. La conversión se hace aquí
+        # (fuera del hilo de la interfaz) y copia el frame, así el buffer de captura puede reutilizarse.
+        h, w = frame.shape[:2]
+        if w > self.max_width:
+            h, w = int(h * self.max_width / w), self.max_width
+            frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return (w, h), b"P6 %d %d 255\n" % (w, h) + rgb.tobytes()
+
+    def _poll(self):
+        item = self.slot.take()
+        if item is not None:
+            size, data = item
+            if self._photo is None or size != self._photo_size:
+                self._photo = tk.PhotoImage(master=self.label, data=data, format="PPM")
+                self._photo_size = size
+                self.label.configure(image=self._photo)
+            else:
+                self._photo.configure(data=data, format="PPM")
+        if self._status_text is not None:
+            self.status.configure(text=self._status_text)
+            self._status_text = None
+        self._after = self.parent.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        """
+        Detiene el hilo de trabajo; éste libera la cámara y cierra los modos usados al
+        terminar, aunque sea después de que la interfaz deje de esperarlo.
+        """
+        self._running = False
+        if self._after is not None:
+            self.parent.after_cancel(self._after)
+            self._after = None
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            if self._thread.is_alive():
+                print("La vista en vivo sigue cargando un modo; se cerrará al terminar la carga.")
+            self._thread = None
+        self.grabber = None
+        if metrics.enabled:
+            print(metrics.report())
+            print(f"Frames reemplazados antes de mostrarse: {self.slot.replaced}")
+
+
+class LiveViewWindow:
+    """
+    Ventana con la vista en vivo y un botón por modo para cambiar entre ellos.
+    """
+
+    def __init__(self, root, loader, on_close=None):
+        self.window = tk.Toplevel(root)
+        self.window.title("Healthy Lens - Vista en vivo")
+        self.window.config(bg="#F0F0F0")
+        self.on_close = on_close
+
+        buttons = tk.Frame(self.window, bg="#F0F0F0")
+        buttons.pack(fill="x", padx=10, pady=10)
+        for mode, title in MODE_TITLES.items():
+            tk.Button(buttons, text=title, font=("Helvetica", 12), bg="#4CAF50", fg="white", relief="flat",
+                      command=lambda m=mode: self.view.set_mode(m)).pack(side="left", padx=5)
+        tk.Button(buttons, text="Cerrar", font=("Helvetica", 12), relief="flat",
+                  command=self.close).pack(side="right", padx=5)
+
+        self.view = LiveView(self.window, loader)
+        self.view.label.pack(padx=10)
+        self.view.status.pack(fill="x", padx=10, pady=5)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.view.start()
+
+    def show(self, mode):
+        self.view.set_mode(mode)
+        self.window.deiconify()
+        self.window.lift()
+
+    def close(self):
+        self.view.stop()
+        self.window.destroy()
+        if self.on_close is not None:
+            self.on_close()
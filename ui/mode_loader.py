@@ -0,0 +1,89 @@
+import importlib
+import threading
+import time
+
+# Módulo de cada modo del menú; se importan (con ultralytics, DeepFace o MediaPipe) sólo al elegirlo
+MODE_MODULES = {
+    "productos": "PP.PPE.pdetection",
+    "coco": "PP.PPE.detection_haar",
+    "emociones": "PP.PPE.emotion_detection",
+    "gestos": "PP.PPE.gesture_detection",
+}
+
+# Modelos del registro que cada modo usa; la precarga también los carga y calienta
+MODE_MODELS = {
+    "productos": ("productos",),
+    "coco": ("coco",),
+    "emociones": ("emociones",),
+    "gestos": (),
+}
+
+
+class ModeLoader:
+    """
+    Importa los módulos de los modos bajo demanda y registra cuánto tardó cada uno.
+
+    ``preload`` importa un modo y carga sus modelos en segundo plano (p. ej. el más
+    usado, después de mostrar el menú); si el usuario lo elige antes de que termine,
+    ``load`` y el registro de modelos esperan a esa misma carga en lugar de repetirla.
+    """
+
+    def __init__(self, modules=MODE_MODULES, models=MODE_MODELS):
+        self.modules = dict(modules)
+        self.models = dict(models)
+        self.load_times = {}
+        self._lock = threading.Lock()
+        self._locks = {mode: threading.Lock() for mode in self.modules}
+        self._loaded = {}
+
+    def load(self, mode):
+        """
+        :return: Módulo del modo (importado la primera vez).
+        """
+        module = self._loaded.get(mode)
+        if module is not None:
+            return module
+        with self._locks[mode]:
+            module = self._loaded.get(mode)
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.modules[mode])
+                with self._lock:
+                    self.load_times[mode] = time.perf_counter() - start
+                    self._loaded[mode] = module
+        return module
+
+    def loaded(self, mode):
+        return mode in self._loaded
+
+    def preload(self, mode):
+        """
+        Importa un modo y carga sus modelos en un hilo de fondo. Los errores se
+        informan y se vuelven a producir cuando el usuario elija el modo.
+        """
+        def target():
+            from detection.model_registry import registry
+
+            try:
+                self.load(mode)
+                names = self.models.get(mode, ())
+                if names:
+                    start = time.perf_counter()
+                    for name in names:
+                        registry.get(name)
+                    with self._lock:
+                        self.load_times[f"{mode} (modelos)"] = time.perf_counter() - start
+            except Exception as e:
+                print(f"No se pudo precargar el modo {mode} ({type(e).__name__}: {e})")
+
+        thread = threading.Thread(target=target, name=f"Preload-{mode}", daemon=True)
+        thread.start()
+        return thread
+
+    def report(self):
+        with self._lock:
+            times = dict(self.load_times)
+        lines = ["Importación de modos:"]
+        for mode, seconds in times.items():
+            lines.append(f"  {mode:<20} {seconds * 1000:.0f} ms")
+        return "\n".join(lines)
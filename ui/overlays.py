@@ -1,4 +1,8 @@
+import threading
+from collections import OrderedDict
+
 import cv2
+import numpy as np
 
 def draw_overlays(frame, products):
     """
@@ -6,6 +10,181 @@ def draw_overlays(frame, products):
     :param frame: Frame de video (BGR).
     :param products: Lista de productos detectados [(x1, y1, x2, y2, label)].
     """
+    overlay = default_renderer()
     for (x1, y1, x2, y2, label) in products:
-        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        overlay.rectangle((x1, y1), (x2, y2), (0, 255, 0), 2)
+        overlay.text(label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    return overlay.flush(frame)
+
+
+class Sprite:
+    """
+    Etiqueta ya rasterizada. ``alpha`` (0-255) es la opacidad de cada píxel, None si
+    es opaca; ``dx, dy`` es la posición de la esquina respecto al punto de anclaje del texto.
+    """
+
+    __slots__ = ("image", "alpha", "dx", "dy", "_premultiplied", "_inverse")
+
+    def __init__(self, image, alpha, dx, dy):
+        self.image = image
+        self.alpha = alpha
+        self.dx = dx
+        self.dy = dy
+        if alpha is not None:
+            # Precalculado para mezclar: imagen·α/255 + fondo·(255-α)/255
+            a = alpha.astype(np.float32)[..., None]
+            self._premultiplied = np.rint(image * a / 255).astype(np.uint8)
+            self._inverse = np.repeat(255 - alpha[..., None], 3, axis=2)
+
+
+def text_rect_sprite(text, scale=3, thickness=3, offset=10, font=cv2.FONT_HERSHEY_PLAIN, **kwargs):
+    """
+    Rasteriza una etiqueta de ``cvzone.putTextRect`` (texto sobre rectángulo relleno).
+    """
+    import cvzone
+
+    (w, h), _ = cv2.getTextSize(text, font, scale, thickness)
+    image = np.zeros((h + 2 * offset + 1, w + 2 * offset + 1, 3), dtype=np.uint8)
+    cvzone.putTextRect(image, text, (offset, h + offset), scale=scale, thickness=thickness,
+                       offset=offset, font=font, **kwargs)
+    return Sprite(image, None, -offset, -h - offset)
+
+
+def text_sprite(text, font, scale, color, thickness=1):
+    """
+    Rasteriza un texto de ``cv2.putText`` con su canal de transparencia.
+    """
+    (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+    pad = thickness + 2
+    size = (h + baseline + 2 * pad, w + 2 * pad)
+    alpha = np.zeros(size, dtype=np.uint8)
+    cv2.putText(alpha, text, (pad, h + pad), font, scale, 255, thickness)
+    image = np.empty(size + (3,), dtype=np.uint8)
+    image[:] = color
+    return Sprite(image, alpha, -pad, -h - pad)
+
+
+def blit(frame, sprite, pos):
+    """
+    Copia un sprite en el frame, recortándolo a los bordes y mezclándolo según su opacidad.
+    :param pos: Punto de anclaje (el mismo que recibiría ``cv2.putText`` o ``cvzone.putTextRect``).
+    """
+    x, y = int(pos[0]) + sprite.dx, int(pos[1]) + sprite.dy
+    fh, fw = frame.shape[:2]
+    sh, sw = sprite.image.shape[:2]
+    if sprite.alpha is None and x >= 0 and y >= 0 and x + sw <= fw and y + sh <= fh:
+        frame[y:y + sh, x:x + sw] = sprite.image
+        return
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(fw, x + sw), min(fh, y + sh)
+    if x2 <= x1 or y2 <= y1:
+        return
+    region = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+    if sprite.alpha is None:
+        frame[y1:y2, x1:x2] = sprite.image[region]
+    else:
+        dst = frame[y1:y2, x1:x2]
+        cv2.add(cv2.multiply(dst, sprite._inverse[region], scale=1 / 255), sprite._premultiplied[region], dst=dst)
+
+
+class SpriteCache:
+    """
+    Caché LRU de etiquetas rasterizadas, indexada por texto, fuente, escala y colores.
+    Compartida entre hilos.
+    """
+
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self._sprites = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """
+        :param key: Clave hashable de la etiqueta.
+        :param build: Función sin argumentos que rasteriza la etiqueta si no está en caché.
+        """
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+        sprite = build()
+        with self._lock:
+            self.misses += 1
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_size:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    def stats(self):
+        return {"etiquetas": len(self._sprites), "aciertos": self.hits, "fallos": self.misses}
+
+
+sprite_cache = SpriteCache()
+
+
+class OverlayRenderer:
+    """
+    Acumula los dibujos de un frame y los aplica juntos con ``flush``: todos los
+    rectángulos del mismo color y grosor en una sola llamada a ``cv2.polylines`` y
+    las etiquetas como sprites precalculados de ``sprite_cache``. Las etiquetas se
+    dibujan encima de los rectángulos.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or sprite_cache
+        self._rects = {}
+        self._labels = []
+
+    def rectangle(self, pt1, pt2, color, thickness=1):
+        """
+        Equivalente a ``cv2.rectangle`` sin relleno.
+        """
+        (x1, y1), (x2, y2) = pt1, pt2
+        polygon = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32)
+        self._rects.setdefault((tuple(color), thickness), []).append(polygon)
+
+    def text(self, text, pos, font, scale, color, thickness=1):
+        """
+        Equivalente a ``cv2.putText``.
+        """
+        color = tuple(color)
+        key = ("text", text, font, scale, color, thickness)
+        sprite = self.cache.get(key, lambda: text_sprite(text, font, scale, color, thickness))
+        self._labels.append((sprite, pos))
+
+    def text_rect(self, text, pos, scale=3, thickness=3, offset=10, **kwargs):
+        """
+        Equivalente a ``cvzone.putTextRect`` (acepta sus mismos argumentos de color y fuente).
+        """
+        key = ("rect", text, scale, thickness, offset, tuple(sorted(kwargs.items())))
+        sprite = self.cache.get(key, lambda: text_rect_sprite(text, scale, thickness, offset, **kwargs))
+        self._labels.append((sprite, pos))
+
+    def flush(self, frame):
+        """
+        Dibuja todo lo acumulado sobre el frame y vacía la cola.
+        """
+        for (color, thickness), polygons in self._rects.items():
+            cv2.polylines(frame, polygons, True, color, thickness)
+        for sprite, pos in self._labels:
+            blit(frame, sprite, pos)
+        self._rects = {}
+        self._labels = []
+        return frame
+
+
+_renderers = threading.local()
+
+
+def default_renderer():
+    """
+    Renderer del hilo actual (comparte la caché de sprites con los demás hilos).
+    """
+    renderer = getattr(_renderers, "renderer", None)
+    if renderer is None:
+        renderer = _renderers.renderer = OverlayRenderer()
+    return renderer